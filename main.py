@@ -1,5 +1,5 @@
 from src.student_case_manager import StudentCaseManager
-from src.depression_predictor import StudentDepressionPredictor
+import argparse
 import os
 import sys
 
@@ -25,17 +25,49 @@ def display_prediction_results(predictor, student_case, case_number):
         print(f"Prediction Error: {e}")
 
 
-def main():
+def main(profile_path=None, prometheus_path=None, search_mode='grid', compare_search=False,
+         fold_cache_dir=None, tree_checkpoints=None, oob_confirm_top=0, cores=None,
+         result_store=None, search_queue='search_queue.sqlite', local_workers=None,
+         stats_workers=None):
     """
     Main entry point for the Student Depression Predictor application
+
+    Args:
+        profile_path (str): Optional JSON file for the training stage profile
+        prometheus_path (str): Optional Prometheus text file for the stage metrics
+        search_mode (str): Hyperparameter search strategy, 'grid', 'halving', 'halving_trees',
+            'fold_cached', 'warm_start', 'oob' or 'distributed'
+        compare_search (bool): Also run the exhaustive grid and report the score gap and speedup
+        fold_cache_dir (str): Directory to memory-map the encoded CV folds from in
+            'fold_cached' mode, instead of keeping them in memory
+        tree_checkpoints (list): n_estimators values to search instead of 100 and 200
+        oob_confirm_top (int): In 'oob' mode, re-score this many of the best candidates with CV
+        cores (int): Core budget for training (default: every core available to the process)
+        result_store (str): SQLite file of fold scores reused across runs ('fold_cached' and
+            'warm_start' modes)
+        search_queue (str): SQLite work queue file of the 'distributed' mode
+        local_workers (int): Worker processes the 'distributed' mode starts on this machine
+            (default: one per core of the budget)
+        stats_workers (int): Summarize the raw dataset in a streaming pass with this many
+            worker processes, instead of from the loaded frame. Training still loads the
+            frame, so this is a second pass over the file; for the summary alone use
+            `python -m src.streaming_stats`
     """
     # Determine the path to the dataset
     dataset_path = os.path.join(
         project_root, 'data', 'student_depression_dataset.csv')
 
+    # Imported here so the batch scoring command does not load the training stack
+    from src.depression_predictor import StudentDepressionPredictor
+
     try:
         # Create an instance of the predictor
-        predictor = StudentDepressionPredictor(dataset_path)
+        predictor = StudentDepressionPredictor(
+            dataset_path, profile_path=profile_path, prometheus_path=prometheus_path,
+            search_mode=search_mode, compare_search=compare_search,
+            fold_cache_dir=fold_cache_dir, tree_checkpoints=tree_checkpoints,
+            oob_confirm_top=oob_confirm_top, cores=cores, result_store=result_store,
+            search_queue=search_queue, local_workers=local_workers, stats_workers=stats_workers)
 
         # Create a student case manager
         case_manager = StudentCaseManager()
@@ -88,5 +120,102 @@ def main():
         print(f"Unexpected Error: {e}")
 
 
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+
+    Args:
+        argv (list): Arguments to parse, defaults to sys.argv
+
+    Returns:
+        argparse.Namespace: Parsed arguments; command is None for the interactive mode
+    """
+    parser = argparse.ArgumentParser(
+        description="Student Depression Risk Predictor")
+    parser.add_argument('--profile', default=None,
+                        help="Write a JSON profile of the training stages to this file")
+    parser.add_argument('--prometheus', default=None,
+                        help="Write the training stage metrics in Prometheus text format")
+    parser.add_argument('--search-mode', default='grid',
+                        choices=['grid', 'halving', 'halving_trees', 'fold_cached', 'warm_start',
+                                 'oob', 'distributed'],
+                        help="Hyperparameter search: exhaustive grid, successive halving "
+                             "over training rows or over trees, the grid with the "
+                             "preprocessing fitted once per CV fold, or that grid with each "
+                             "forest grown once through the n_estimators checkpoints, or "
+                             "one fit per candidate ranked by out-of-bag ROC-AUC, or the "
+                             "grid's fits spread over workers sharing a queue file")
+    parser.add_argument('--compare-search', action='store_true',
+                        help="Also run the exhaustive grid and report score gap and speedup")
+    parser.add_argument('--fold-cache-dir', default=None,
+                        help="Memory-map the encoded CV folds from this directory "
+                             "(fold_cached mode; default keeps them in memory)")
+    parser.add_argument('--tree-checkpoints', type=int, nargs='+', default=None,
+                        help="n_estimators values to search (default: 100 200)")
+    parser.add_argument('--oob-confirm-top', type=int, default=0,
+                        help="oob mode: confirm this many of the best candidates with 5-fold CV")
+    parser.add_argument('--cores', type=int, default=None,
+                        help="Core budget shared by search and tree parallelism "
+                             "(default: all available cores)")
+    parser.add_argument('--result-store', default=None,
+                        help="SQLite file of per-fold search scores; a rerun only evaluates "
+                             "new combinations (fold_cached and warm_start modes)")
+    parser.add_argument('--search-queue', default='search_queue.sqlite',
+                        help="distributed mode: SQLite queue file shared with the workers "
+                             "(join with: python -m src.search_queue worker <file>)")
+    parser.add_argument('--local-workers', type=int, default=None,
+                        help="distributed mode: worker processes to start on this machine "
+                             "(default: one per core; 0 to rely on remote workers)")
+    parser.add_argument('--stats-workers', type=int, default=None,
+                        help="Compute the dataset summary in a streaming pass over the CSV "
+                             "with this many worker processes (default: from the loaded frame); "
+                             "an extra pass, since training loads the frame anyway. For the "
+                             "summary alone, run python -m src.streaming_stats")
+    subparsers = parser.add_subparsers(dest='command')
+
+    score_parser = subparsers.add_parser(
+        'score', help="Score a CSV file of students with the exported model")
+    score_parser.add_argument('input', help="CSV file in the upload schema")
+    score_parser.add_argument('output', help="CSV file to write risk scores to")
+    score_parser.add_argument('--workers', type=int, default=None,
+                              help="Worker processes (default: all cores)")
+    score_parser.add_argument('--model-dir', default=os.path.join(project_root, 'model'),
+                              help="Directory with the exported model files")
+    score_parser.add_argument('--compiled', action='store_true',
+                              help="Score with the compiled forest instead of sklearn "
+                                   "(faster on small files, slower on large ones)")
+
+    serve_parser = subparsers.add_parser(
+        'serve', help="Run the HTTP scoring service around the exported model")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    serve_parser.add_argument('--port', type=int, default=8000, help="Port to listen on")
+    serve_parser.add_argument('--model-dir', default=os.path.join(project_root, 'model'),
+                              help="Directory with the exported model files")
+    serve_parser.add_argument('--max-batch-size', type=int, default=256,
+                              help="Most rows coalesced into one model call")
+    serve_parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                              help="Longest a request waits for a micro-batch to fill")
+    serve_parser.add_argument('--max-pending-rows', type=int, default=20000,
+                              help="Rows admitted but not yet scored before requests get 503")
+
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.command == 'score':
+        from src.batch_scorer import score_file
+        score_file(args.input, args.output, workers=args.workers, model_dir=args.model_dir,
+                   compiled=args.compiled)
+    elif args.command == 'serve':
+        from src.scoring_service import serve
+        serve(args.host, args.port, model_dir=args.model_dir,
+              max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+              max_pending_rows=args.max_pending_rows)
+    else:
+        main(profile_path=args.profile, prometheus_path=args.prometheus,
+             search_mode=args.search_mode, compare_search=args.compare_search,
+             fold_cache_dir=args.fold_cache_dir, tree_checkpoints=args.tree_checkpoints,
+             oob_confirm_top=args.oob_confirm_top, cores=args.cores,
+             result_store=args.result_store, search_queue=args.search_queue,
+             local_workers=args.local_workers, stats_workers=args.stats_workers)
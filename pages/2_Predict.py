@@ -1,14 +1,14 @@
 import streamlit as st
 import pandas as pd
-import pickle
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from utils import set_page_style, check_login
 import sys
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(parent_dir)
+from src.model_registry import get_registry
+from src.prediction_cache import PredictionCache, default_cache_path
+from src.streaming_scorer import ChunkedScorer, clean_upload_chunk
+from src.cohort_dtypes import cohort_memory_mb_per_100k
 
 st.set_page_config(page_title="Overview", layout="wide")
 set_page_style()
@@ -21,33 +21,39 @@ if not check_login():
     st.stop()
 
 # Load model, preprocessor and columns
-@st.cache_resource
 def load_model():
     try:
-        with open("model/depression_model.pkl", "rb") as f_model:
-            model = pickle.load(f_model)
-        with open("model/preprocessor.pkl", "rb") as f_pre:
-            preprocessor = pickle.load(f_pre)
-        with open("model/feature_columns.pkl", "rb") as f_cols:
-            feature_columns = pickle.load(f_cols)
+        # Current version from the process-wide registry, which loads it once,
+        # warms it up and hot-swaps it when the exported files change. The
+        # snapshot is kept for this whole run, so an upload is scored by one version.
+        # Uploads are scored in chunks of thousands of rows, where sklearn is faster.
+        snapshot = get_registry("model", compiled=False).current()
+        feature_columns = snapshot.feature_columns
         
         # Load dataset info if available
         try:
+            import pickle
             with open("model/dataset_info.pkl", "rb") as f_info:
                 dataset_info = pickle.load(f_info)
                 st.sidebar.success(f"Model trained on: {os.path.basename(dataset_info['dataset_used'])}")
                 st.sidebar.info(f"Expected features: {len(feature_columns)}")
         except FileNotFoundError:
             st.sidebar.warning("Dataset info not available")
-            
-        return model, preprocessor, feature_columns
+
+        return snapshot.model_hash, feature_columns, snapshot.forest, snapshot.encoder
     except Exception as e:
         st.error(f"Error loading model files: {e}")
         st.info("Make sure you have trained the model first by running: python train_model_universal.py")
         st.stop()
 
+# Scoring cache shared by all sessions, keyed by the model's hash
+@st.cache_resource
+def load_prediction_cache(model_hash):
+    return PredictionCache(model_hash, path=default_cache_path())
+
 try:
-    model, preprocessor, feature_columns = load_model()
+    model_hash, feature_columns, model, encoder = load_model()
+    prediction_cache = load_prediction_cache(model_hash)
 except Exception as e:
     st.error(f"Error loading model: {e}")
     st.stop()
@@ -66,6 +72,10 @@ with st.expander("Upload CSV File"):
 
 # Function to process and display data
 def display_data_visualizations(df):
+    # Plotly is only imported once there is something to chart
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     # Calculate metrics
     high_risk_count = (df["Risk Category"] == "High").sum()
     high_risk_percent = high_risk_count / len(df) * 100
@@ -274,7 +284,7 @@ def display_data_visualizations(df):
             with col2:
                 # Interactive bar chart for risk by degree (if available)
                 if 'Degree' in df.columns:
-                    degree_risk = df.groupby('Degree')['Depression Risk (%)'].mean().sort_values(ascending=False)
+                    degree_risk = df.groupby('Degree', observed=True)['Depression Risk (%)'].mean().sort_values(ascending=False)
                     
                     fig_degree = px.bar(
                         x=degree_risk.index,
@@ -300,6 +310,7 @@ def display_data_visualizations(df):
             # Sleep duration distribution - Pie chart
             if 'Sleep Duration' in df.columns:
                 sleep_counts = df['Sleep Duration'].value_counts()
+                sleep_counts = sleep_counts[sleep_counts > 0]
                 
                 fig_sleep = px.pie(
                     values=sleep_counts.values,
@@ -316,6 +327,7 @@ def display_data_visualizations(df):
             if 'Dietary Habits' in df.columns:
                 # Create cross-tabulation for stacked bar
                 dietary_risk = pd.crosstab(df['Dietary Habits'], df['Risk Category'])
+                dietary_risk = dietary_risk[dietary_risk.sum(axis=1) > 0]
                 
                 fig_dietary = px.bar(
                     dietary_risk,
@@ -340,7 +352,7 @@ def display_data_visualizations(df):
             # Financial stress impact visualization
             if 'Financial Stress' in df.columns:
                 # Group by financial stress and calculate average risk
-                financial_impact = df.groupby('Financial Stress')['Depression Risk (%)'].mean().reset_index()
+                financial_impact = df.groupby('Financial Stress', observed=True)['Depression Risk (%)'].mean().reset_index()
                 
                 fig_financial = px.bar(
                     financial_impact,
@@ -400,134 +412,54 @@ def display_data_visualizations(df):
         if st.button("View Student List", use_container_width=True):
             st.switch_page("pages/3_Student_List.py")
 
-# Main logic - FIXED VERSION
+# DATA CLEANING - Apply the same cleaning as in training, one chunk at a time
+extra_columns = set()
+quarantined_rows = []
+
+def clean_uploaded_chunk(chunk):
+    return clean_upload_chunk(chunk, feature_columns, extra_columns, quarantined_rows)
+
+def score_encoded_rows(X_transformed):
+    # Only rows the cache has not seen yet reach the model
+    return prediction_cache.predict_proba(X_transformed, model.predict_proba)[:, 1]
+
+# Main logic - streams the upload in chunks so memory stays flat
 if uploaded_file is not None:
     try:
-        df = pd.read_csv(uploaded_file)
-        
-        print(f"Uploaded CSV columns: {list(df.columns)}")
-        print(f"Expected feature columns: {feature_columns}")
+        progress_bar = st.progress(0.0, text="Scoring uploaded students...")
 
-        # DATA CLEANING - Apply the same cleaning as in training
-        print("\n--- APPLYING DATA CLEANING ---")
-        
-        # Store original columns for debugging
-        original_columns = list(df.columns)
-        print(f"Original columns: {original_columns}")
-        
-        # Remove columns that don't contribute to prediction
-        columns_to_remove = ['City', 'Work Pressure', 'Job Satisfaction', 'id']
-        for col in columns_to_remove:
-            if col in df.columns:
-                print(f"Removing '{col}' column. Shape before: {df.shape}")
-                df = df.drop(col, axis=1)
-                print(f"Shape after removing '{col}': {df.shape}")
-
-        # Filter to only students BUT KEEP THE PROFESSION COLUMN FOR NOW
-        if 'Profession' in df.columns:
-            print(f"Filtering only 'Student' in Profession. Rows before: {len(df)}")
-            original_profession_values = df['Profession'].unique()
-            print(f"Available profession values: {original_profession_values}")
-            df = df[df['Profession'] == 'Student']
-            print(f"Rows after filtering 'Student': {len(df)}")
-            
-            # NOW remove the Profession column since all rows are 'Student'
-            if len(df) > 0:  # Only if we have data left
-                print(f"Removing 'Profession' column after filtering. Shape before: {df.shape}")
-                df = df.drop('Profession', axis=1)
-                print(f"Shape after removing 'Profession': {df.shape}")
-            else:
-                st.error("No student data found in the uploaded file.")
-                st.stop()
-
-        # Remove problematic values from Sleep Duration and Financial Stress
-        columns_to_clean = ['Sleep Duration', 'Financial Stress']
-        for col in columns_to_clean:
-            if col in df.columns:
-                unique_values = df[col].unique()
-                print(f"Unique values in {col}: {unique_values}")
-                print(f"Cleaning problematic values from {col}. Rows before: {len(df)}")
-                df = df[~df[col].isin(['Others', '?', 'unknown'])]
-                print(f"Rows after cleaning {col}: {len(df)}")
-
-        # Remove the Depression column if it exists (since we're predicting it)
-        if 'Depression' in df.columns:
-            df = df.drop('Depression', axis=1)
-            print("Removed 'Depression' column from prediction data")
+        def show_progress(rows_read, rows_scored, fraction):
+            if fraction is not None:
+                progress_bar.progress(fraction, text=f"Read {rows_read:,} rows, scored {rows_scored:,} students")
 
-        print(f"Final cleaned data shape: {df.shape}")
-        print(f"Final cleaned columns: {list(df.columns)}")
-        
-        # CRÍTICO: Verificar que Age esté presente
-        if 'Age' not in df.columns:
-            st.error("❌ La columna 'Age' se perdió durante el procesamiento!")
-            st.write("Columnas disponibles:", list(df.columns))
-            st.write("Columnas originales:", original_columns)
-            st.stop()
-        
-        # Verificar que tenemos las columnas correctas
-        expected_columns_after_cleaning = [
-            'Gender', 'Age', 'Academic Pressure', 'CGPA', 'Study Satisfaction',
-            'Sleep Duration', 'Dietary Habits', 'Degree',
-            'Have you ever had suicidal thoughts ?', 'Work/Study Hours',
-            'Financial Stress', 'Family History of Mental Illness'
-        ]
-        
-        current_columns = list(df.columns)
-        print(f"Expected columns after cleaning: {expected_columns_after_cleaning}")
-        print(f"Current columns after cleaning: {current_columns}")
-        
-        # Show differences
-        missing_expected = set(expected_columns_after_cleaning) - set(current_columns)
-        extra_current = set(current_columns) - set(expected_columns_after_cleaning)
-        
-        if missing_expected:
-            st.error(f"Missing expected columns: {missing_expected}")
-        if extra_current:
-            st.warning(f"Extra columns found: {extra_current}")
-            
-        if missing_expected:
-            st.stop()
+        scorer = ChunkedScorer(clean_uploaded_chunk, encoder, score_encoded_rows, feature_columns)
+        results = scorer.score(uploaded_file, show_progress)
+        progress_bar.empty()
 
-        # Check if all required columns are present
-        missing_cols = [col for col in feature_columns if col not in df.columns]
-        extra_cols = [col for col in df.columns if col not in feature_columns]
-        
-        if missing_cols:
-            st.error(f"Missing required columns: {', '.join(missing_cols)}")
-            st.info(f"Expected columns: {', '.join(feature_columns)}")
-            st.info(f"Found columns: {', '.join(df.columns)}")
+        if results.rows == 0:
+            st.error("No student data found in the uploaded file.")
             st.stop()
-            
-        if extra_cols:
-            st.warning(f"Extra columns found (will be ignored): {', '.join(extra_cols)}")
-            # Remove extra columns
-            df = df[feature_columns]
+        if extra_columns:
+            st.warning(f"Extra columns found (will be ignored): {', '.join(sorted(extra_columns))}")
+        if quarantined_rows:
+            quarantined = pd.concat(quarantined_rows)
+            st.warning(f"{len(quarantined):,} students were not scored because some of their "
+                       f"values are outside the expected ranges or categories.")
+            with st.expander("Rows that failed validation"):
+                st.dataframe(quarantined.head(1000))
+
+        df = results.to_frame()
+        print(f"Final cleaned data shape: {df.shape}")
 
-        # Apply model to predict depression risk
-        X = df[feature_columns]
-        
-        # DEBUGGING: Print shapes and first few rows
-        print(f"X shape before transform: {X.shape}")
-        print(f"X columns: {list(X.columns)}")
-        print(f"Expected feature_columns: {feature_columns}")
-        print(f"X first row:\n{X.iloc[0] if len(X) > 0 else 'No data'}")
-        
-        # Ensure the order of columns matches training
-        X = X[feature_columns]
-        
-        print(f"About to transform with preprocessor...")
-        X_transformed = preprocessor.transform(X)
-        print(f"X_transformed shape: {X_transformed.shape}")
-        
-        df["Depression Risk (%)"] = model.predict_proba(X_transformed)[:, 1] * 100
-
-        # Create risk categories with updated thresholds (30-70 instead of 30-60)
-        df['Risk Category'] = pd.cut(
-            df["Depression Risk (%)"],
-            bins=[0, 30, 70, 100],
-            labels=["Low", "Medium", "High"]
-        )
+        # The store keeps text columns categorical and small scales downcast, so the cohort is compact in session_state
+        memory = cohort_memory_mb_per_100k(df)
+        print(f"Cohort memory per 100k students: {memory:.1f} MB")
+        st.sidebar.info(f"Cohort memory per 100k students: {memory:.1f} MB")
+
+        cache_stats = prediction_cache.stats()
+        print(f"Prediction cache: {cache_stats}")
+        st.sidebar.info(f"Prediction cache hit rate: {cache_stats['hit_rate']:.1%} "
+                        f"({cache_stats['misses']} of {cache_stats['rows']} rows scored by the model)")
 
         # Store in session_state for later use
         st.session_state["latest_df"] = df
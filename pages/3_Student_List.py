@@ -46,8 +46,8 @@ risk_filter = st.sidebar.multiselect(
 if "Gender" in df.columns:
    gender_filter = st.sidebar.multiselect(
        "Gender",
-       options=df["Gender"].unique(),
-       default=df["Gender"].unique()
+       options=df["Gender"].dropna().unique().tolist(),
+       default=df["Gender"].dropna().unique().tolist()
    )
 else:
    gender_filter = None
@@ -56,7 +56,7 @@ else:
 if "Degree" in df.columns:
    degree_filter = st.sidebar.multiselect(
        "Degree",
-       options=df["Degree"].unique(),
+       options=df["Degree"].dropna().unique().tolist(),
        default=[]
    )
 else:
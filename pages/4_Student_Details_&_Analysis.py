@@ -1,14 +1,13 @@
 # pages/4_Student_Detail.py
 import streamlit as st
 import pandas as pd
-import pickle
-import matplotlib.pyplot as plt
 import numpy as np
 import os
 from utils import set_page_style, check_login, check_data, categorize_risk
 import sys
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(parent_dir)
+from src.model_registry import get_registry
 
 st.set_page_config(page_title="Student Detail", layout="wide")
 set_page_style()
@@ -28,19 +27,14 @@ if "selected_student_index" not in st.session_state:
     st.info("Please select a student from the Student List page.")
     st.stop()
 
-# Load model and preprocessing tools
-@st.cache_resource
+# Load model and preprocessing tools from the shared registry; one student at a
+# time is scored here, where the compiled forest is much faster than sklearn
 def load_model():
-    with open("model/depression_model.pkl", "rb") as f_model:
-        model = pickle.load(f_model)
-    with open("model/preprocessor.pkl", "rb") as f_pre:
-        preprocessor = pickle.load(f_pre)
-    with open("model/feature_columns.pkl", "rb") as f_cols:
-        feature_columns = pickle.load(f_cols)
-    return model, preprocessor, feature_columns
+    snapshot = get_registry("model", compiled=True).current()
+    return snapshot.forest, snapshot.encoder, snapshot.feature_columns
 
 try:
-    model, preprocessor, feature_columns = load_model()
+    model, encoder, feature_columns = load_model()
 except Exception as e:
     st.error(f"Error loading model: {e}")
     st.stop()
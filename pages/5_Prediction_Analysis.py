@@ -1,9 +1,6 @@
 # pages/5_FeatureContribution.py
 import streamlit as st
 import pandas as pd
-import pickle
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
 import os
 import sys
@@ -14,6 +11,7 @@ sys.path.append(parent_dir)
 
 # Importar utils
 from utils import set_page_style, check_login, check_data, categorize_risk
+from src.model_registry import get_registry
 
 st.set_page_config(page_title="Feature Contributions", layout="wide")
 set_page_style()
@@ -32,19 +30,14 @@ if "selected_student_index" not in st.session_state:
     st.info("Please select a student from the Student List page.")
     st.stop()
 
-# Load model and preprocessing tools
-@st.cache_resource
+# Load model and preprocessing tools from the shared registry; one student at a
+# time is scored here, where the compiled forest is much faster than sklearn
 def load_model():
-    with open("model/depression_model.pkl", "rb") as f_model:
-        model = pickle.load(f_model)
-    with open("model/preprocessor.pkl", "rb") as f_pre:
-        preprocessor = pickle.load(f_pre)
-    with open("model/feature_columns.pkl", "rb") as f_cols:
-        feature_columns = pickle.load(f_cols)
-    return model, preprocessor, feature_columns
+    snapshot = get_registry("model", compiled=True).current()
+    return snapshot.forest, snapshot.feature_columns, snapshot.encoder
 
 try:
-    model, preprocessor, feature_columns = load_model()
+    model, feature_columns, encoder = load_model()
 except Exception as e:
     st.error(f"Error loading model: {e}")
     st.stop()
@@ -142,12 +135,12 @@ with st.container():
     """)
 
 # Check if model supports feature importance analysis
-if hasattr(model, "feature_importances_"):
+if getattr(model, "feature_importances_", None) is not None:
     importances = model.feature_importances_
     
     # Get prediction probability for this student
     X_student = df.loc[[student_index]][feature_columns]
-    X_student_transformed = preprocessor.transform(X_student)
+    X_student_transformed = encoder.transform(X_student)
     
     # Get probabilities - class 1 is typically the positive class (depression)
     student_prob = model.predict_proba(X_student_transformed)[0, 1]
@@ -172,7 +165,7 @@ if hasattr(model, "feature_importances_"):
     contribution_effects = []
     
     # Separate features by type
-    numeric_features = df[valid_features].select_dtypes(include=['int64', 'float64']).columns.tolist()
+    numeric_features = df[valid_features].select_dtypes('number').columns.tolist()
     categorical_features = [f for f in valid_features if f not in numeric_features]
     
     # For each feature, determine if it likely increases or decreases risk
@@ -198,7 +191,7 @@ if hasattr(model, "feature_importances_"):
             # For categorical features, look at conditional probability
             try:
                 # Group by this feature and calculate average risk
-                grouped = df.groupby(feature)["Depression Risk (%)"].mean()
+                grouped = df.groupby(feature, observed=True)["Depression Risk (%)"].mean()
                 
                 # If this category has above average risk, it increases risk
                 avg_risk = df["Depression Risk (%)"].mean()
@@ -242,7 +235,8 @@ if hasattr(model, "feature_importances_"):
     colors = ['#D32F2F' if effect == "Increases risk" else '#388E3C' 
              for effect in top_contributors["Effect"]]
     
-    # Create interactive horizontal bar chart with Plotly
+    # Create interactive horizontal bar chart with Plotly, imported only when drawn
+    import plotly.graph_objects as go
     fig = go.Figure()
     
     # Add bars
@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import pickle
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.cohort_generator import CohortGenerator
+from src.model_artifacts import load_scoring_artifacts
+from src.streaming_scorer import ChunkedScorer, categorize_risk_scores, clean_upload_chunk
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_DATASET = os.path.join('data', 'student_depression_dataset.csv')
+
+
+def build_input_file(reference, n_rows, path, seed=42):
+    """Write n_rows resampled from the reference frame as an upload-schema CSV"""
+    rng = np.random.default_rng(seed)
+    sample = reference.iloc[rng.integers(0, len(reference), n_rows)].copy()
+    sample['id'] = np.arange(n_rows)
+    sample.to_csv(path, index=False)
+    return path
+
+
+def time_stage(func, repeats):
+    """Run func repeats times and return per-run seconds and the last result"""
+    timings = []
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def peak_memory(func):
+    """Peak Python heap allocation of one run of func, in bytes"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(timings, n_rows, peak_bytes):
+
+    timings_ms = np.asarray(timings) * 1000
+    p50, p90, p99 = np.percentile(timings_ms, [50, 90, 99])
+    return {
+        'rows': n_rows,
+        'runs': len(timings),
+        'latency_ms': {
+            'min': round(float(timings_ms.min()), 3),
+            'p50': round(float(p50), 3),
+            'p90': round(float(p90), 3),
+            'p99': round(float(p99), 3),
+            'max': round(float(timings_ms.max()), 3)
+        },
+        # Throughput at the median run
+        'rows_per_second': round(n_rows / (p50 / 1000), 1) if p50 else None,
+        'peak_memory_mb': round(peak_bytes / 1e6, 3)
+    }
+
+
+class PipelineBenchmark:
+    """Times each stage of the upload pipeline on inputs of increasing size.
+
+    The stages mirror pages/2_Predict.py: CSV parse, cleaning,
+    preprocessor.transform, predict_proba and risk categorization, plus the
+    fused encoder, the compiled forest and the end-to-end chunked
+    scorer that the page now uses. Timings and peak memory come from separate runs so
+    tracemalloc overhead does not distort the latencies.
+    """
+
+    def __init__(self, model_dir='model', dataset_path=DEFAULT_DATASET, repeats=5, seed=42,
+                 synthetic=False):
+
+        self.repeats = repeats
+        self.seed = seed
+        self.reference = pd.read_csv(dataset_path)
+        # Synthetic cohorts avoid repeating the same ~28k rows at large sizes
+        self.generator = CohortGenerator.fit(dataset_path) if synthetic else None
+
+        artifacts = load_scoring_artifacts(model_dir, compiled=False)
+        self.feature_columns = artifacts['feature_columns']
+        self.encoder = artifacts['encoder']
+        self.forest = artifacts['forest']
+        self.compiled_forest = load_scoring_artifacts(model_dir, compiled=True)['forest']
+
+        # The original sklearn objects, when the pickles are available
+        self.model = self.preprocessor = None
+        model_path = os.path.join(model_dir, 'depression_model.pkl')
+        if os.path.exists(model_path):
+            with open(model_path, 'rb') as f_model:
+                self.model = pickle.load(f_model)
+            with open(os.path.join(model_dir, 'preprocessor.pkl'), 'rb') as f_pre:
+                self.preprocessor = pickle.load(f_pre)
+
+    def _stage(self, results, name, func, n_rows):
+
+        timings, result = time_stage(func, self.repeats)
+        results[name] = summarize(timings, n_rows, peak_memory(func))
+        print(f"  {name:<24} p50 {results[name]['latency_ms']['p50']:>10.1f} ms  "
+              f"{results[name]['rows_per_second'] or 0:>14,.0f} rows/s  "
+              f"peak {results[name]['peak_memory_mb']:>9.1f} MB")
+        return result
+
+    def run_size(self, n_rows, work_dir):
+
+        print(f"\n=== {n_rows:,} ROWS ===")
+        path = os.path.join(work_dir, f"bench_{n_rows}.csv")
+        if self.generator is not None:
+            self.generator.write_csv(path, n_rows, self.seed)
+        else:
+            build_input_file(self.reference, n_rows, path, self.seed)
+        results = {'input_bytes': os.path.getsize(path)}
+        stages = {}
+
+        dtypes = self.encoder.csv_dtypes
+        raw = self._stage(stages, 'csv_parse', lambda: pd.read_csv(path, dtype=dtypes), n_rows)
+        cleaned = self._stage(
+            stages, 'cleaning', lambda: clean_upload_chunk(raw, self.feature_columns), n_rows)
+        n_clean = len(cleaned)
+
+        if self.model is not None:
+            encoded = self._stage(
+                stages, 'preprocessor_transform', lambda: self.preprocessor.transform(cleaned), n_clean)
+            proba = self._stage(
+                stages, 'predict_proba', lambda: self.model.predict_proba(encoded), n_clean)
+
+        fused = self._stage(
+            stages, 'fused_encoder_transform', lambda: self.encoder.transform(cleaned), n_clean)
+        compiled = self._stage(
+            stages, 'compiled_predict_proba', lambda: self.compiled_forest.predict_proba(fused), n_clean)
+        if self.model is None:
+            proba = compiled
+
+        risk = pd.Series(proba[:, 1] * 100)
+        self._stage(stages, 'risk_categorization', lambda: categorize_risk_scores(risk), n_clean)
+
+        scorer = ChunkedScorer(
+            lambda chunk: clean_upload_chunk(chunk, self.feature_columns),
+            self.encoder, lambda X: self.forest.predict_proba(X)[:, 1], self.feature_columns)
+        self._stage(stages, 'upload_pipeline',
+                    lambda: scorer.score(path).to_frame(), n_rows)
+
+        os.remove(path)
+        results['scored_rows'] = n_clean
+        results['stages'] = stages
+        return results
+
+    def run(self, sizes=DEFAULT_SIZES):
+
+        report = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'cpu_count': os.cpu_count(),
+            'repeats': self.repeats,
+            'sizes': {}
+        }
+        with tempfile.TemporaryDirectory() as work_dir:
+            for n_rows in sizes:
+                report['sizes'][str(n_rows)] = self.run_size(n_rows, work_dir)
+        return report
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Benchmark the scoring pipeline stage by stage")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Input sizes in rows")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per stage")
+    parser.add_argument('--model-dir', default='model', help="Directory with the exported model")
+    parser.add_argument('--dataset', default=DEFAULT_DATASET, help="Reference CSV to resample")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="Generate synthetic cohorts instead of resampling the reference rows")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON report path")
+    args = parser.parse_args(argv)
+
+    benchmark = PipelineBenchmark(args.model_dir, args.dataset, args.repeats,
+                                  synthetic=args.synthetic)
+    report = benchmark.run(args.sizes)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nBenchmark report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# Text columns of a scored cohort, stored as pandas Categoricals
+CATEGORICAL_COLUMNS = [
+    'Gender', 'Profession', 'City', 'Sleep Duration', 'Dietary Habits', 'Degree',
+    'Have you ever had suicidal thoughts ?', 'Financial Stress',
+    'Family History of Mental Illness'
+]
+
+# Bounded numeric columns; integer-valued ones become int8, others float32 if exact
+BOUNDED_NUMERIC_COLUMNS = [
+    'Age', 'Academic Pressure', 'Work Pressure', 'CGPA', 'Study Satisfaction',
+    'Job Satisfaction', 'Work/Study Hours'
+]
+
+
+def cohort_vocabularies(encoder):
+    """Fixed category order per column, taken from the fitted encoder's vocabularies"""
+    return {
+        column: [str(value) for value in vocab]
+        for column, vocab in zip(encoder.categorical_columns, encoder.vocabularies)
+        if vocab.dtype.kind in 'UO'
+    }
+
+
+def _downcast(values):
+
+    if not pd.api.types.is_numeric_dtype(values.dtype) or values.isna().any():
+        return values
+    array = values.to_numpy()
+    if np.all(np.mod(array, 1) == 0) and array.min() >= -128 and array.max() <= 127:
+        return values.astype(np.int8)
+    # float32 only when every value survives the round trip, so no score can change
+    as_float32 = array.astype(np.float32)
+    if np.array_equal(as_float32.astype(array.dtype), array):
+        return values.astype(np.float32)
+    return values
+
+
+def normalize_cohort(df, vocabularies=None):
+    """Return df with text columns as Categoricals and bounded scales downcast.
+
+    Categories follow the fixed vocabulary of each column, with any value
+    outside it appended in sorted order, so no value is lost and cohorts
+    scored by the same model share category codes.
+    """
+    vocabularies = vocabularies or {}
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column not in df.columns or isinstance(df[column].dtype, pd.CategoricalDtype):
+            continue
+        values = df[column]
+        if not pd.api.types.is_string_dtype(values.dtype):
+            # e.g. Financial Stress parsed as 2.0 instead of the vocabulary's '2.0'
+            values = values.astype(object).where(values.isna(), values.astype(str))
+        known = list(vocabularies.get(column, []))
+        seen = set(known)
+        extra = sorted(str(value) for value in values.dropna().unique() if str(value) not in seen)
+        df[column] = pd.Categorical(values, categories=pd.Index(known + extra))
+
+    for column in BOUNDED_NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = _downcast(df[column])
+    return df
+
+
+def cohort_memory_mb_per_100k(df):
+    """Deep memory use of df, scaled to 100,000 students"""
+    if len(df) == 0:
+        return 0.0
+    return df.memory_usage(deep=True).sum() / len(df) * 100000 / 1e6
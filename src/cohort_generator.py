@@ -0,0 +1,228 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_REFERENCE = os.path.join('data', 'student_depression_dataset.csv')
+# Rows drawn from one random stream; chunks are cut from these blocks
+SAMPLE_BLOCK_ROWS = 10000
+
+
+class CohortGenerator:
+    """Generates synthetic students that look like a reference CSV.
+
+    Every column is treated as a discrete variable over the exact text
+    values seen in the reference, so generated files parse and clean the
+    same way real uploads do. High-cardinality numeric columns (CGPA) are
+    grouped into quantile bins for learning dependencies, and a value is
+    drawn from the bin's empirical distribution.
+
+    Pairwise dependencies follow a Chow-Liu tree: the maximum spanning tree
+    over pairwise mutual information, rooted at the target column. Rows are
+    drawn by ancestral sampling along the tree, one chunk at a time.
+    """
+
+    def __init__(self, columns, levels, root, order, parents, marginals, conditionals,
+                 bin_values, bin_probs, edges, id_column='id'):
+
+        self.columns = list(columns)
+        self.levels = levels
+        self.root = root
+        self.order = list(order)
+        self.parents = dict(parents)
+        self.marginals = marginals
+        self.conditionals = conditionals
+        self.bin_values = bin_values
+        self.bin_probs = bin_probs
+        self.edges = edges
+        self.id_column = id_column
+
+    @staticmethod
+    def _discretize(values, max_levels, n_bins):
+        """Return (codes, levels, per-level values, per-level probabilities) for one column"""
+        levels, codes = np.unique(values, return_inverse=True)
+        numeric = pd.to_numeric(pd.Series(levels), errors='coerce')
+        if len(levels) <= max_levels or numeric.isna().any():
+            return codes, levels, None, None
+
+        # Quantile bins over the numeric value of each row
+        row_numbers = numeric.to_numpy()[codes]
+        edges = np.unique(np.quantile(row_numbers, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        bins = np.searchsorted(edges, row_numbers, side='right')
+
+        bin_values, bin_probs = [], []
+        for b in range(len(edges) + 1):
+            in_bin, counts = np.unique(values[bins == b], return_counts=True)
+            bin_values.append(in_bin)
+            bin_probs.append(np.cumsum(counts) / counts.sum())
+        return bins, np.arange(len(edges) + 1), bin_values, bin_probs
+
+    @staticmethod
+    def _mutual_information(a, b, ka, kb):
+
+        joint = np.bincount(a * kb + b, minlength=ka * kb).reshape(ka, kb) / len(a)
+        pa = joint.sum(axis=1, keepdims=True)
+        pb = joint.sum(axis=0, keepdims=True)
+        nonzero = joint > 0
+        return float((joint[nonzero] * np.log(joint[nonzero] / (pa @ pb)[nonzero])).sum())
+
+    @classmethod
+    def fit(cls, reference, id_column='id', root='Depression', max_levels=40, n_bins=16,
+            smoothing=0.0):
+        """Learn marginals and a Chow-Liu dependency tree from a reference frame or CSV path"""
+        if isinstance(reference, (str, os.PathLike)):
+            # Text values are kept verbatim so the output matches the source formatting
+            reference = pd.read_csv(reference, dtype=str, keep_default_na=False)
+
+        columns = [col for col in reference.columns if col != id_column]
+        codes, levels, bin_values, bin_probs = {}, {}, {}, {}
+        for col in columns:
+            values = reference[col].astype(str).to_numpy()
+            col_codes, col_levels, values_by_bin, probs_by_bin = cls._discretize(
+                values, max_levels, n_bins)
+            codes[col] = col_codes
+            levels[col] = col_levels
+            if values_by_bin is not None:
+                bin_values[col] = values_by_bin
+                bin_probs[col] = probs_by_bin
+
+        # Pairwise mutual information between the discretized columns
+        sizes = {col: len(levels[col]) for col in columns}
+        n = len(columns)
+        mi = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i + 1, n):
+                mi[i, j] = mi[j, i] = cls._mutual_information(
+                    codes[columns[i]], codes[columns[j]], sizes[columns[i]], sizes[columns[j]])
+
+        # Maximum spanning tree (Prim), grown from the root column
+        root = root if root in columns else columns[0]
+        in_tree = {columns.index(root)}
+        order, parents, edges = [root], {}, []
+        while len(in_tree) < n:
+            best = max(((i, j) for i in in_tree for j in range(n) if j not in in_tree),
+                       key=lambda pair: mi[pair])
+            parent, child = columns[best[0]], columns[best[1]]
+            in_tree.add(best[1])
+            order.append(child)
+            parents[child] = parent
+            edges.append((parent, child, round(mi[best], 4)))
+
+        # Cumulative marginal of the root and conditional tables of every other column
+        counts = np.bincount(codes[root], minlength=sizes[root]).astype(np.float64)
+        marginals = {root: np.cumsum(counts) / counts.sum()}
+        conditionals = {}
+        for child, parent in parents.items():
+            table = np.bincount(codes[parent] * sizes[child] + codes[child],
+                                minlength=sizes[parent] * sizes[child])
+            table = table.reshape(sizes[parent], sizes[child]).astype(np.float64) + smoothing
+            totals = table.sum(axis=1, keepdims=True)
+            # A parent level with no rows falls back to the child's marginal
+            marginal = np.bincount(codes[child], minlength=sizes[child]).astype(np.float64)
+            table = np.where(totals > 0, table, marginal)
+            conditionals[child] = np.cumsum(table / table.sum(axis=1, keepdims=True), axis=1)
+
+        return cls(list(reference.columns), levels, root, order, parents, marginals,
+                   conditionals, bin_values, bin_probs, edges, id_column)
+
+    @staticmethod
+    def _draw(cumulative, u):
+        """Inverse-CDF draw; cumulative is one row per sample, or one row shared by all"""
+        if cumulative.ndim == 1:
+            return np.minimum(np.searchsorted(cumulative, u, side='right'), len(cumulative) - 1)
+        return np.minimum((u[:, None] >= cumulative).sum(axis=1), cumulative.shape[1] - 1)
+
+    def sample(self, n_rows, rng, start_id=0):
+        """Draw n_rows synthetic rows as a DataFrame of text values"""
+        codes = {}
+        for col in self.order:
+            u = rng.random(n_rows)
+            if col == self.root:
+                codes[col] = self._draw(self.marginals[col], u)
+            else:
+                codes[col] = self._draw(self.conditionals[col][codes[self.parents[col]]], u)
+
+        data = {}
+        for col in self.columns:
+            if col == self.id_column:
+                data[col] = np.arange(start_id, start_id + n_rows)
+            elif col in self.bin_values:
+                # Pick the exact value inside the sampled bin
+                values = np.empty(n_rows, dtype=object)
+                u = rng.random(n_rows)
+                for b, (bin_values, bin_probs) in enumerate(
+                        zip(self.bin_values[col], self.bin_probs[col])):
+                    rows = codes[col] == b
+                    values[rows] = bin_values[self._draw(bin_probs, u[rows])]
+                data[col] = values
+            else:
+                data[col] = self.levels[col][codes[col]]
+        return pd.DataFrame(data, columns=self.columns)
+
+    def iter_chunks(self, n_rows, seed=42, chunk_size=100000, start_id=1):
+        """Yield the cohort chunk by chunk; memory use depends on chunk_size only
+
+        Rows are drawn in fixed blocks of SAMPLE_BLOCK_ROWS, each from its own
+        stream of seed, so a seed gives the same rows whatever the chunk_size.
+        """
+        buffered, buffered_rows = [], 0
+        for start in range(0, n_rows, SAMPLE_BLOCK_ROWS):
+            size = min(SAMPLE_BLOCK_ROWS, n_rows - start)
+            rng = np.random.default_rng([seed, start // SAMPLE_BLOCK_ROWS])
+            buffered.append(self.sample(size, rng, start_id + start))
+            buffered_rows += size
+
+            last_block = start + size == n_rows
+            while buffered_rows >= chunk_size or (last_block and buffered_rows):
+                rows = pd.concat(buffered, ignore_index=True) if len(buffered) > 1 else buffered[0]
+                yield rows.iloc[:chunk_size].reset_index(drop=True)
+                rest = rows.iloc[chunk_size:]
+                buffered, buffered_rows = ([rest], len(rest)) if len(rest) else ([], 0)
+
+    def write_csv(self, path, n_rows, seed=42, chunk_size=100000, start_id=1, progress=False):
+        """Stream n_rows synthetic rows to a CSV in the raw upload schema"""
+        started = time.perf_counter()
+        written = 0
+        with open(path, 'w', newline='') as f:
+            for chunk in self.iter_chunks(n_rows, seed, chunk_size, start_id):
+                chunk.to_csv(f, index=False, header=(written == 0))
+                written += len(chunk)
+                if progress:
+                    elapsed = time.perf_counter() - started
+                    print(f" {written:,} / {n_rows:,} rows ({written / elapsed:,.0f} rows/s)")
+        return written
+
+    def describe(self):
+
+        return {
+            'root': self.root,
+            'edges': [{'parent': p, 'child': c, 'mutual_information': mi} for p, c, mi in self.edges],
+            'binned_columns': sorted(self.bin_values)
+        }
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic student cohort CSV")
+    parser.add_argument('rows', type=int, help="Number of rows to generate")
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--reference', default=DEFAULT_REFERENCE, help="Reference CSV to learn from")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="Rows generated per chunk")
+    args = parser.parse_args(argv)
+
+    print(f"Learning column distributions from {args.reference}...")
+    generator = CohortGenerator.fit(args.reference)
+    print("Dependency tree (parent -> child, mutual information):")
+    for parent, child, mi in generator.edges:
+        print(f" {parent} -> {child}: {mi}")
+
+    print(f"\nWriting {args.rows:,} rows to {args.output}...")
+    generator.write_csv(args.output, args.rows, args.seed, args.chunk_size, progress=True)
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
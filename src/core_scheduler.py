@@ -0,0 +1,112 @@
+import os
+import time
+from contextlib import contextmanager
+
+from threadpoolctl import threadpool_limits
+
+
+def available_cores():
+    """Cores this process may use: CPU affinity, capped by a cgroup v2 CPU quota"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS and Windows
+        cores = os.cpu_count() or 1
+
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cores = min(cores, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+def _process_tree_cpu_seconds():
+    """CPU seconds of this process, its live descendants and the children they reaped.
+
+    Joblib's loky workers stay alive between calls, so resource.getrusage
+    would miss them; /proc lists them under this process instead.
+    """
+    try:
+        ticks = os.sysconf('SC_CLK_TCK')
+        children, cpu = {}, {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            pid, ppid = int(entry), int(fields[1])
+            children.setdefault(ppid, []).append(pid)
+            # utime, stime, cutime, cstime
+            cpu[pid] = sum(int(value) for value in fields[11:15]) / ticks
+    except (OSError, ValueError, AttributeError):
+        times = os.times()
+        return times.user + times.system + times.children_user + times.children_system
+
+    total, stack = 0.0, [os.getpid()]
+    while stack:
+        pid = stack.pop()
+        total += cpu.get(pid, 0.0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class CoreScheduler:
+    """Splits a fixed core budget between outer search jobs and inner forest threads.
+
+    plan() gives every core to the outer level (candidates x folds) while it
+    has enough tasks, and hands the remainder to each forest's n_jobs.
+    session() runs a block under that plan: native BLAS/OpenMP pools in this
+    process are capped to the inner share (joblib's loky workers already cap
+    theirs to cores // n_jobs), so outer x inner threads never exceed the
+    budget, and the block's wall time, CPU time and core utilization are
+    recorded.
+    """
+
+    def __init__(self, cores=None):
+
+        self.cores = min(cores, available_cores()) if cores else available_cores()
+        self.sessions = []
+
+    def plan(self, outer_tasks):
+        """Return (outer_jobs, inner_jobs) for outer_tasks independent fits"""
+        outer = max(1, min(self.cores, outer_tasks))
+        inner = max(1, self.cores // outer)
+        return outer, inner
+
+    @contextmanager
+    def session(self, name, outer_jobs, inner_jobs):
+
+        wall_start = time.perf_counter()
+        cpu_start = _process_tree_cpu_seconds()
+        with threadpool_limits(limits=inner_jobs):
+            yield
+
+        wall = time.perf_counter() - wall_start
+        cpu = _process_tree_cpu_seconds() - cpu_start
+        self.sessions.append({
+            'session': name,
+            'cores': self.cores,
+            'outer_jobs': outer_jobs,
+            'inner_jobs': inner_jobs,
+            'wall_seconds': round(wall, 3),
+            'cpu_seconds': round(cpu, 3),
+            # Share of the budget kept busy; near 1.0 means no idle cores
+            'utilization': round(cpu / (wall * self.cores), 3) if wall else None
+        })
+
+    def report(self):
+
+        return {'cores': self.cores, 'sessions': self.sessions}
+
+    def print_summary(self):
+
+        print(f"\n--- CORE UTILIZATION ({self.cores} cores) ---")
+        for session in self.sessions:
+            print(f" {session['session']:<28} {session['outer_jobs']} outer x "
+                  f"{session['inner_jobs']} inner jobs  wall {session['wall_seconds']:.2f}s  "
+                  f"cpu {session['cpu_seconds']:.2f}s  utilization {session['utilization'] or 0:.0%}")
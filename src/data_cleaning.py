@@ -0,0 +1,93 @@
+import numpy as np
+
+# Raw columns the model does not use
+UNUSED_COLUMNS = ['City', 'Work Pressure', 'Job Satisfaction', 'id']
+
+# Placeholder answers that make a row unusable
+PROBLEMATIC_VALUES = ['Others', '?', 'unknown']
+
+
+class CleaningRules:
+    """Declarative cleaning rule set, applied in a single pass.
+
+    drop_columns are removed, keep_rows keeps only rows whose value is in the
+    allowed list, and drop_rows removes rows whose value is in the listed
+    ones. Rules on columns the frame does not have are skipped. Every row
+    rule is evaluated on the input frame and combined into one boolean mask,
+    so the cleaned frame is copied exactly once.
+    """
+
+    def __init__(self, drop_columns=(), keep_rows=None, drop_rows=None, drop_filter_columns=False):
+
+        self.drop_columns = list(drop_columns)
+        self.keep_rows = dict(keep_rows or {})
+        self.drop_rows = dict(drop_rows or {})
+        # keep_rows columns hold a single value once filtered, so they can go too
+        self.drop_filter_columns = drop_filter_columns
+
+    def output_columns(self, df):
+        """Columns left after cleaning, in their original order"""
+        dropped = set(self.drop_columns)
+        if self.drop_filter_columns:
+            dropped.update(self.keep_rows)
+        return [col for col in df.columns if col not in dropped]
+
+    def row_mask(self, df, steps=None):
+        """Combined mask of the rows every rule keeps, or None if no rule applies"""
+        mask = None
+        rules = [(col, values, True) for col, values in self.keep_rows.items()]
+        rules += [(col, values, False) for col, values in self.drop_rows.items()]
+        for col, values, keep in rules:
+            if col not in df.columns:
+                continue
+            matches = df[col].isin(values).to_numpy()
+            rule_mask = matches if keep else ~matches
+            mask = rule_mask if mask is None else mask & rule_mask
+            if steps is not None:
+                steps.append((col, values, keep, int(np.count_nonzero(mask))))
+        return mask
+
+    def apply(self, df, columns=None, verbose=False):
+        """Return the cleaned frame, optionally projected onto columns, materialized once"""
+        steps = [] if verbose else None
+        mask = self.row_mask(df, steps)
+        if columns is None:
+            columns = self.output_columns(df)
+
+        if verbose:
+            removed = [col for col in df.columns if col not in self.output_columns(df)]
+            if removed:
+                print(f"Removing columns {removed}. Shape before: {df.shape}")
+            rows = len(df)
+            for col, values, keep, rows_after in steps:
+                action = "Keeping only" if keep else "Removing"
+                print(f"{action} {values} in {col}. Rows: {rows} -> {rows_after}")
+                rows = rows_after
+
+        if mask is None:
+            return df[columns].copy()
+        return df.loc[mask, columns]
+
+
+# Training-time cleaning, shared by the training script and uploaded data
+TRAINING_RULES = CleaningRules(
+    drop_columns=UNUSED_COLUMNS,
+    keep_rows={'Profession': ['Student']},
+    drop_rows={'Sleep Duration': PROBLEMATIC_VALUES, 'Financial Stress': PROBLEMATIC_VALUES},
+    drop_filter_columns=True
+)
+
+# Uploaded data may carry the label; it is predicted, never used as a feature
+UPLOAD_RULES = CleaningRules(
+    drop_columns=UNUSED_COLUMNS + ['Depression'],
+    keep_rows=TRAINING_RULES.keep_rows,
+    drop_rows=TRAINING_RULES.drop_rows,
+    drop_filter_columns=True
+)
+
+# StudentDepressionPredictor keeps Profession, as its saved pipelines expect it
+PREDICTOR_RULES = CleaningRules(
+    drop_columns=UNUSED_COLUMNS,
+    keep_rows=TRAINING_RULES.keep_rows,
+    drop_rows=TRAINING_RULES.drop_rows
+)
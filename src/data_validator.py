@@ -1,109 +1,135 @@
-import re
+import numpy as np
+import pandas as pd
 
 
 class DataValidator:
 
+    # Rules per field, shared by the validate_* methods and validate_frame.
+    # They follow the spellings of data/student_depression_dataset.csv.
+    INT_RANGES = {
+        'Age': (15, 60),
+        'Academic Pressure': (0, 5),
+        'Study Satisfaction': (0, 5),
+        'Work/Study Hours': (0, 24),
+        'Financial Stress': (1, 5)
+    }
+    FLOAT_RANGES = {
+        'CGPA': (0, 10.0)
+    }
+    # Values are capitalized before the membership check
+    CAPITALIZED_CHOICES = {
+        'Gender': ['Male', 'Female', 'Other'],
+        'Profession': ['Student'],
+        'Have you ever had suicidal thoughts ?': ['Yes', 'No'],
+        'Family History of Mental Illness': ['Yes', 'No']
+    }
+    # Labels the encoder was fitted on, matched as they are
+    EXACT_CHOICES = {
+        'Sleep Duration': ["'Less than 5 hours'", "'5-6 hours'", "'7-8 hours'", "'More than 8 hours'"],
+        'Dietary Habits': ['Healthy', 'Moderate', 'Unhealthy', 'Others'],
+        'Degree': [
+            "'Class 12'", 'B.Arch', 'B.Com', 'B.Ed', 'B.Pharm', 'B.Tech', 'BA', 'BBA', 'BCA',
+            'BE', 'BHM', 'BSc', 'LLB', 'LLM', 'M.Com', 'M.Ed', 'M.Pharm', 'M.Tech', 'MA',
+            'MBA', 'MBBS', 'MCA', 'MD', 'ME', 'MHM', 'MSc', 'Others', 'PhD'
+        ]
+    }
+
+    @staticmethod
+    def _validate_int(value, field):
+
+        # Whole numbers written as floats, like Financial Stress '3.0', are accepted
+        try:
+            number = float(value)
+            if not number.is_integer():
+                return None
+            low, high = DataValidator.INT_RANGES[field]
+            return int(number) if low <= number <= high else None
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _validate_capitalized(value, field):
+
+        return value.capitalize() if value.capitalize() in DataValidator.CAPITALIZED_CHOICES[field] else None
+
+    @staticmethod
+    def _validate_exact(value, field):
+
+        return value if value in DataValidator.EXACT_CHOICES[field] else None
+
     @staticmethod
     def validate_gender(gender):
 
-        valid_genders = ['Male', 'Female', 'Other']
-        return gender.capitalize() if gender.capitalize() in valid_genders else None
+        return DataValidator._validate_capitalized(gender, 'Gender')
 
     @staticmethod
     def validate_age(age):
 
-        try:
-            age = int(age)
-            return age if 15 <= age <= 35 else None
-        except (ValueError, TypeError):
-            return None
+        return DataValidator._validate_int(age, 'Age')
 
     @staticmethod
     def validate_profession(profession):
 
-        valid_professions = ['Student']
-        return profession.capitalize() if profession.capitalize() in valid_professions else None
+        return DataValidator._validate_capitalized(profession, 'Profession')
 
     @staticmethod
     def validate_academic_pressure(pressure):
 
-        try:
-            pressure = int(pressure)
-            return pressure if 1 <= pressure <= 10 else None
-        except (ValueError, TypeError):
-            return None
+        return DataValidator._validate_int(pressure, 'Academic Pressure')
 
     @staticmethod
     def validate_cgpa(cgpa):
 
         try:
             cgpa = float(cgpa)
-            return cgpa if 0 <= cgpa <= 4.0 else None
+            low, high = DataValidator.FLOAT_RANGES['CGPA']
+            return cgpa if low <= cgpa <= high else None
         except (ValueError, TypeError):
             return None
 
     @staticmethod
     def validate_study_satisfaction(satisfaction):
 
-        try:
-            satisfaction = int(satisfaction)
-            return satisfaction if 1 <= satisfaction <= 10 else None
-        except (ValueError, TypeError):
-            return None
+        return DataValidator._validate_int(satisfaction, 'Study Satisfaction')
 
     @staticmethod
     def validate_sleep_duration(duration):
 
-        valid_durations = ['Less than 6 hours',
-                           '6-8 hours', 'More than 8 hours']
-        return duration if duration in valid_durations else None
+        return DataValidator._validate_exact(duration, 'Sleep Duration')
 
     @staticmethod
     def validate_dietary_habits(habits):
 
-        valid_habits = ['Healthy', 'Unhealthy', 'Average']
-        return habits.capitalize() if habits.capitalize() in valid_habits else None
+        return DataValidator._validate_exact(habits, 'Dietary Habits')
 
     @staticmethod
     def validate_degree(degree):
 
-        valid_degrees = ['Bachelors', 'Masters', 'PhD']
-        return degree.capitalize() if degree.capitalize() in valid_degrees else None
+        return DataValidator._validate_exact(degree, 'Degree')
 
     @staticmethod
     def validate_suicidal_thoughts(thoughts):
 
-        valid_responses = ['Yes', 'No']
-        return thoughts.capitalize() if thoughts.capitalize() in valid_responses else None
+        return DataValidator._validate_capitalized(thoughts, 'Have you ever had suicidal thoughts ?')
 
     @staticmethod
     def validate_work_study_hours(hours):
 
-        try:
-            hours = int(hours)
-            return hours if 0 <= hours <= 24 else None
-        except (ValueError, TypeError):
-            return None
+        return DataValidator._validate_int(hours, 'Work/Study Hours')
 
     @staticmethod
     def validate_financial_stress(stress):
 
-        try:
-            stress = int(stress)
-            return stress if 1 <= stress <= 10 else None
-        except (ValueError, TypeError):
-            return None
+        return DataValidator._validate_int(stress, 'Financial Stress')
 
     @staticmethod
     def validate_family_history(history):
 
-        valid_responses = ['Yes', 'No']
-        return history.capitalize() if history.capitalize() in valid_responses else None
+        return DataValidator._validate_capitalized(history, 'Family History of Mental Illness')
 
-    def validate_input(self, input_data):
+    def _validators(self):
 
-        validated_data = {}
-        validation_methods = {
+        return {
             'Gender': self.validate_gender,
             'Age': self.validate_age,
             'Profession': self.validate_profession,
@@ -119,6 +145,11 @@ class DataValidator:
             'Family History of Mental Illness': self.validate_family_history
         }
 
+    def validate_input(self, input_data):
+
+        validated_data = {}
+        validation_methods = self._validators()
+
         # Validate each input
         for key, value in input_data.items():
             if key in validation_methods:
@@ -141,3 +172,77 @@ class DataValidator:
             return None
 
         return validated_data
+
+    @staticmethod
+    def _value_errors(values, validate):
+
+        # Text columns hold few distinct values: check each once and index by the codes
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        unique_errors = []
+        for value in uniques:
+            try:
+                unique_errors.append(validate(value) is None)
+            except (AttributeError, TypeError):
+                unique_errors.append(True)
+        # Code -1 is a missing value, which fails every rule
+        return np.array(unique_errors + [True], dtype=bool)[codes]
+
+    @staticmethod
+    def _range_errors(values, low, high, integer):
+
+        numbers = values.to_numpy(dtype=float, na_value=np.nan)
+        # NaN fails both comparisons, like float() failing on a missing value
+        errors = ~((numbers >= low) & (numbers <= high))
+        if integer:
+            errors |= numbers != np.trunc(numbers)
+        return errors
+
+    def validate_frame(self, df, fields=None, verbose=False):
+        """Validate every row of df in one vectorized pass, with the validate_* rules.
+
+        fields limits the check to those fields, e.g. the ones left after
+        cleaning. Returns a dict with 'errors', a boolean frame with one
+        column per field (True marks a value that fails its rule, and every
+        row fails a field df lacks), 'bitmap', the same errors packed into
+        one integer per row, 'valid' and 'quarantine', the rows without and
+        with errors as given, the latter with an 'Invalid Fields' column,
+        and 'error_counts' per field.
+        """
+        validators = self._validators()
+        if fields is not None:
+            validators = {field: validators[field] for field in fields if field in validators}
+        errors = {}
+        for field, validate in validators.items():
+            if field not in df.columns:
+                errors[field] = np.ones(len(df), dtype=bool)
+                continue
+            values = df[field]
+            numeric = pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype)
+            if numeric and field in self.INT_RANGES:
+                errors[field] = self._range_errors(values, *self.INT_RANGES[field], integer=True)
+            elif numeric and field in self.FLOAT_RANGES:
+                errors[field] = self._range_errors(values, *self.FLOAT_RANGES[field], integer=False)
+            else:
+                errors[field] = self._value_errors(values, validate)
+        errors = pd.DataFrame(errors, index=df.index)
+
+        # One bit per field, so each distinct error pattern is labelled only once
+        bitmap = errors.to_numpy() @ (1 << np.arange(errors.shape[1], dtype=np.int64))
+        bad_rows = bitmap != 0
+        patterns, inverse = np.unique(bitmap[bad_rows], return_inverse=True)
+        labels = np.array([', '.join(errors.columns[(pattern >> np.arange(errors.shape[1])) & 1 == 1])
+                           for pattern in patterns], dtype=object)
+        quarantine = df[bad_rows].copy()
+        quarantine['Invalid Fields'] = labels[inverse]
+
+        error_counts = errors.sum().astype(int)
+        if verbose:
+            print(f"Validated {len(df)} rows: {len(df) - int(bad_rows.sum())} valid, "
+                  f"{int(bad_rows.sum())} quarantined")
+        return {
+            'errors': errors,
+            'bitmap': pd.Series(bitmap, index=df.index),
+            'valid': df[~bad_rows],
+            'quarantine': quarantine,
+            'error_counts': error_counts[error_counts > 0].to_dict()
+        }
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = 'manifest.json'
+
+
+def _file_digest(path):
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """Typed columnar cache of a CSV file, one .npy file per column.
+
+    The first read parses the CSV and writes every column with the dtype
+    pandas inferred: numeric columns as they are, text columns as integer
+    codes plus a vocabulary. The cache is keyed by the source's size, mtime
+    and SHA-256; a changed size or content rebuilds it, and a file that was
+    only touched is re-hashed once and then trusted again. Loads memory-map
+    only the requested columns.
+    """
+
+    def __init__(self, source_path, cache_dir=None):
+
+        self.source_path = source_path
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(source_path)), '.cache',
+                                     os.path.basename(source_path))
+        self.cache_dir = cache_dir
+        self.last_load = None
+
+    def _read_manifest(self):
+
+        try:
+            with open(os.path.join(self.cache_dir, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, manifest=None):
+        """Whether the cache matches the source's size, mtime and content"""
+        manifest = manifest or self._read_manifest()
+        if manifest is None:
+            return False
+        stat = os.stat(self.source_path)
+        if stat.st_size != manifest['size']:
+            return False
+        if stat.st_mtime_ns == manifest['mtime_ns']:
+            return True
+
+        # Same size, new mtime: only the content hash can tell a touch from an edit
+        if _file_digest(self.source_path) != manifest['sha256']:
+            return False
+        manifest['mtime_ns'] = stat.st_mtime_ns
+        self._write_manifest(self.cache_dir, manifest)
+        return True
+
+    @staticmethod
+    def _write_manifest(directory, manifest):
+
+        path = os.path.join(directory, MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def build(self):
+        """Parse the CSV, write the columnar cache and return the full frame"""
+        stat = os.stat(self.source_path)
+        started = time.perf_counter()
+        df = pd.read_csv(self.source_path)
+        parse_seconds = time.perf_counter() - started
+
+        parent = os.path.dirname(self.cache_dir)
+        os.makedirs(parent, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix='.building_', dir=parent)
+        columns = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            entry = {'name': col, 'dtype': str(series.dtype), 'file': f"col{i}.npy"}
+            if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                np.save(os.path.join(work_dir, entry['file']), series.to_numpy())
+            else:
+                # Text columns become codes into a vocabulary; -1 marks a missing value
+                codes, vocabulary = pd.factorize(series, use_na_sentinel=True)
+                code_dtype = np.int8 if len(vocabulary) < 127 else np.int32
+                np.save(os.path.join(work_dir, entry['file']), codes.astype(code_dtype))
+                # JSON keeps the values' types, e.g. an object column mixing floats and text
+                entry['vocabulary'] = vocabulary.tolist()
+            columns.append(entry)
+
+        manifest = {
+            'source': os.path.basename(self.source_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': _file_digest(self.source_path),
+            'rows': len(df),
+            'parse_seconds': round(parse_seconds, 4),
+            'columns': columns
+        }
+        self._write_manifest(work_dir, manifest)
+
+        # Swap the finished directory in, so readers never see a partial cache
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+        os.replace(work_dir, self.cache_dir)
+
+        self.last_load = {'source': 'csv', 'seconds': round(parse_seconds, 4),
+                          'parse_seconds': round(parse_seconds, 4)}
+        return df
+
+    def _load_cached(self, manifest, columns):
+
+        started = time.perf_counter()
+        data = {}
+        for entry in manifest['columns']:
+            if entry['name'] not in columns:
+                continue
+            values = np.load(os.path.join(self.cache_dir, entry['file']), mmap_mode='r')
+            if 'vocabulary' in entry:
+                vocabulary = pd.Index(entry['vocabulary'], dtype=entry['dtype'])
+                codes = np.asarray(values, dtype=np.intp)
+                # Index.take ignores allow_fill without a fill value, so -1 is masked here
+                values = vocabulary.take(codes).where(codes >= 0)
+            data[entry['name']] = values
+        df = pd.DataFrame(data, columns=[col for col in columns if col in data], copy=True)
+
+        self.last_load = {'source': 'cache', 'seconds': round(time.perf_counter() - started, 4),
+                          'parse_seconds': manifest['parse_seconds']}
+        return df
+
+    def load(self, columns=None, exclude=None):
+        """Return the dataset, from the cache when it is fresh, with only the wanted columns"""
+        manifest = self._read_manifest()
+        if not self.is_fresh(manifest):
+            df = self.build()
+            keep = [col for col in (columns or df.columns) if exclude is None or col not in exclude]
+            return df[keep]
+
+        keep = [entry['name'] for entry in manifest['columns']] if columns is None else list(columns)
+        keep = [col for col in keep if exclude is None or col not in exclude]
+        return self._load_cached(manifest, keep)
+
+
+def load_dataset(path, columns=None, exclude=None, cache_dir=None, verbose=True):
+    """Load a CSV through its columnar cache and report parse time against cache-load time"""
+    cache = DatasetCache(path, cache_dir)
+    df = cache.load(columns, exclude)
+    if verbose:
+        report = cache.last_load
+        if report['source'] == 'csv':
+            print(f"Parsed {path} in {report['seconds']:.3f}s and wrote the columnar cache")
+        else:
+            print(f"Loaded {df.shape[1]} columns from the columnar cache in {report['seconds']:.3f}s "
+                  f"(CSV parse took {report['parse_seconds']:.3f}s)")
+    return df
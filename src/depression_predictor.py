@@ -1,56 +1,134 @@
 import os
+import time
 import warnings
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import train_test_split, GridSearchCV, ParameterGrid
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import classification_report, confusion_matrix, roc_curve, auc
 from sklearn.impute import SimpleImputer
+from src.core_scheduler import CoreScheduler
+from src.data_cleaning import PREDICTOR_RULES, UNUSED_COLUMNS
+from src.dataset_cache import load_dataset
+from src.prediction_cache import PredictionCache
+from src.stage_profiler import StageProfiler
+from src.streaming_stats import summarize_csv
+
+# Plotting and metrics libraries are imported inside the methods that use them,
+# so importing this module for prediction does not pay for them
+
+# Hyperparameter search strategies accepted by StudentDepressionPredictor
+SEARCH_MODES = ('grid', 'halving', 'halving_trees', 'fold_cached', 'warm_start', 'oob',
+                'distributed')
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
 
 class StudentDepressionPredictor:
-    def __init__(self, filepath):
+    def __init__(self, filepath, profile_path=None, prometheus_path=None,
+                 search_mode='grid', compare_search=False, fold_cache_dir=None,
+                 tree_checkpoints=None, oob_confirm_top=0, cores=None, result_store=None,
+                 search_queue='search_queue.sqlite', local_workers=None, stats_workers=None):
 
         print("=== STUDENT DEPRESSION PREDICTION PROJECT ===\n")
 
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{search_mode}', expected one of {SEARCH_MODES}")
+        if result_store and search_mode not in ('fold_cached', 'warm_start'):
+            raise ValueError("A result store needs the 'fold_cached' or 'warm_start' search mode")
+        self.search_mode = search_mode
+        self.compare_search = compare_search
+        self.fold_cache_dir = fold_cache_dir
+        self.tree_checkpoints = tree_checkpoints
+        self.oob_confirm_top = oob_confirm_top
+        self.result_store = result_store
+        self.search_queue = search_queue
+        self.local_workers = local_workers
+        # Workers for the streaming summary of the raw file; None summarizes the loaded frame
+        self.stats_workers = stats_workers
+        self.search_report = None
+
+        # Every stage is timed and measured; see StageProfiler
+        self.profiler = StageProfiler('training')
+        # Training fits share a fixed core budget; see CoreScheduler
+        self.scheduler = CoreScheduler(cores)
+
         # Load and explore data
-        self.df = self.load_and_explore_data(filepath)
+        self.df = self.profiler.run('load_and_explore_data', self.load_and_explore_data, filepath)
 
         # Clean data
-        self.df = self.clean_data(self.df)
+        self.df = self.profiler.run('clean_data', self.clean_data, self.df)
 
         # Visualize data
-        self.visualize_data(self.df)
+        self.profiler.run('visualize_data', self.visualize_data, self.df)
 
         # Prepare data for modeling
-        self.X_train, self.X_test, self.y_train, self.y_test, self.preprocessor = self.prepare_data(
-            self.df)
+        self.X_train, self.X_test, self.y_train, self.y_test, self.preprocessor = self.profiler.run(
+            'prepare_data', self.prepare_data, self.df)
 
         # Train the model
-        self.model = self.train_and_evaluate_model(
+        self.model = self.profiler.run(
+            'train_and_evaluate_model', self.train_and_evaluate_model,
             self.X_train, self.y_train, self.X_test, self.y_test, self.preprocessor)
 
         # Analyze feature importance
-        self.feature_importance = self.analyze_feature_importance(self.model)
+        self.feature_importance = self.profiler.run(
+            'analyze_feature_importance', self.analyze_feature_importance, self.model)
+
+        # Report which stage dominated this run
+        self.profiler.print_summary()
+        self.scheduler.print_summary()
+        if profile_path:
+            self.profiler.write_json(profile_path)
+            print(f"Stage profile saved to {profile_path}")
+        if prometheus_path:
+            self.profiler.write_prometheus(prometheus_path)
+            print(f"Stage metrics saved to {prometheus_path}")
+
+        # Cache predictions so repeated student profiles skip the forest
+        self.prediction_cache = PredictionCache(
+            PredictionCache.hash_object(self.model))
 
         print("\n=== MODEL TRAINING COMPLETED ===")
 
     def load_and_explore_data(self, filepath):
-        # Load data
-        df = pd.read_csv(filepath)
+        # Load data, from the typed columnar cache after the first parse
+        df = load_dataset(filepath, exclude=UNUSED_COLUMNS)
         print(f"Data loaded successfully. Shape: {df.shape}")
 
+        # Variables for statistics
+        stat_variables = [
+            'Age',
+            'Academic Pressure',
+            'CGPA',
+            'Study Satisfaction',
+            'Work/Study Hours',
+            'Depression'
+        ]
+
+        if self.stats_workers:
+            # One streaming pass over the file in chunks: merged moments, median from a sketch.
+            # Training still needs the frame above, so this reads the file a second time;
+            # `python -m src.streaming_stats` gives the summary alone without loading it
+            summary = summarize_csv(filepath, stat_variables, 'Depression', exclude=UNUSED_COLUMNS,
+                                    workers=self.stats_workers)
+            n_rows = summary.rows
+            missing = summary.missing_counts()
+            target_counts = summary.target_distribution()
+            depression_rate = summary.target_mean()
+            stats_df = summary.stats_frame()
+        else:
+            n_rows = len(df)
+            missing = df.isnull().sum()
+            target_counts = df['Depression'].value_counts()
+            depression_rate = df['Depression'].mean()
+            stats_df = df[stat_variables].describe().T
+
         # Missing values analysis
-        missing = df.isnull().sum()
-        missing_percentage = (missing / len(df) * 100).round(2)
+        missing_percentage = (missing / n_rows * 100).round(2)
 
         if missing.sum() > 0:
             print("\nMissing values summary:")
@@ -64,25 +142,12 @@ class StudentDepressionPredictor:
 
         # Target variable distribution
         print("\nTarget variable distribution (Depression):")
-        print(df['Depression'].value_counts())
+        print(target_counts)
         print(
-            f"Percentage of depression cases: {df['Depression'].mean()*100:.2f}%")
+            f"Percentage of depression cases: {depression_rate*100:.2f}%")
 
         print("\n--- DESCRIPTIVE STATISTICS FOR KEY VARIABLES ---")
 
-        # Variables for statistics
-        stat_variables = [
-            'Age',
-            'Academic Pressure',
-            'CGPA',
-            'Study Satisfaction',
-            'Work/Study Hours',
-            'Depression'
-        ]
-
-        # Statistics table
-        stats_df = df[stat_variables].describe().T
-
         # Reformatting table
         stats_table = pd.DataFrame({
             'Variable': stats_df.index,
@@ -101,33 +166,8 @@ class StudentDepressionPredictor:
     def clean_data(self, df):
 
         print("\n--- DATA CLEANING ---")
-        # Remove columns city, work pressure and job satisfaction
-        columns_to_remove = ['City', 'Work Pressure', 'Job Satisfaction']
-        for col in columns_to_remove:
-            if col in df.columns:
-                print(f"Removing '{col}' variable. Shape before: {df.shape}")
-                df = df.drop(col, axis=1)
-                print(f"Shape after removing '{col}': {df.shape}")
-
-        # Select only students
-        if 'Profession' in df.columns:
-            print(
-                f"Filtering only 'Student' in Profession. Rows before: {len(df)}")
-            df = df[df['Profession'] == 'Student']
-            print(f"Rows after filtering 'Student': {len(df)}")
-
-        # Remove "Others", "?" and "unknown"
-        columns_to_clean = ['Sleep Duration', 'Financial Stress']
-        for col in columns_to_clean:
-            if col in df.columns:
-                print(
-                    f"Removing problematic values from {col}. Rows before: {len(df)}")
-                df = df[~df[col].isin(['Others', '?', 'unknown'])]
-                print(f"Rows after cleaning {col}: {len(df)}")
-
-        # Remove ID column
-        if 'id' in df.columns:
-            df = df.drop('id', axis=1)
+        # Unused columns, non-students and "Others", "?" and "unknown" answers, in one pass
+        df = PREDICTOR_RULES.apply(df, verbose=True)
 
         print(f"\nFinal dataset shape after cleaning: {df.shape}")
         return df
@@ -141,6 +181,9 @@ class StudentDepressionPredictor:
 
     def visualize_data(self, df):
 
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         print("\n--- DATA VISUALIZATION ---")
 
         # image directory
@@ -271,8 +314,92 @@ class StudentDepressionPredictor:
 
         return X_train, X_test, y_train, y_test, preprocessor
 
+    def build_search(self, pipeline, param_grid, search_mode, n_jobs=-1):
+
+        if search_mode == 'grid':
+            return GridSearchCV(pipeline, param_grid, cv=5, scoring='roc_auc', n_jobs=n_jobs)
+
+        if search_mode in ('fold_cached', 'warm_start'):
+            # Same folds and fits as the grid, but the preprocessing is fitted once per fold;
+            # warm_start also grows each forest once through every n_estimators checkpoint
+            from src.hyperparameter_search import FoldCachedSearchCV
+            from src.search_store import SearchResultStore
+
+            # Fold scores from earlier runs on the same data are reused, new ones stored
+            store = SearchResultStore(self.result_store) if self.result_store else None
+            return FoldCachedSearchCV(pipeline, param_grid, cv=5, scoring='roc_auc', n_jobs=n_jobs,
+                                      cache_dir=self.fold_cache_dir,
+                                      warm_start=search_mode == 'warm_start', result_store=store)
+
+        if search_mode == 'distributed':
+            # Candidate x fold tasks go to a queue file; workers anywhere sharing it score them
+            from src.search_queue import DistributedSearchCV
+            local_workers = self.local_workers if self.local_workers is not None else n_jobs
+            return DistributedSearchCV(pipeline, param_grid, self.search_queue, cv=5,
+                                       scoring='roc_auc', local_workers=local_workers)
+
+        if search_mode == 'oob':
+            # One fit per candidate on the whole training split, ranked by out-of-bag ROC-AUC
+            from src.hyperparameter_search import OOBSearchCV
+            return OOBSearchCV(pipeline, param_grid, cv=5, scoring='roc_auc', n_jobs=n_jobs,
+                               confirm_top=self.oob_confirm_top)
+
+        # Successive halving: every candidate is scored on a small budget and only
+        # the best third (rows) or half (trees) moves on to the next, larger one
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingGridSearchCV
+
+        if search_mode == 'halving':
+            # Training rows are the resource; the last round uses all of them
+            return HalvingGridSearchCV(
+                pipeline, param_grid, cv=5, scoring='roc_auc', n_jobs=n_jobs,
+                resource='n_samples', factor=3, min_resources='exhaust', random_state=42)
+
+        # Trees are the resource, so n_estimators leaves the grid and grows per round
+        max_trees = max(param_grid['classifier__n_estimators'])
+        tree_grid = {name: values for name, values in param_grid.items()
+                     if name != 'classifier__n_estimators'}
+        return HalvingGridSearchCV(
+            pipeline, tree_grid, cv=5, scoring='roc_auc', n_jobs=n_jobs,
+            resource='classifier__n_estimators', factor=2,
+            min_resources=max(max_trees // 8, 1), max_resources=max_trees, random_state=42)
+
+    @staticmethod
+    def _halving_rounds(n, factor):
+
+        # 1 + floor(log(n, factor)), as HalvingGridSearchCV counts rounds
+        rounds = 1
+        while factor ** rounds <= n:
+            rounds += 1
+        return rounds
+
+    def count_search_fits(self, param_grid, search_mode, cv=5):
+        """Number of fits build_search can run side by side, for splitting the cores"""
+        n_candidates = len(ParameterGrid(param_grid))
+        if search_mode == 'oob':
+            # One fit per candidate on the whole training split
+            return n_candidates
+        if search_mode == 'warm_start':
+            # One forest per fold grows through every n_estimators checkpoint
+            return n_candidates // len(param_grid['classifier__n_estimators']) * cv
+        if search_mode == 'halving':
+            # Plan for the last round, whose few fits use all the training rows
+            rounds = self._halving_rounds(n_candidates, 3)
+            return -(-n_candidates // 3 ** (rounds - 1)) * cv
+        if search_mode == 'halving_trees':
+            max_trees = max(param_grid['classifier__n_estimators'])
+            n_candidates //= len(param_grid['classifier__n_estimators'])
+            rounds = min(self._halving_rounds(n_candidates, 2),
+                         self._halving_rounds(max_trees // max(max_trees // 8, 1), 2))
+            return -(-n_candidates // 2 ** (rounds - 1)) * cv
+        return n_candidates * cv
+
     def train_and_evaluate_model(self, X_train, y_train, X_test, y_test, preprocessor):
 
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        from sklearn.metrics import classification_report, confusion_matrix, roc_curve, auc
+
         print("\n--- MODEL TRAINING ---")
 
         # images directory if it doesn't exist
@@ -291,18 +418,90 @@ class StudentDepressionPredictor:
             'classifier__min_samples_split': [2, 5],
             'classifier__min_samples_leaf': [1, 2]
         }
+        if self.tree_checkpoints:
+            param_grid['classifier__n_estimators'] = sorted(set(self.tree_checkpoints))
+
+        # Split the cores between candidate x fold fits and the trees of each forest
+        outer_jobs, inner_jobs = self.scheduler.plan(
+            self.count_search_fits(param_grid, self.search_mode))
+        pipeline.set_params(classifier__n_jobs=inner_jobs)
 
         # Hyperparameter search using gridsearch - optimiazation
         print("Performing hyperparameter tuning (this may take a while)...")
-        grid_search = GridSearchCV(
-            pipeline, param_grid, cv=5, scoring='roc_auc', n_jobs=-1)
-        grid_search.fit(X_train, y_train)
+        print(f"Search mode: {self.search_mode} ({outer_jobs} parallel fits x {inner_jobs} "
+              f"tree threads on {self.scheduler.cores} cores)")
+        grid_search = self.build_search(pipeline, param_grid, self.search_mode, outer_jobs)
+        started = time.perf_counter()
+        with self.scheduler.session('hyperparameter_search', outer_jobs, inner_jobs):
+            grid_search.fit(X_train, y_train)
+        search_seconds = time.perf_counter() - started
 
         print("\nBest hyperparameters found:")
         print(grid_search.best_params_)
-
-        # Evaluation
+        print(f"Best CV ROC-AUC: {grid_search.best_score_:.4f} ({search_seconds:.1f}s)")
+
+        self.search_report = {
+            'search_mode': self.search_mode,
+            'best_params': grid_search.best_params_,
+            'best_score': float(grid_search.best_score_),
+            'seconds': round(search_seconds, 2),
+            'cores': self.scheduler.report()
+        }
+        if hasattr(grid_search, 'cache_report_'):
+            report = grid_search.cache_report_
+            self.search_report['fold_cache'] = report
+            print(f"Fold cache ({report['cache']}): {report['cache_mb']} MB held, "
+                  f"{report['preprocessing_fits_avoided']} preprocessing fits avoided, "
+                  f"~{report['estimated_seconds_saved']}s of preprocessing saved")
+            if 'stored_results_reused' in report:
+                print(f"Result store: {report['stored_results_reused']} fold scores reused, "
+                      f"{report['results_computed']} computed")
+            if 'trees_grown' in report:
+                print(f"Warm start: {report['trees_grown']} trees grown instead of "
+                      f"{report['trees_without_warm_start']}")
+        if hasattr(grid_search, 'queue_report_'):
+            self.search_report['queue'] = grid_search.queue_report_
+        if hasattr(grid_search, 'oob_report_'):
+            report = grid_search.oob_report_
+            self.search_report['oob'] = report
+            print(f"OOB: {report['oob_fits']} fits in {report['oob_seconds']}s")
+            if 'confirm_agreement' in report:
+                print(f"CV confirmation of the top {report['confirmed']}: "
+                      f"Kendall tau {report['confirm_agreement']['kendall_tau']}")
+
+        # Optionally measure the shortcut against the exhaustive grid
+        if self.compare_search and self.search_mode != 'grid':
+            print("Running the exhaustive grid for comparison...")
+            outer_jobs, inner_jobs = self.scheduler.plan(self.count_search_fits(param_grid, 'grid'))
+            pipeline.set_params(classifier__n_jobs=inner_jobs)
+            exhaustive = self.build_search(pipeline, param_grid, 'grid', outer_jobs)
+            started = time.perf_counter()
+            with self.scheduler.session('exhaustive_grid', outer_jobs, inner_jobs):
+                exhaustive.fit(X_train, y_train)
+            grid_seconds = time.perf_counter() - started
+
+            self.search_report.update({
+                'grid_best_params': exhaustive.best_params_,
+                'grid_best_score': float(exhaustive.best_score_),
+                'grid_seconds': round(grid_seconds, 2),
+                'score_gap': float(exhaustive.best_score_ - grid_search.best_score_),
+                'speedup': round(grid_seconds / search_seconds, 2) if search_seconds else None
+            })
+            # Ranking agreement, for the modes that score every grid candidate
+            if grid_search.cv_results_['params'] == exhaustive.cv_results_['params']:
+                from src.hyperparameter_search import rank_agreement
+                agreement = rank_agreement(grid_search.cv_results_['mean_test_score'],
+                                           exhaustive.cv_results_['mean_test_score'])
+                self.search_report['rank_agreement'] = agreement
+                print(f"Ranking agreement with the grid: Kendall tau {agreement['kendall_tau']}, "
+                      f"same best candidate: {agreement['same_best']}")
+            print(f"Exhaustive grid: ROC-AUC {exhaustive.best_score_:.4f} in {grid_seconds:.1f}s; "
+                  f"{self.search_mode} is {self.search_report['score_gap']:.4f} below "
+                  f"and {self.search_report['speedup']}x faster")
+
+        # Evaluation; the tree threads were sized for the search, not for scoring
         best_model = grid_search.best_estimator_
+        best_model.set_params(classifier__n_jobs=None)
         y_pred = best_model.predict(X_test)
         y_prob = best_model.predict_proba(X_test)[:, 1]
 
@@ -341,6 +540,9 @@ class StudentDepressionPredictor:
 
     def analyze_feature_importance(self, model):
 
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         print("\n--- FEATURE IMPORTANCE ANALYSIS ---")
 
         # Create images directory if it doesn't exist
@@ -413,8 +615,10 @@ class StudentDepressionPredictor:
 
         # Prediction
         try:
-            # Predict probabilities
-            probability = self.model.predict_proba(new_data)[:, 1]
+            # Predict probabilities, scoring only rows the cache has not seen
+            encoded_data = self.model[0].transform(new_data)
+            probability = self.prediction_cache.predict_proba(
+                encoded_data, self.model[-1].predict_proba)[:, 1]
 
             # Calculate feature contributions
             importances = self.model[-1].feature_importances_
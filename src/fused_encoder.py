@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+
+class FusedEncoder:
+    """Inference-only replacement for the fitted ColumnTransformer.
+
+    Numeric columns are imputed and standardized in one pass, and each
+    categorical column is dictionary-encoded against its fitted vocabulary
+    and scattered into a preallocated float32 one-hot matrix, so the cost
+    grows with rows x source columns rather than rows x one-hot width.
+    """
+
+    def __init__(self, numeric_columns, numeric_slice, mean, scale, numeric_fill,
+                 categorical_columns, vocabularies, categorical_offsets,
+                 categorical_fill, n_output_features, handle_unknown='ignore',
+                 feature_names=None):
+
+        self.numeric_columns = list(numeric_columns)
+        self.numeric_slice = numeric_slice
+        self.mean = mean
+        self.scale = scale
+        self.numeric_fill = numeric_fill
+        self.categorical_columns = list(categorical_columns)
+        self.vocabularies = [np.asarray(vocab) for vocab in vocabularies]
+        self.categorical_offsets = np.asarray(categorical_offsets, dtype=np.int64)
+        self.categorical_fill = list(categorical_fill)
+        self.n_output_features = int(n_output_features)
+        self.handle_unknown = handle_unknown
+        self.feature_names = feature_names
+
+        # Hash tables mapping each category to its one-hot position
+        self._lookups = [pd.Index(vocab) for vocab in self.vocabularies]
+
+    @staticmethod
+    def _split_steps(transformer):
+
+        # Either a bare transformer or an (imputer, transformer) pipeline
+        if hasattr(transformer, 'steps'):
+            steps = [step for _, step in transformer.steps]
+        else:
+            steps = [transformer]
+
+        imputer = None
+        for step in steps[:-1]:
+            if hasattr(step, 'statistics_'):
+                imputer = step
+            else:
+                raise ValueError(f"Unsupported preprocessing step: {type(step).__name__}")
+        return imputer, steps[-1]
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor):
+
+        if not hasattr(preprocessor, 'transformers_'):
+            raise ValueError("Preprocessor is not a fitted ColumnTransformer")
+
+        numeric_columns, mean, scale, numeric_fill = [], [], [], []
+        numeric_slice = slice(0, 0)
+        categorical_columns, vocabularies, offsets, categorical_fill = [], [], [], []
+        handle_unknown = 'ignore'
+        position = 0
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == 'drop' or len(columns) == 0:
+                continue
+            if transformer == 'passthrough':
+                raise ValueError("Passthrough columns are not supported")
+
+            imputer, final = cls._split_steps(transformer)
+            fills = imputer.statistics_ if imputer is not None else [None] * len(columns)
+
+            if hasattr(final, 'categories_'):
+                # One-hot encoded block
+                if getattr(final, 'drop_idx_', None) is not None:
+                    raise ValueError("OneHotEncoder with drop is not supported")
+                if getattr(final, 'infrequent_categories_', None) is not None and \
+                        any(cats is not None for cats in final.infrequent_categories_):
+                    raise ValueError("OneHotEncoder with infrequent categories is not supported")
+                handle_unknown = final.handle_unknown
+                for column, vocab, fill in zip(columns, final.categories_, fills):
+                    categorical_columns.append(column)
+                    vocabularies.append(vocab)
+                    offsets.append(position)
+                    categorical_fill.append(fill)
+                    position += len(vocab)
+            elif hasattr(final, 'n_features_in_') and hasattr(final, 'with_mean'):
+                # Standardized numeric block, must be contiguous in the output
+                if numeric_columns:
+                    raise ValueError("Only one numeric block is supported")
+                n_cols = len(columns)
+                numeric_columns = list(columns)
+                mean = final.mean_ if final.mean_ is not None and final.with_mean else np.zeros(n_cols)
+                scale = final.scale_ if final.scale_ is not None else np.ones(n_cols)
+                numeric_fill = np.array([np.nan if f is None else f for f in fills], dtype=np.float64)
+                numeric_slice = slice(position, position + n_cols)
+                position += n_cols
+            else:
+                raise ValueError(f"Unsupported transformer: {type(final).__name__}")
+
+        try:
+            feature_names = list(preprocessor.get_feature_names_out())
+        except Exception:
+            feature_names = None
+
+        return cls(
+            numeric_columns=numeric_columns,
+            numeric_slice=numeric_slice,
+            mean=np.asarray(mean, dtype=np.float64),
+            scale=np.asarray(scale, dtype=np.float64),
+            numeric_fill=np.asarray(numeric_fill, dtype=np.float64),
+            categorical_columns=categorical_columns,
+            vocabularies=vocabularies,
+            categorical_offsets=offsets,
+            categorical_fill=categorical_fill,
+            n_output_features=position,
+            handle_unknown=handle_unknown,
+            feature_names=feature_names
+        )
+
+    @property
+    def input_columns(self):
+        return self.numeric_columns + self.categorical_columns
+
+    @property
+    def categorical_slices(self):
+        """One-hot output slice for each categorical source column"""
+        return {
+            column: slice(offset, offset + len(vocab))
+            for column, offset, vocab in zip(
+                self.categorical_columns, self.categorical_offsets, self.vocabularies)
+        }
+
+    @property
+    def csv_dtypes(self):
+        """read_csv dtypes that keep text-valued categorical columns as text.
+
+        Without them a chunk with no '?' in Financial Stress parses as float,
+        and 1.0 does not match the fitted category '1.0'.
+        """
+        return {
+            column: str
+            for column, vocab in zip(self.categorical_columns, self.vocabularies)
+            if vocab.dtype.kind in 'UO'
+        }
+
+    def get_feature_names_out(self):
+        return np.asarray(self.feature_names, dtype=object)
+
+    def encode_categoricals(self, X):
+        """Return the vocabulary code of every categorical cell, -1 for unknown values"""
+        codes = np.empty((len(X), len(self.categorical_columns)), dtype=np.int32)
+        for j, (column, lookup, fill) in enumerate(
+                zip(self.categorical_columns, self._lookups, self.categorical_fill)):
+            values = X[column]
+            if fill is not None and values.isna().any():
+                values = values.astype(object).fillna(fill)
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Look each category up once and index by the integer codes; -1 stays unknown
+                category_codes = np.append(lookup.get_indexer(values.cat.categories), -1)
+                codes[:, j] = category_codes[values.cat.codes.to_numpy()]
+            else:
+                codes[:, j] = lookup.get_indexer(values)
+        return codes
+
+    def transform(self, X):
+
+        missing = [col for col in self.input_columns if col not in X.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+        n_rows = len(X)
+        out = np.zeros((n_rows, self.n_output_features), dtype=np.float32)
+
+        # Numeric block: impute and standardize straight into the output
+        if self.numeric_columns:
+            values = X[self.numeric_columns].to_numpy(dtype=np.float64, copy=True)
+            if not np.isnan(self.numeric_fill).all():
+                holes = np.isnan(values)
+                if holes.any():
+                    values = np.where(holes, self.numeric_fill, values)
+            values -= self.mean
+            values /= self.scale
+            out[:, self.numeric_slice] = values
+
+        # Categorical block: one hash lookup per cell, then a single scatter
+        if self.categorical_columns:
+            codes = self.encode_categoricals(X)
+            known = codes >= 0
+            if self.handle_unknown == 'error' and not known.all():
+                column = self.categorical_columns[int(np.argmin(known.all(axis=0)))]
+                raise ValueError(f"Found unknown categories in column '{column}'")
+
+            flat_index = (np.arange(n_rows, dtype=np.int64)[:, None] * self.n_output_features
+                          + self.categorical_offsets + codes)
+            out.ravel()[flat_index[known]] = 1.0
+
+        return out
@@ -0,0 +1,431 @@
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.stats import kendalltau
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer, roc_auc_score
+from sklearn.model_selection import ParameterGrid, check_cv
+from sklearn.utils import check_array
+
+from src.search_store import dataset_fingerprint, search_context
+
+
+def _save_matrix(directory, name, matrix):
+    """Write a dense or CSR matrix as .npy files and map it back read-only"""
+    if sp.issparse(matrix):
+        matrix = matrix.tocsr()
+        parts = {}
+        for part in ('data', 'indices', 'indptr'):
+            path = os.path.join(directory, f"{name}_{part}.npy")
+            np.save(path, getattr(matrix, part))
+            parts[part] = np.load(path, mmap_mode='r')
+        return sp.csr_matrix((parts['data'], parts['indices'], parts['indptr']), shape=matrix.shape)
+
+    path = os.path.join(directory, f"{name}.npy")
+    np.save(path, np.ascontiguousarray(matrix))
+    return np.load(path, mmap_mode='r')
+
+
+def _matrix_bytes(matrix):
+
+    if sp.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+
+class FoldCache:
+    """Preprocessed train and validation matrices of every CV fold.
+
+    The preprocessor is fitted once per fold on that fold's training rows,
+    exactly as a Pipeline inside GridSearchCV would be, and the encoded
+    matrices are kept in memory or memory-mapped from cache_dir so every
+    classifier candidate reuses them.
+    """
+
+    def __init__(self, preprocessor, cv, cache_dir=None):
+
+        self.preprocessor = preprocessor
+        self.cv = cv
+        self.cache_dir = cache_dir
+        self.folds = []
+        self.seconds = 0.0
+        self._work_dir = None
+
+    def build(self, X, y):
+
+        started = time.perf_counter()
+        y = np.asarray(y)
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._work_dir = tempfile.mkdtemp(prefix='fold_cache_', dir=self.cache_dir)
+
+        for i, (train_index, test_index) in enumerate(self.cv.split(X, y)):
+            X_train = X.iloc[train_index] if hasattr(X, 'iloc') else X[train_index]
+            X_test = X.iloc[test_index] if hasattr(X, 'iloc') else X[test_index]
+            preprocessor = clone(self.preprocessor).fit(X_train, y[train_index])
+            X_train, X_test = preprocessor.transform(X_train), preprocessor.transform(X_test)
+
+            if self._work_dir is not None:
+                X_train = _save_matrix(self._work_dir, f"fold{i}_train", X_train)
+                X_test = _save_matrix(self._work_dir, f"fold{i}_test", X_test)
+            self.folds.append((X_train, y[train_index], X_test, y[test_index]))
+
+        self.seconds = time.perf_counter() - started
+        return self
+
+    @property
+    def nbytes(self):
+        return sum(_matrix_bytes(fold[0]) + _matrix_bytes(fold[2]) for fold in self.folds)
+
+    def close(self):
+
+        self.folds = []
+        if self._work_dir is not None:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
+            self._work_dir = None
+
+
+def _fit_and_score(classifier, params, fold, scorer):
+
+    X_train, y_train, X_test, y_test = fold
+    started = time.perf_counter()
+    classifier = clone(classifier).set_params(**params)
+    classifier.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+    return scorer(classifier, X_test, y_test), fit_seconds
+
+
+def _grow_and_score(classifier, params, checkpoints, fold):
+    """Grow one warm-started forest through the tree-count checkpoints of a fold.
+
+    The fold's predicted probabilities are accumulated tree by tree, so each
+    checkpoint is scored by adding only the trees grown since the previous one.
+    """
+    X_train, y_train, X_test, y_test = fold
+    forest = clone(classifier).set_params(warm_start=True, **params)
+    X_eval = check_array(X_test, accept_sparse='csr', dtype=np.float32)
+
+    proba_sum = None
+    scores, fit_seconds = [], []
+    started = time.perf_counter()
+    for n_trees in checkpoints:
+        n_before = len(getattr(forest, 'estimators_', []))
+        forest.set_params(n_estimators=n_trees)
+        forest.fit(X_train, y_train)
+
+        # Same summation order as RandomForestClassifier.predict_proba
+        for tree in forest.estimators_[n_before:]:
+            tree_proba = tree.predict_proba(X_eval, check_input=False)
+            proba_sum = tree_proba.copy() if proba_sum is None else proba_sum + tree_proba
+        scores.append(roc_auc_score(y_test == forest.classes_[1], proba_sum[:, 1] / n_trees))
+        # Growing to this checkpoint costs everything fitted so far
+        fit_seconds.append(time.perf_counter() - started)
+    return scores, fit_seconds
+
+
+def set_search_results(search, candidates, scores, fit_seconds, X, y):
+    """Set GridSearchCV-style result attributes from (candidates, folds) score arrays"""
+    mean_scores = scores.mean(axis=1)
+    # Same tie-breaking as GridSearchCV: the first of equal scores wins
+    ranks = np.empty(len(candidates), dtype=np.int32)
+    ranks[np.argsort(-mean_scores, kind='stable')] = np.arange(1, len(candidates) + 1)
+    search.cv_results_ = {
+        'params': candidates,
+        'mean_test_score': mean_scores,
+        'std_test_score': scores.std(axis=1),
+        'rank_test_score': ranks,
+        'mean_fit_time': fit_seconds.mean(axis=1)
+    }
+    for i in range(scores.shape[1]):
+        search.cv_results_[f"split{i}_test_score"] = scores[:, i]
+
+    search.best_index_ = int(np.argmax(mean_scores))
+    search.best_params_ = candidates[search.best_index_]
+    search.best_score_ = float(mean_scores[search.best_index_])
+
+    if search.refit:
+        search.best_estimator_ = clone(search.estimator).set_params(**search.best_params_)
+        search.best_estimator_.fit(X, y)
+
+
+def _fit_oob(classifier, params, X, y):
+    """Fit one bagged candidate on all rows and score its out-of-bag predictions"""
+    started = time.perf_counter()
+    forest = clone(classifier).set_params(bootstrap=True, oob_score=True, **params)
+    forest.fit(X, y)
+    fit_seconds = time.perf_counter() - started
+
+    # Rows that landed in every bootstrap sample have no out-of-bag vote;
+    # sklearn leaves their decision row all zeros
+    decision = forest.oob_decision_function_
+    voted = decision.sum(axis=1) > 0
+    y = np.asarray(y)
+    return roc_auc_score(y[voted] == forest.classes_[1], decision[voted, 1]), fit_seconds
+
+
+def rank_agreement(scores, reference_scores):
+    """Kendall tau between two score vectors over the same candidates, plus top-1 agreement"""
+    # Indexed rather than .statistic, which older SciPy results lack
+    tau = kendalltau(scores, reference_scores)[0]
+    return {
+        'kendall_tau': None if np.isnan(tau) else round(float(tau), 4),
+        'same_best': bool(np.argmax(scores) == np.argmax(reference_scores))
+    }
+
+
+class FoldCachedSearchCV:
+    """Grid search over a (preprocessor, classifier) pipeline with cached fold encodings.
+
+    Behaves like GridSearchCV for a two-step Pipeline whose grid only touches
+    the final step: same folds, same fits, same scores, but the preprocessing
+    is fitted and applied once per fold instead of once per candidate and
+    fold. Exposes best_params_, best_score_, best_estimator_ and cv_results_,
+    plus cache_report_ with the memory spent and the preprocessing avoided.
+
+    With warm_start=True the n_estimators values of the grid become
+    checkpoints: one forest per remaining configuration and fold is grown
+    through them, so the tree-count axis costs about as much as its largest
+    value. Scores are identical to fitting each tree count from scratch.
+
+    With a SearchResultStore, fold scores already stored for the same data
+    and search context are reused and every new one is stored as soon as it
+    finishes, so an interrupted or extended search resumes where it stopped.
+    """
+
+    def __init__(self, estimator, param_grid, cv=5, scoring='roc_auc', n_jobs=None,
+                 cache_dir=None, refit=True, warm_start=False, result_store=None):
+
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.refit = refit
+        self.warm_start = warm_start
+        self.result_store = result_store
+
+    def _split_pipeline(self):
+
+        (_, preprocessor), (classifier_name, classifier) = self.estimator.steps[0], self.estimator.steps[-1]
+        prefix = f"{classifier_name}__"
+        for name in ParameterGrid(self.param_grid).param_grid[0]:
+            if not name.startswith(prefix):
+                raise ValueError(f"Only '{prefix}' parameters can reuse cached folds, got '{name}'")
+        return preprocessor, classifier, prefix
+
+    def _record(self, params, fold_index, score, fit_seconds):
+
+        if self.result_store is not None:
+            self.result_store.record(self._fingerprint, self._context, params, fold_index,
+                                     score, fit_seconds)
+
+    def _evaluate(self, classifier, candidates, cache, scorer, stored):
+        """Fill (candidates, folds) arrays of scores and fit seconds, skipping stored entries"""
+        scores = np.zeros((len(candidates), self.n_splits_))
+        fit_seconds = np.zeros((len(candidates), self.n_splits_))
+        tasks = []
+        for index in range(len(candidates)):
+            for fold_index in range(self.n_splits_):
+                if (index, fold_index) in stored:
+                    scores[index, fold_index], fit_seconds[index, fold_index] = stored[index, fold_index]
+                else:
+                    tasks.append((index, fold_index))
+
+        # Results are consumed as they finish so each one is stored right away
+        results = Parallel(n_jobs=self.n_jobs, return_as='generator')(
+            delayed(_fit_and_score)(classifier, candidates[index], cache.folds[fold_index], scorer)
+            for index, fold_index in tasks)
+        for (index, fold_index), (score, seconds) in zip(tasks, results):
+            scores[index, fold_index], fit_seconds[index, fold_index] = score, seconds
+            self._record(candidates[index], fold_index, score, seconds)
+        return scores, fit_seconds
+
+    def _evaluate_warm_start(self, classifier, candidates, cache, stored):
+
+        if self.scoring != 'roc_auc':
+            raise ValueError("warm_start scoring supports 'roc_auc' only")
+
+        # Group candidates that differ only in their tree count
+        groups = {}
+        for index, params in enumerate(candidates):
+            others = {name: value for name, value in params.items() if name != 'n_estimators'}
+            key = tuple(sorted((name, repr(value)) for name, value in others.items()))
+            groups.setdefault(key, (others, []))[1].append((params.get('n_estimators', 100), index))
+
+        scores = np.zeros((len(candidates), self.n_splits_))
+        fit_seconds = np.zeros((len(candidates), self.n_splits_))
+        for (index, fold_index), (score, seconds) in stored.items():
+            scores[index, fold_index], fit_seconds[index, fold_index] = score, seconds
+
+        # A forest is regrown only if one of its checkpoints is missing from the store
+        tasks = []
+        for others, members in groups.values():
+            checkpoints = sorted(set(n_trees for n_trees, _ in members))
+            for fold_index in range(self.n_splits_):
+                if any((index, fold_index) not in stored for _, index in members):
+                    tasks.append((others, checkpoints, members, fold_index))
+
+        results = Parallel(n_jobs=self.n_jobs, return_as='generator')(
+            delayed(_grow_and_score)(classifier, others, checkpoints, cache.folds[fold_index])
+            for others, checkpoints, _, fold_index in tasks)
+
+        self.trees_grown_ = 0
+        for (_, checkpoints, members, fold_index), (task_scores, task_seconds) in zip(tasks, results):
+            self.trees_grown_ += checkpoints[-1]
+            for n_trees, index in members:
+                position = checkpoints.index(n_trees)
+                scores[index, fold_index] = task_scores[position]
+                fit_seconds[index, fold_index] = task_seconds[position]
+                self._record(candidates[index], fold_index, task_scores[position],
+                             task_seconds[position])
+        return scores, fit_seconds
+
+    def fit(self, X, y):
+
+        started = time.perf_counter()
+        preprocessor, classifier, prefix = self._split_pipeline()
+        cv = check_cv(self.cv, y, classifier=True)
+        scorer = get_scorer(self.scoring)
+        candidates = list(ParameterGrid(self.param_grid))
+        classifier_candidates = [{name[len(prefix):]: value for name, value in params.items()}
+                                 for params in candidates]
+
+        self.n_splits_ = cv.get_n_splits(X, y)
+
+        stored = {}
+        if self.result_store is not None:
+            self._fingerprint = dataset_fingerprint(X, y)
+            self._context = search_context(preprocessor, classifier, cv, self.scoring)
+            stored = self.result_store.lookup(self._fingerprint, self._context, classifier_candidates)
+
+        # The folds are only encoded if something is left to evaluate
+        cache = FoldCache(preprocessor, cv, self.cache_dir)
+        encoded = len(stored) < len(candidates) * self.n_splits_
+        if encoded:
+            cache.build(X, y)
+        try:
+            if self.warm_start:
+                scores, fit_seconds = self._evaluate_warm_start(
+                    classifier, classifier_candidates, cache, stored)
+            else:
+                scores, fit_seconds = self._evaluate(
+                    classifier, classifier_candidates, cache, scorer, stored)
+            cache_bytes = cache.nbytes
+        finally:
+            cache.close()
+
+        set_search_results(self, candidates, scores, fit_seconds, X, y)
+
+        n_folds = self.n_splits_
+        self.cache_report_ = {
+            'cache': 'mmap' if self.cache_dir is not None else 'memory',
+            'cache_mb': round(cache_bytes / 1e6, 3),
+            'candidates': len(candidates),
+            'folds': n_folds,
+            'preprocessing_fits': n_folds if encoded else 0,
+            'preprocessing_fits_avoided': n_folds * len(candidates) - (n_folds if encoded else 0),
+            'preprocessing_seconds': round(cache.seconds, 3),
+            # What refitting the preprocessing for every candidate would have added
+            'estimated_seconds_saved': round(cache.seconds * (len(candidates) - 1), 3),
+            'search_seconds': round(time.perf_counter() - started, 3)
+        }
+        if self.result_store is not None:
+            self.cache_report_['stored_results_reused'] = len(stored)
+            self.cache_report_['results_computed'] = len(candidates) * n_folds - len(stored)
+        if self.warm_start:
+            trees_from_scratch = n_folds * sum(params.get('n_estimators', 100)
+                                               for params in classifier_candidates)
+            self.cache_report_['trees_grown'] = self.trees_grown_
+            self.cache_report_['trees_without_warm_start'] = trees_from_scratch
+        return self
+
+
+class OOBSearchCV:
+    """Ranks forest candidates by out-of-bag ROC-AUC from a single fit each.
+
+    The preprocessor is fitted once on the training split and every
+    candidate is fitted once on all of it with oob_score=True, about a fifth
+    of the fits of 5-fold CV. With confirm_top=k the k best OOB candidates
+    are re-scored with cached-fold CV and the best CV score wins; the
+    agreement between the two rankings on those k is kept in oob_report_.
+    """
+
+    def __init__(self, estimator, param_grid, cv=5, scoring='roc_auc', n_jobs=None,
+                 confirm_top=0, refit=True):
+
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.confirm_top = confirm_top
+        self.refit = refit
+
+    def fit(self, X, y):
+
+        if self.scoring != 'roc_auc':
+            raise ValueError("OOB scoring supports 'roc_auc' only")
+
+        started = time.perf_counter()
+        (_, preprocessor), (classifier_name, classifier) = self.estimator.steps[0], self.estimator.steps[-1]
+        prefix = f"{classifier_name}__"
+        candidates = list(ParameterGrid(self.param_grid))
+        classifier_candidates = [{name[len(prefix):]: value for name, value in params.items()}
+                                 for params in candidates]
+
+        y = np.asarray(y)
+        X_encoded = clone(preprocessor).fit_transform(X, y)
+        results = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_oob)(classifier, params, X_encoded, y) for params in classifier_candidates)
+        oob_scores = np.array([score for score, _ in results])
+        fit_seconds = np.array([seconds for _, seconds in results])
+        oob_seconds = time.perf_counter() - started
+
+        ranks = np.empty(len(candidates), dtype=np.int32)
+        ranks[np.argsort(-oob_scores, kind='stable')] = np.arange(1, len(candidates) + 1)
+        self.cv_results_ = {
+            'params': candidates,
+            'mean_test_score': oob_scores,
+            'rank_test_score': ranks,
+            'mean_fit_time': fit_seconds
+        }
+        self.best_index_ = int(np.argmax(oob_scores))
+        self.oob_report_ = {
+            'candidates': len(candidates),
+            'oob_fits': len(candidates),
+            'oob_seconds': round(oob_seconds, 3)
+        }
+
+        # Optionally re-score the best few with cross-validation
+        if self.confirm_top:
+            top = [int(i) for i in np.argsort(-oob_scores, kind='stable')[:self.confirm_top]]
+            confirm = FoldCachedSearchCV(
+                self.estimator, [{name: [candidates[i][name]] for name in candidates[i]} for i in top],
+                cv=self.cv, scoring=self.scoring, n_jobs=self.n_jobs, refit=False).fit(X, y)
+            cv_scores = confirm.cv_results_['mean_test_score']
+            self.cv_results_['confirm_test_score'] = np.full(len(candidates), np.nan)
+            self.cv_results_['confirm_test_score'][top] = cv_scores
+            self.best_index_ = top[int(np.argmax(cv_scores))]
+            self.oob_report_.update({
+                'confirmed': len(top),
+                'cv_fits': len(top) * confirm.n_splits_,
+                'confirm_seconds': confirm.cache_report_['search_seconds'],
+                'confirm_agreement': rank_agreement(oob_scores[top], cv_scores)
+            })
+
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(self.cv_results_.get(
+            'confirm_test_score', oob_scores)[self.best_index_])
+
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+
+        self.oob_report_['search_seconds'] = round(time.perf_counter() - started, 3)
+        return self
@@ -0,0 +1,87 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules the inference path must never pull in at import time
+FORBIDDEN_MODULES = ['sklearn', 'scipy', 'matplotlib', 'seaborn', 'plotly', 'shap', 'streamlit']
+
+# Cold-start budgets in milliseconds, measured in a fresh interpreter
+IMPORT_BUDGETS_MS = {
+    'src.inference': 1000,
+    'src.batch_scorer': 1000,
+    'src.scoring_service': 1000
+}
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module):
+    """Import module in a fresh interpreter and return its -X importtime records"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    # Lines look like "import time:   self [us] |  cumulative | imported package"
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        records.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
+    return records
+
+
+def check_module(module, budget_ms, forbidden=FORBIDDEN_MODULES):
+    """Return a report of one module's import time and forbidden dependencies"""
+    records = measure_import(module)
+    total_ms = sum(r['cumulative_ms'] for r in records if r['depth'] == 0)
+    forbidden_loaded = sorted(set(
+        r['module'].split('.')[0] for r in records if r['module'].split('.')[0] in forbidden))
+    # Direct imports of the checked module show where the time goes
+    slowest = sorted((r for r in records if r['depth'] == 1),
+                     key=lambda r: r['cumulative_ms'], reverse=True)[:5]
+
+    return {
+        'module': module,
+        'total_ms': total_ms,
+        'budget_ms': budget_ms,
+        'forbidden_loaded': forbidden_loaded,
+        'slowest': slowest,
+        'passed': total_ms <= budget_ms and not forbidden_loaded
+    }
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Check the cold-start import budget")
+    parser.add_argument('modules', nargs='*', help="Modules to check (default: all budgeted)")
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="Override the budget for every module")
+    args = parser.parse_args(argv)
+
+    modules = args.modules or list(IMPORT_BUDGETS_MS)
+    failed = False
+    for module in modules:
+        budget = args.budget_ms or IMPORT_BUDGETS_MS.get(module, 1000)
+        report = check_module(module, budget)
+        status = "OK" if report['passed'] else "FAIL"
+        print(f"[{status}] {module}: {report['total_ms']:.0f} ms (budget {budget:.0f} ms)")
+        for r in report['slowest']:
+            print(f"    {r['module']}: {r['cumulative_ms']:.0f} ms")
+        if report['forbidden_loaded']:
+            print(f"    Forbidden modules imported: {', '.join(report['forbidden_loaded'])}")
+        failed |= not report['passed']
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
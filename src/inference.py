@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from src.model_artifacts import load_scoring_artifacts
+from src.streaming_scorer import categorize_risk_scores
+
+# Kept free of plotting and training libraries (matplotlib, seaborn, plotly,
+# scikit-learn) at import time so scoring starts quickly; src/import_budget.py
+# enforces this. Only loading with compiled=False imports scikit-learn.
+
+
+class InferenceModel:
+    """Scores student rows with the exported model, without the training stack.
+
+    Scores with the CompiledForest from the memory-mapped artifacts, or with
+    compiled=False with the fitted sklearn forest, and exposes the same
+    risk scores as StudentDepressionPredictor.predict_depression.
+    """
+
+    def __init__(self, forest, encoder, feature_columns, model_hash=None):
+
+        self.forest = forest
+        self.encoder = encoder
+        self.feature_columns = list(feature_columns)
+        self.model_hash = model_hash
+
+    @classmethod
+    def load(cls, model_dir='model', compiled=True):
+
+        artifacts = load_scoring_artifacts(model_dir, compiled)
+        return cls(artifacts['forest'], artifacts['encoder'],
+                   artifacts['feature_columns'], artifacts['model_hash'])
+
+    def _prepare_rows(self, data):
+
+        # Accept a single student as a dictionary, like predict_depression does
+        if isinstance(data, dict):
+            data = pd.DataFrame([data])
+
+        # Only students are supported by this model
+        if 'Profession' in data.columns:
+            data = data[data['Profession'] == 'Student']
+
+        missing_cols = [col for col in self.feature_columns if col not in data.columns]
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {', '.join(missing_cols)}")
+        return data[self.feature_columns]
+
+    def predict_proba(self, data):
+        """Return the depression probability of every student row"""
+        data = self._prepare_rows(data)
+        if len(data) == 0:
+            return np.empty(0)
+        return self.forest.predict_proba(self.encoder.transform(data))[:, 1]
+
+    def predict_risk(self, data):
+        """Return the risk percentage and Low/Medium/High category per student row"""
+        data = self._prepare_rows(data)
+        risk = np.round(self.predict_proba(data) * 100, 2)
+        result = pd.DataFrame({'Depression Risk (%)': risk}, index=data.index)
+        result['Risk Category'] = categorize_risk_scores(result['Depression Risk (%)'])
+        return result
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.forest_compiler import CompiledForest
+from src.fused_encoder import FusedEncoder
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+ARRAY_DIR_NAME = 'arrays'
+# Exported versions kept on disk: the current one and the one it replaced
+KEEP_VERSIONS = 2
+
+FOREST_ARRAYS = ['feature', 'threshold', 'children', 'value', 'is_leaf', 'roots', 'classes_']
+ENCODER_ARRAYS = ['mean', 'scale', 'numeric_fill', 'categorical_offsets']
+
+
+def file_sha256(path):
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _json_value(value):
+
+    # NumPy scalars from fitted estimators are not JSON serializable
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _vocabulary_array(vocab):
+
+    # Object arrays cannot be memory-mapped, so strings become fixed-width unicode
+    vocab = np.asarray(vocab)
+    if vocab.dtype == object:
+        if all(isinstance(v, str) for v in vocab):
+            return vocab.astype(str)
+        return vocab.astype(np.float64)
+    return vocab
+
+
+def forest_hash(forest):
+    """Hash of the compiled forest's node arrays, the part of the model that decides a score
+
+    The same forest gives the same hash whether it was compiled from the
+    pickle or memory-mapped from an export.
+    """
+    digest = hashlib.sha256()
+    for name in FOREST_ARRAYS:
+        array = np.ascontiguousarray(getattr(forest, name))
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def _save_array(out_dir, name, array):
+
+    # Versions are written into a fresh directory, so nobody reads a file being written
+    path = os.path.join(out_dir, f"{name}.npy")
+    with open(path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+    return {
+        'sha256': file_sha256(path),
+        'shape': list(np.shape(array)),
+        'dtype': str(np.asarray(array).dtype)
+    }
+
+
+def _new_version_dir(out_dir, model_hash):
+
+    # A random suffix, so a pruned version's name is never handed out again
+    path = tempfile.mkdtemp(prefix=f"v{time.strftime('%Y%m%d-%H%M%S')}-{model_hash[:12]}-",
+                            dir=out_dir)
+    os.chmod(path, 0o755)
+    return os.path.basename(path)
+
+
+def _prune_versions(out_dir, current):
+
+    versions = [name for name in os.listdir(out_dir)
+                if name.startswith('v') and os.path.isdir(os.path.join(out_dir, name))]
+    versions.sort(key=lambda name: (os.path.getmtime(os.path.join(out_dir, name)), name))
+    older = [name for name in versions if name != current]
+    for name in older[:max(len(older) - (KEEP_VERSIONS - 1), 0)]:
+        # Processes still mapping these files keep their pages until they unmap them
+        shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+    for name in os.listdir(out_dir):
+        # Arrays of the older unversioned layout, written straight into out_dir
+        if name.endswith('.npy'):
+            os.remove(os.path.join(out_dir, name))
+
+
+def version_dir(array_dir, manifest):
+    """Directory holding the arrays the manifest describes"""
+    return os.path.join(array_dir, manifest.get('version', ''))
+
+
+def export_artifacts(model, preprocessor, feature_columns, out_dir, pickle_paths=()):
+    """Write the forest node arrays and preprocessor parameters as .npy files plus a manifest
+
+    Each export goes into a new version directory under out_dir. The
+    manifest in out_dir names that directory and is replaced atomically
+    once every array is written, so readers see either the old version or
+    the new one, never a mix. The sha256 of each file in pickle_paths is
+    recorded too, so the pickles can be checked against the manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    forest = CompiledForest.from_model(model)
+    encoder = FusedEncoder.from_preprocessor(preprocessor)
+    model_hash = forest_hash(forest)
+    version = _new_version_dir(out_dir, model_hash)
+    array_dir = os.path.join(out_dir, version)
+
+    files = {}
+    for name in FOREST_ARRAYS:
+        files[f"forest_{name.rstrip('_')}"] = _save_array(
+            array_dir, f"forest_{name.rstrip('_')}", getattr(forest, name))
+    if forest.feature_importances_ is not None:
+        files['forest_feature_importances'] = _save_array(
+            array_dir, 'forest_feature_importances', forest.feature_importances_)
+    for name in ENCODER_ARRAYS:
+        files[f"encoder_{name}"] = _save_array(array_dir, f"encoder_{name}", getattr(encoder, name))
+    for i, vocab in enumerate(encoder.vocabularies):
+        files[f"encoder_vocab_{i}"] = _save_array(
+            array_dir, f"encoder_vocab_{i}", _vocabulary_array(vocab))
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'version': version,
+        'model_hash': model_hash,
+        'feature_columns': list(feature_columns),
+        'forest': {
+            'n_features': forest.n_features,
+            'n_trees': forest.n_trees,
+            'node_count': forest.node_count
+        },
+        'encoder': {
+            'numeric_columns': encoder.numeric_columns,
+            'numeric_slice': [encoder.numeric_slice.start, encoder.numeric_slice.stop],
+            'categorical_columns': encoder.categorical_columns,
+            'categorical_fill': [_json_value(fill) for fill in encoder.categorical_fill],
+            'n_output_features': encoder.n_output_features,
+            'handle_unknown': encoder.handle_unknown,
+            'feature_names': [str(name) for name in encoder.feature_names or []]
+        },
+        'files': files,
+        'pickles': {os.path.basename(path): file_sha256(path) for path in pickle_paths}
+    }
+
+    # The manifest is swapped in last; it switches readers to the new version at once
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(manifest_path + '.tmp', manifest_path)
+    _prune_versions(out_dir, version)
+    return manifest
+
+
+def read_manifest(array_dir):
+
+    with open(os.path.join(array_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version: {manifest.get('format_version')}")
+    return manifest
+
+
+def verify_artifacts(array_dir, manifest=None):
+    """Return the names of files whose content no longer matches the manifest"""
+    manifest = manifest or read_manifest(array_dir)
+    files_dir = version_dir(array_dir, manifest)
+    mismatched = []
+    for name, info in manifest['files'].items():
+        path = os.path.join(files_dir, f"{name}.npy")
+        if not os.path.exists(path) or file_sha256(path) != info['sha256']:
+            mismatched.append(name)
+    return mismatched
+
+
+def verify_pickles(model_dir, manifest):
+    """Return the names of pickles that differ from the ones the manifest was exported with"""
+    mismatched = []
+    for name, sha256 in manifest.get('pickles', {}).items():
+        path = os.path.join(model_dir, name)
+        if not os.path.exists(path) or file_sha256(path) != sha256:
+            mismatched.append(name)
+    return mismatched
+
+
+def load_artifacts(array_dir, mmap_mode='r', verify=False):
+    """Memory-map an exported artifact set read-only and rebuild the scorer objects
+
+    Every process mapping the same files shares their physical pages, and
+    nothing is unpickled, so loading costs little more than reading the manifest.
+    """
+    manifest = read_manifest(array_dir)
+    if verify:
+        mismatched = verify_artifacts(array_dir, manifest)
+        if mismatched:
+            raise ValueError(f"Artifact files do not match the manifest: {', '.join(mismatched)}")
+
+    files_dir = version_dir(array_dir, manifest)
+
+    def array(name):
+        return np.load(os.path.join(files_dir, f"{name}.npy"), mmap_mode=mmap_mode,
+                       allow_pickle=False)
+
+    forest_info = manifest['forest']
+    forest = CompiledForest(
+        feature=array('forest_feature'),
+        threshold=array('forest_threshold'),
+        children=array('forest_children'),
+        value=array('forest_value'),
+        is_leaf=array('forest_is_leaf'),
+        roots=array('forest_roots'),
+        n_features=forest_info['n_features'],
+        classes=array('forest_classes'),
+        feature_importances=(array('forest_feature_importances')
+                             if 'forest_feature_importances' in manifest['files'] else None)
+    )
+
+    encoder_info = manifest['encoder']
+    encoder = FusedEncoder(
+        numeric_columns=encoder_info['numeric_columns'],
+        numeric_slice=slice(*encoder_info['numeric_slice']),
+        mean=array('encoder_mean'),
+        scale=array('encoder_scale'),
+        numeric_fill=array('encoder_numeric_fill'),
+        categorical_columns=encoder_info['categorical_columns'],
+        vocabularies=[array(f"encoder_vocab_{i}")
+                      for i in range(len(encoder_info['categorical_columns']))],
+        categorical_offsets=array('encoder_categorical_offsets'),
+        categorical_fill=encoder_info['categorical_fill'],
+        n_output_features=encoder_info['n_output_features'],
+        handle_unknown=encoder_info['handle_unknown'],
+        feature_names=encoder_info['feature_names'] or None
+    )
+
+    return forest, encoder, manifest['feature_columns'], manifest
+
+
+def _load_forest_pickle(model_dir):
+
+    with open(os.path.join(model_dir, 'depression_model.pkl'), 'rb') as f_model:
+        model = pickle.load(f_model)
+    # Accept either the bare forest or a pipeline ending in one
+    return model[-1] if hasattr(model, 'steps') else model
+
+
+def _load_pickles(model_dir):
+
+    forest = _load_forest_pickle(model_dir)
+    with open(os.path.join(model_dir, 'preprocessor.pkl'), 'rb') as f_pre:
+        preprocessor = pickle.load(f_pre)
+    with open(os.path.join(model_dir, 'feature_columns.pkl'), 'rb') as f_cols:
+        feature_columns = pickle.load(f_cols)
+    return forest, preprocessor, feature_columns
+
+
+def load_scoring_artifacts(model_dir='model', compiled=True):
+    """Load the scorer: a CompiledForest by default, or with compiled=False the sklearn forest
+
+    Returns a dict with the forest, fused encoder, feature columns and a
+    hash identifying the model version. The exported arrays are the source
+    whenever their manifest exists: the encoder, feature columns and hash
+    come from it, and only compiled=False unpickles the forest itself.
+    Model directories without arrays fall back to the pickles.
+    """
+    array_dir = os.path.join(model_dir, ARRAY_DIR_NAME)
+    if os.path.exists(os.path.join(array_dir, MANIFEST_NAME)):
+        forest, encoder, feature_columns, manifest = load_artifacts(array_dir)
+        return {
+            'forest': forest if compiled else _load_forest_pickle(model_dir),
+            'encoder': encoder,
+            'feature_columns': feature_columns,
+            'model_hash': manifest['model_hash'],
+            'source': array_dir,
+            'compiled': compiled
+        }
+
+    # No manifest to read the hash from, so it is computed from the forest
+    forest, preprocessor, feature_columns = _load_pickles(model_dir)
+    compiled_forest = CompiledForest.from_model(forest)
+    return {
+        'forest': compiled_forest if compiled else forest,
+        'encoder': FusedEncoder.from_preprocessor(preprocessor),
+        'feature_columns': feature_columns,
+        # Same hash as the exported arrays of this forest
+        'model_hash': forest_hash(compiled_forest),
+        'source': model_dir,
+        'compiled': compiled
+    }
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.inference import InferenceModel
+from src.model_artifacts import (ARRAY_DIR_NAME, MANIFEST_NAME, load_scoring_artifacts,
+                                 read_manifest, verify_artifacts, verify_pickles)
+
+PICKLE_FILES = ['depression_model.pkl', 'preprocessor.pkl', 'feature_columns.pkl']
+
+
+class ModelSnapshot:
+    """One loaded, warmed-up version of the model; never modified after creation.
+
+    Callers keep the snapshot they started with for a whole request, so a
+    hot swap never changes the model under a batch that is being scored.
+    """
+
+    def __init__(self, artifacts, signature):
+
+        self.forest = artifacts['forest']
+        self.encoder = artifacts['encoder']
+        self.feature_columns = list(artifacts['feature_columns'])
+        self.model_hash = artifacts['model_hash']
+        self.source = artifacts['source']
+        self.signature = signature
+        self.loaded_at = time.time()
+
+        self.model = InferenceModel(self.forest, self.encoder, self.feature_columns,
+                                    self.model_hash)
+
+    def warmup_frame(self, n_rows=256):
+        """Build a synthetic batch covering every category and a spread of numeric values"""
+        encoder = self.encoder
+        positions = np.arange(n_rows)
+        data = {}
+        for i, column in enumerate(encoder.numeric_columns):
+            spread = np.linspace(-2.0, 2.0, n_rows)
+            data[column] = encoder.mean[i] + encoder.scale[i] * np.roll(spread, i)
+        for column, vocab in zip(encoder.categorical_columns, encoder.vocabularies):
+            data[column] = vocab[positions % len(vocab)]
+        return pd.DataFrame(data)[self.feature_columns]
+
+    def warmup(self, n_rows=256):
+        """Score a synthetic batch so the first real request runs on warm code paths"""
+        started = time.perf_counter()
+        X = self.encoder.transform(self.warmup_frame(n_rows))
+        self.forest.predict_proba(X)
+        return time.perf_counter() - started
+
+
+class ModelRegistry:
+    """Process-wide owner of the current model snapshot.
+
+    Scores with the CompiledForest of the exported arrays by default, or
+    the sklearn forest with compiled=False. The artifact set is loaded and
+    verified once, then the files on disk are polled at most every check_interval seconds. A changed version is loaded,
+    verified and warmed up on a background thread while callers keep getting
+    the previous snapshot, and then swapped in with a single assignment.
+    """
+
+    def __init__(self, model_dir='model', check_interval=5.0, warmup_rows=256, compiled=True):
+
+        self.model_dir = model_dir
+        self.compiled = compiled
+        self.check_interval = check_interval
+        self.warmup_rows = warmup_rows
+
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+        self._last_check = 0.0
+        self.swaps = 0
+        self.last_error = None
+        self._failed_signature = None
+
+    def _signature(self):
+
+        # The manifest is replaced atomically once a version is complete, so
+        # swaps key on it alone; the pickles are only used without one
+        manifest_path = os.path.join(self.model_dir, ARRAY_DIR_NAME, MANIFEST_NAME)
+        paths = [os.path.join(self.model_dir, name) for name in PICKLE_FILES]
+        if os.path.exists(manifest_path):
+            paths = [manifest_path]
+
+        signature = []
+        for path in paths:
+            stat = os.stat(path)
+            signature.append((path, stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def _load(self, signature):
+
+        array_dir = os.path.join(self.model_dir, ARRAY_DIR_NAME)
+        if os.path.exists(os.path.join(array_dir, MANIFEST_NAME)):
+            manifest = read_manifest(array_dir)
+            mismatched = verify_artifacts(array_dir, manifest)
+            if not self.compiled:
+                # The sklearn forest comes from the pickle, which must match the manifest too
+                mismatched += verify_pickles(self.model_dir, manifest)
+            if mismatched:
+                raise ValueError(
+                    f"Artifact files do not match the manifest: {', '.join(mismatched)}")
+
+        snapshot = ModelSnapshot(load_scoring_artifacts(self.model_dir, self.compiled), signature)
+        seconds = snapshot.warmup(self.warmup_rows)
+        print(f"Loaded model {snapshot.model_hash[:12]} from {snapshot.source} "
+              f"(warmup {seconds * 1000:.0f} ms)")
+        return snapshot
+
+    def _reload(self, signature):
+
+        try:
+            snapshot = self._load(signature)
+        except Exception as e:
+            # Keep serving the previous version until the files change again
+            self.last_error = e
+            self._failed_signature = signature
+            print(f"Model reload failed, keeping the current version: {e}")
+        else:
+            with self._lock:
+                self._snapshot = snapshot
+                self.swaps += 1
+                self.last_error = None
+        finally:
+            self._reloading.release()
+
+    def current(self):
+        """Return the current snapshot, scheduling a reload if the files changed"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load(self._signature())
+                    self._last_check = time.monotonic()
+                return self._snapshot
+
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self.check_for_update()
+        return self._snapshot
+
+    def check_for_update(self, wait=False):
+        """Start loading a new snapshot if the artifact files changed on disk"""
+        try:
+            signature = self._signature()
+        except OSError:
+            # Files are being replaced right now; look again on the next check
+            return False
+        if self._snapshot is not None and signature == self._snapshot.signature:
+            return False
+        if signature == self._failed_signature:
+            return False
+        if not self._reloading.acquire(blocking=False):
+            return False
+
+        thread = threading.Thread(target=self._reload, args=(signature,), daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+
+_REGISTRIES = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_registry(model_dir='model', compiled=True, **kwargs):
+    """Return the registry of model_dir shared by everything in this process"""
+    key = (os.path.abspath(model_dir), compiled)
+    with _REGISTRIES_LOCK:
+        if key not in _REGISTRIES:
+            _REGISTRIES[key] = ModelRegistry(model_dir, compiled=compiled, **kwargs)
+        return _REGISTRIES[key]
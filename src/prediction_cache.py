@@ -0,0 +1,254 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Scoring cache keyed by (model artifact hash, canonical encoded row bytes).
+
+    Identical rows in a batch are scored once and broadcast back. Scored rows
+    are kept in an in-memory LRU and, when a path is given, in a SQLite store
+    so repeated uploads across sessions and restarts skip the model.
+
+    The store is read in batched IN queries on one connection per thread,
+    outside the in-memory lock. It keeps at most max_disk_entries rows, none
+    older than max_age_days (None disables either cap); old rows are pruned
+    on open and after every prune_every inserted rows.
+    """
+
+    # Keys per IN query, below SQLite's default host parameter limit
+    LOOKUP_BATCH = 500
+
+    def __init__(self, model_hash, max_entries=200000, path=None,
+                 max_disk_entries=2000000, max_age_days=30, prune_every=10000):
+
+        self.model_hash = model_hash
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.max_age_days = max_age_days
+        self.prune_every = prune_every
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        self._inserted = 0
+        self._closed = False
+        if path is not None:
+            self._create_schema()
+            self.prune()
+
+        self.reset_stats()
+
+    def _connection(self):
+
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # WAL lets readers in other threads and processes run while a batch is written
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    def _create_schema(self):
+
+        db = self._connection()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "model_hash TEXT NOT NULL, row_key BLOB NOT NULL, proba BLOB NOT NULL, "
+            "created REAL NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (model_hash, row_key))")
+        columns = [row[1] for row in db.execute("PRAGMA table_info(predictions)")]
+        if 'created' not in columns:
+            # Stores written before the cap existed start their age now
+            db.execute("ALTER TABLE predictions ADD COLUMN created REAL NOT NULL DEFAULT 0")
+            db.execute("UPDATE predictions SET created = ?", (time.time(),))
+        db.execute("CREATE INDEX IF NOT EXISTS predictions_created ON predictions (created)")
+        db.commit()
+
+    @property
+    def _db(self):
+        return None if self.path is None or self._closed else self._connection()
+
+    def prune(self):
+        """Delete store rows past the age cap, then the oldest rows past the size cap"""
+        db = self._db
+        if db is None:
+            return 0
+        deleted = 0
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            deleted += db.execute("DELETE FROM predictions WHERE created < ?", (cutoff,)).rowcount
+        if self.max_disk_entries is not None:
+            excess = db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_disk_entries
+            if excess > 0:
+                deleted += db.execute(
+                    "DELETE FROM predictions WHERE rowid IN "
+                    "(SELECT rowid FROM predictions ORDER BY created LIMIT ?)", (excess,)).rowcount
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def hash_file(path):
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_object(obj):
+        return hashlib.sha256(pickle.dumps(obj)).hexdigest()
+
+    def reset_stats(self):
+
+        self.rows = 0
+        self.batch_duplicates = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def stats(self):
+
+        unique = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'rows': self.rows,
+            'unique_rows': unique,
+            'batch_duplicates': self.batch_duplicates,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            # Share of rows that did not need a model evaluation
+            'hit_rate': (self.rows - self.misses) / self.rows if self.rows else 0.0,
+            'entries': len(self._memory)
+        }
+
+    @staticmethod
+    def _canonical_rows(X):
+
+        if hasattr(X, 'toarray'):
+            X = X.toarray()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        # Adding zero folds -0.0 into 0.0 so equal rows have equal bytes
+        X = X + np.float32(0.0)
+        return X
+
+    def _remember(self, key, proba):
+
+        self._memory[key] = proba
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def predict_proba(self, X, score_fn):
+        """Return score_fn(X) for every row, evaluating score_fn on uncached unique rows only"""
+        X = self._canonical_rows(X)
+        n_rows = X.shape[0]
+        if n_rows == 0:
+            return score_fn(X)
+
+        # Deduplicate whole rows by viewing each one as a single opaque value
+        row_view = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+        unique_keys, first_index, inverse = np.unique(
+            row_view, return_index=True, return_inverse=True)
+        keys = [key.tobytes() for key in unique_keys]
+
+        results = [None] * len(keys)
+        missing = []
+        with self._lock:
+            self.rows += n_rows
+            self.batch_duplicates += n_rows - len(keys)
+
+            for i, key in enumerate(keys):
+                proba = self._memory.get(key)
+                if proba is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[i] = proba
+                else:
+                    missing.append(i)
+
+        # Look the memory misses up on disk in batches, outside the lock
+        db = self._db
+        if missing and db is not None:
+            stored = self._lookup(db, [keys[i] for i in missing])
+            with self._lock:
+                for i in missing:
+                    proba = stored.get(keys[i])
+                    if proba is not None:
+                        self._remember(keys[i], proba)
+                        results[i] = proba
+                self.disk_hits += len(stored)
+            missing = [i for i in missing if results[i] is None]
+
+        with self._lock:
+            self.misses += len(missing)
+
+        # Score the rows nobody has seen before, outside the lock
+        if missing:
+            scored = np.asarray(score_fn(X[first_index[missing]]), dtype=np.float64)
+            with self._lock:
+                for i, proba in zip(missing, scored):
+                    proba = np.ascontiguousarray(proba)
+                    results[i] = proba
+                    self._remember(keys[i], proba)
+                self._inserted += len(missing)
+                prune = self.prune_every is not None and self._inserted >= self.prune_every
+                if prune:
+                    self._inserted = 0
+            if db is not None:
+                now = time.time()
+                db.executemany(
+                    "INSERT OR REPLACE INTO predictions (model_hash, row_key, proba, created) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(self.model_hash, keys[i], results[i].tobytes(), now) for i in missing])
+                db.commit()
+                if prune:
+                    self.prune()
+
+        return np.stack(results)[inverse.ravel()]
+
+    def _lookup(self, db, keys):
+        """Stored probabilities of the given keys, LOOKUP_BATCH keys per query"""
+        stored = {}
+        for start in range(0, len(keys), self.LOOKUP_BATCH):
+            batch = keys[start:start + self.LOOKUP_BATCH]
+            placeholders = ', '.join('?' * len(batch))
+            rows = db.execute(
+                f"SELECT row_key, proba FROM predictions "
+                f"WHERE model_hash = ? AND row_key IN ({placeholders})",
+                [self.model_hash] + batch)
+            for row_key, proba in rows:
+                stored[bytes(row_key)] = np.frombuffer(proba, dtype=np.float64)
+        return stored
+
+    def clear(self):
+
+        with self._lock:
+            self._memory.clear()
+        db = self._db
+        if db is not None:
+            db.execute("DELETE FROM predictions WHERE model_hash = ?", (self.model_hash,))
+            db.commit()
+
+    def close(self):
+
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
+
+
+def default_cache_path(model_dir='model'):
+    return os.path.join(model_dir, 'prediction_cache.sqlite')
@@ -0,0 +1,356 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from src.data_validator import DataValidator
+from src.model_registry import get_registry
+from src.streaming_scorer import categorize_risk_scores
+
+# Fields of a record, in the schema DataValidator.validate_input checks
+RECORD_FIELDS = [
+    'Gender', 'Age', 'Profession', 'Academic Pressure', 'CGPA', 'Study Satisfaction',
+    'Sleep Duration', 'Dietary Habits', 'Degree', 'Have you ever had suicidal thoughts ?',
+    'Work/Study Hours', 'Financial Stress', 'Family History of Mental Illness'
+]
+
+
+class ServiceOverloaded(Exception):
+    """Raised when admitting a request would exceed the pending-row limit."""
+
+
+class RequestError(ValueError):
+    """Raised for a request the service cannot score; carries an HTTP status."""
+
+    def __init__(self, message, status=400):
+
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyTracker:
+    """Keeps the most recent request latencies and batch sizes for percentile reports."""
+
+    def __init__(self, window=10000):
+
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+        self.batches = 0
+
+    def record_request(self, seconds):
+
+        with self._lock:
+            self._latencies.append(seconds * 1000)
+            self.requests += 1
+
+    def record_rejection(self):
+
+        with self._lock:
+            self.rejected += 1
+
+    def record_batch(self, n_rows):
+
+        with self._lock:
+            self._batch_sizes.append(n_rows)
+            self.batches += 1
+
+    def report(self):
+
+        with self._lock:
+            latencies = np.asarray(self._latencies, dtype=np.float64)
+            batch_sizes = np.asarray(self._batch_sizes, dtype=np.float64)
+            report = {
+                'requests': self.requests,
+                'rejected': self.rejected,
+                'batches': self.batches
+            }
+
+        if len(latencies):
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            report['latency_ms'] = {
+                'p50': round(p50, 3), 'p90': round(p90, 3), 'p99': round(p99, 3),
+                'max': round(latencies.max(), 3)
+            }
+        if len(batch_sizes):
+            report['mean_batch_rows'] = round(batch_sizes.mean(), 2)
+        return report
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into micro-batches.
+
+    Requests wait in a queue; a single worker thread takes the first one,
+    keeps collecting until max_batch_size rows are gathered or max_wait_ms
+    has passed, and scores them with one score_fn call, which returns the
+    hash of the model it used with the probabilities. Admission is
+    bounded by max_pending_rows, so a burst is rejected instead of queued
+    without limit.
+    """
+
+    def __init__(self, score_fn, max_batch_size=256, max_wait_ms=5.0, max_pending_rows=20000,
+                 tracker=None):
+
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_pending_rows = max_pending_rows
+        self.tracker = tracker or LatencyTracker()
+
+        self._queue = queue.Queue()
+        self._pending_rows = 0
+        self._pending_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    @property
+    def pending_rows(self):
+        return self._pending_rows
+
+    def submit(self, frame):
+        """Queue a frame of records and return a Future of (model hash, probabilities)"""
+        n_rows = len(frame)
+        with self._pending_lock:
+            if self._pending_rows + n_rows > self.max_pending_rows:
+                raise ServiceOverloaded(
+                    f"{self._pending_rows} rows already pending (limit {self.max_pending_rows})")
+            self._pending_rows += n_rows
+
+        future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def _collect(self):
+
+        batch = [self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch, rows
+
+    def _run(self):
+
+        while True:
+            batch, rows = self._collect()
+            try:
+                frame = pd.concat([item[0] for item in batch], ignore_index=True)
+                model_hash, proba = self.score_fn(frame)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                start = 0
+                for item_frame, future in batch:
+                    future.set_result((model_hash, proba[start:start + len(item_frame)]))
+                    start += len(item_frame)
+            finally:
+                with self._pending_lock:
+                    self._pending_rows -= rows
+                self.tracker.record_batch(rows)
+
+
+class ScoringService:
+    """Validates records, scores them through the micro-batcher and formats results."""
+
+    def __init__(self, model_dir='model', max_batch_size=256, max_wait_ms=5.0,
+                 max_pending_rows=20000, max_request_rows=5000):
+
+        # Micro-batches stay well under the ~1,000-row crossover where sklearn gets faster
+        self.registry = get_registry(model_dir, compiled=True)
+        self.max_request_rows = max_request_rows
+        self.validator = DataValidator()
+        self.tracker = LatencyTracker()
+        self.batcher = MicroBatcher(self._score_frame, max_batch_size, max_wait_ms,
+                                    max_pending_rows, self.tracker)
+
+        # Load and warm the model before the first request arrives
+        self.registry.current()
+
+    def _score_frame(self, frame):
+
+        # One snapshot per micro-batch, so a hot swap never splits a batch; records
+        # are brought into this snapshot's spellings again in case it is a newer one
+        snapshot = self.registry.current()
+        frame = self._normalize_frame(frame, snapshot.encoder)
+        X = snapshot.encoder.transform(frame[snapshot.feature_columns])
+        return snapshot.model_hash, snapshot.forest.predict_proba(X)[:, 1]
+
+    @staticmethod
+    def _normalize_value(value, vocab):
+
+        # JSON clients send numbers and unquoted labels; the encoder was fitted on
+        # the CSV spellings, e.g. Financial Stress '2.0' and Sleep Duration "'5-6 hours'"
+        if vocab.dtype.kind not in 'UO':
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(float(value))
+        if isinstance(value, str) and value not in vocab and f"'{value}'" in vocab:
+            value = f"'{value}'"
+        return value
+
+    def _normalize_frame(self, frame, encoder):
+
+        frame = frame.copy()
+        for column, vocab in zip(encoder.categorical_columns, encoder.vocabularies):
+            frame[column] = [self._normalize_value(v, vocab) for v in frame[column]]
+        return frame
+
+    def parse_records(self, payload):
+        """Turn a JSON payload (one record, a list, or {"records": [...]}) into a frame"""
+        if isinstance(payload, dict) and 'records' in payload:
+            payload = payload['records']
+        records = [payload] if isinstance(payload, dict) else payload
+        if not isinstance(records, list) or not records:
+            raise RequestError("Expected a record object, a list of records or {\"records\": [...]}")
+        if len(records) > self.max_request_rows:
+            raise RequestError(f"At most {self.max_request_rows} records per request", status=413)
+
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise RequestError(f"Record {i} is not an object")
+            missing = [field for field in RECORD_FIELDS if field not in record]
+            unexpected = [field for field in record if field not in RECORD_FIELDS]
+            if missing or unexpected:
+                raise RequestError(f"Record {i}: missing fields {missing}, unexpected fields {unexpected}")
+            if record['Profession'] != 'Student':
+                raise RequestError(f"Record {i}: only 'Student' profession is supported by this model")
+
+        # Normalized here only to validate; scoring normalizes with its own snapshot
+        encoder = self.registry.current().encoder
+        frame = self._normalize_frame(pd.DataFrame(records, columns=RECORD_FIELDS), encoder)
+
+        # Checked in the CSV spellings, the same rules uploaded files go through
+        validation = self.validator.validate_frame(frame)
+        if len(validation['quarantine']):
+            invalid = validation['quarantine']['Invalid Fields']
+            raise RequestError(f"Record {invalid.index[0]}: invalid values for {invalid.iloc[0]} "
+                               f"({len(invalid)} invalid record(s) in this request)")
+        for column in encoder.numeric_columns:
+            frame[column] = pd.to_numeric(frame[column])
+        return frame
+
+    def predict(self, payload):
+        """Score a JSON payload and return the response body"""
+        frame = self.parse_records(payload)
+        try:
+            future = self.batcher.submit(frame)
+        except ServiceOverloaded:
+            self.tracker.record_rejection()
+            raise
+
+        # The hash of the snapshot that scored this request's micro-batch
+        model_hash, proba = future.result()
+        risk = np.round(np.asarray(proba, dtype=np.float64) * 100, 2)
+        categories = categorize_risk_scores(risk)
+        return {
+            'model_hash': model_hash,
+            'predictions': [
+                {'Depression Risk (%)': float(r), 'Risk Category': None if pd.isna(c) else str(c)}
+                for r, c in zip(risk, categories)
+            ]
+        }
+
+    def metrics(self):
+
+        report = self.tracker.report()
+        report['pending_rows'] = self.batcher.pending_rows
+        report['model_hash'] = self.registry.current().model_hash
+        return report
+
+
+def make_handler(service, max_body_bytes=8 << 20):
+
+    class ScoringRequestHandler(BaseHTTPRequestHandler):
+
+        def _send_json(self, status, body, headers=None):
+
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok', 'model_hash': service.registry.current().model_hash})
+            elif self.path == '/metrics':
+                self._send_json(200, service.metrics())
+            else:
+                self._send_json(404, {'error': f"Unknown path {self.path}"})
+
+        def do_POST(self):
+
+            if self.path != '/predict':
+                self._send_json(404, {'error': f"Unknown path {self.path}"})
+                return
+
+            started = time.perf_counter()
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > max_body_bytes:
+                self._send_json(413, {'error': f"Request body larger than {max_body_bytes} bytes"})
+                return
+
+            try:
+                payload = json.loads(self.rfile.read(length) or b'null')
+                body = service.predict(payload)
+            except json.JSONDecodeError as e:
+                self._send_json(400, {'error': f"Invalid JSON: {e}"})
+            except RequestError as e:
+                self._send_json(e.status, {'error': str(e)})
+            except ServiceOverloaded as e:
+                # Backpressure: tell the client to retry instead of queueing without bound
+                self._send_json(503, {'error': f"Service overloaded: {e}"}, {'Retry-After': '1'})
+            except Exception as e:
+                self._send_json(500, {'error': str(e)})
+            else:
+                self._send_json(200, body)
+                service.tracker.record_request(time.perf_counter() - started)
+
+        def log_message(self, format, *args):
+            # Per-request access logs would dominate the output under load
+            pass
+
+    return ScoringRequestHandler
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+
+    # The default listen backlog of 5 resets connections under modest concurrency
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def serve(host='127.0.0.1', port=8000, model_dir='model', **service_args):
+    """Run the scoring service until interrupted"""
+    service = ScoringService(model_dir, **service_args)
+    server = ScoringHTTPServer((host, port), make_handler(service))
+    print(f"Scoring service listening on http://{host}:{port} "
+          f"(POST /predict, GET /health, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down scoring service")
+    finally:
+        server.server_close()
+        print(f"Final metrics: {service.metrics()}")
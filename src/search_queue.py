@@ -0,0 +1,410 @@
+import argparse
+import json
+import os
+import pickle
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, check_cv
+
+from src.hyperparameter_search import FoldCache, _fit_and_score, set_search_results
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SearchWorkQueue:
+    """Candidate x fold search tasks in a SQLite file shared by a coordinator and workers.
+
+    A job row holds the pickled search inputs (preprocessor, classifier,
+    training data, CV splitter, scoring); every task is one parameter set on
+    one fold. Workers claim a pending task, or one whose lease has expired,
+    inside a write transaction, so a task is only ever leased to one worker
+    at a time. A worker renews its lease while it fits; if it dies, the
+    lease runs out and another worker takes the task over. Every claim
+    counts as an attempt, so a task whose workers keep dying is marked
+    failed once its lease expires after max_attempts claims.
+
+    Job payloads are unpickled by workers, so the file must only be
+    writable by trusted users. The default rollback journal is used, which
+    works on network shares where WAL does not; SQLite still relies on the
+    share's file locking being correct.
+    """
+
+    def __init__(self, path, timeout=60.0):
+
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                   check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created REAL NOT NULL, payload BLOB)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "job_id TEXT NOT NULL, task_id INTEGER NOT NULL, params TEXT NOT NULL, "
+            "fold INTEGER NOT NULL, status TEXT NOT NULL, worker TEXT, lease_expires REAL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, score REAL, fit_seconds REAL, error TEXT, "
+            "PRIMARY KEY (job_id, task_id))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, job_id)")
+
+    @contextmanager
+    def _transaction(self):
+
+        # IMMEDIATE takes the write lock up front, so two claims cannot interleave
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def publish(self, payload, candidates, n_folds):
+        """Create a job with one task per (candidate, fold) and return its id"""
+        job_id = uuid.uuid4().hex
+        with self._transaction() as db:
+            db.execute("INSERT INTO jobs VALUES (?, 'running', ?, ?)",
+                       (job_id, time.time(), pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)))
+            db.executemany(
+                "INSERT INTO tasks (job_id, task_id, params, fold, status) VALUES (?, ?, ?, ?, 'pending')",
+                [(job_id, index * n_folds + fold, json.dumps(params), fold)
+                 for index, params in enumerate(candidates) for fold in range(n_folds)])
+        return job_id
+
+    def claim(self, worker, lease_seconds, max_attempts=3):
+        """Lease the next runnable task to worker; returns (job_id, task_id, params, fold) or None"""
+        now = time.time()
+        with self._transaction() as db:
+            self._fail_expired(db, now, max_attempts)
+            row = db.execute(
+                "SELECT t.job_id, t.task_id, t.params, t.fold FROM tasks t "
+                "JOIN jobs j ON j.job_id = t.job_id WHERE j.status = 'running' AND "
+                "(t.status = 'pending' OR (t.status = 'leased' AND t.lease_expires < ?)) "
+                "ORDER BY j.created, t.task_id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE job_id = ? AND task_id = ?",
+                (worker, now + lease_seconds, row[0], row[1]))
+        job_id, task_id, params, fold = row
+        return job_id, task_id, json.loads(params), fold
+
+    @staticmethod
+    def _fail_expired(db, now, max_attempts):
+
+        # Expired leases count as failed attempts; give up on tasks that used them all
+        db.execute(
+            "UPDATE tasks SET status = 'failed', lease_expires = NULL, "
+            "error = COALESCE(error || char(10), '') || 'Lease of ' || worker || "
+            "' expired on attempt ' || attempts || '; the worker stopped renewing it' "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, max_attempts))
+
+    def fail_expired(self, max_attempts):
+        """Mark failed every task whose last allowed lease has expired"""
+        with self._transaction() as db:
+            self._fail_expired(db, time.time(), max_attempts)
+
+    def renew(self, job_id, task_id, worker, lease_seconds):
+
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE job_id = ? AND task_id = ? "
+                "AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job_id, task_id, worker))
+
+    def complete(self, job_id, task_id, worker, score, fit_seconds):
+
+        # The first result wins; a slow worker whose lease was taken over may finish second
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET status = 'done', worker = ?, score = ?, fit_seconds = ?, "
+                "lease_expires = NULL WHERE job_id = ? AND task_id = ? AND status != 'done'",
+                (worker, float(score), float(fit_seconds), job_id, task_id))
+
+    def fail(self, job_id, task_id, worker, error, max_attempts):
+
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_expires = NULL WHERE job_id = ? AND task_id = ? AND worker = ? "
+                "AND status = 'leased'",
+                (max_attempts, error, job_id, task_id, worker))
+
+    def _query(self, sql, args=()):
+
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def load_payload(self, job_id):
+
+        rows = self._query("SELECT payload FROM jobs WHERE job_id = ?", (job_id,))
+        return pickle.loads(rows[0][0]) if rows and rows[0][0] is not None else None
+
+    def jobs(self):
+
+        return self._query("SELECT job_id, status FROM jobs ORDER BY created")
+
+    def progress(self, job_id):
+        """Return {status: task count} for a job"""
+        return dict(self._query(
+            "SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status", (job_id,)))
+
+    def results(self, job_id):
+
+        return self._query(
+            "SELECT task_id, score, fit_seconds FROM tasks WHERE job_id = ? AND status = 'done'",
+            (job_id,))
+
+    def errors(self, job_id):
+
+        return self._query(
+            "SELECT task_id, error FROM tasks WHERE job_id = ? AND status = 'failed'", (job_id,))
+
+    def finish(self, job_id, status='done'):
+        """Close a job and drop its payload; the task rows stay as a record"""
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET status = ?, payload = NULL WHERE job_id = ?", (status, job_id))
+
+    def close(self):
+
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class _LeaseKeeper:
+    """Renews a task lease from a background thread while the task runs."""
+
+    def __init__(self, queue, job_id, task_id, worker, lease_seconds):
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(queue, job_id, task_id, worker, lease_seconds), daemon=True)
+
+    def _run(self, queue, job_id, task_id, worker, lease_seconds):
+
+        while not self._stop.wait(lease_seconds / 3):
+            queue.renew(job_id, task_id, worker, lease_seconds)
+
+    def __enter__(self):
+
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(path, worker=None, lease_seconds=60.0, poll_interval=1.0, idle_exit=None,
+               max_tasks=None, max_attempts=3):
+    """Claim, fit and score tasks from the queue at path until idle_exit seconds without work"""
+    queue = SearchWorkQueue(path)
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    job_id, job = None, None
+    completed = 0
+    idle_since = time.monotonic()
+    print(f"Search worker {worker} polling {path}")
+
+    try:
+        while max_tasks is None or completed < max_tasks:
+            task = queue.claim(worker, lease_seconds, max_attempts)
+            if task is None:
+                if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            task_job_id, task_id, params, fold = task
+            try:
+                # Folds are encoded once per job and reused for all its tasks
+                if task_job_id != job_id:
+                    if job is not None:
+                        job['cache'].close()
+                    payload = queue.load_payload(task_job_id)
+                    if payload is None:
+                        raise RuntimeError(f"Job {task_job_id} has no payload")
+                    job_id = task_job_id
+                    job = {
+                        'classifier': payload['classifier'],
+                        'scorer': get_scorer(payload['scoring']),
+                        'cache': FoldCache(payload['preprocessor'], payload['cv']).build(
+                            payload['X'], payload['y'])
+                    }
+
+                with _LeaseKeeper(queue, task_job_id, task_id, worker, lease_seconds):
+                    score, fit_seconds = _fit_and_score(
+                        job['classifier'], params, job['cache'].folds[fold], job['scorer'])
+            except Exception:
+                queue.fail(task_job_id, task_id, worker, traceback.format_exc(), max_attempts)
+                print(f" task {task_id} of job {task_job_id[:8]} failed")
+                job_id, job = None, None
+            else:
+                queue.complete(task_job_id, task_id, worker, score, fit_seconds)
+                completed += 1
+                print(f" task {task_id} of job {task_job_id[:8]}: {score:.4f} ({fit_seconds:.1f}s)")
+            idle_since = time.monotonic()
+    finally:
+        if job is not None:
+            job['cache'].close()
+        queue.close()
+    return completed
+
+
+def start_local_workers(path, n_workers, lease_seconds=60.0, idle_exit=None, max_attempts=3):
+    """Start n_workers worker processes on this machine and return their Popen handles"""
+    # Workers run from the project root, so a relative queue path would point elsewhere
+    command = [sys.executable, '-m', 'src.search_queue', 'worker', os.path.abspath(path),
+               '--lease-seconds', str(lease_seconds), '--max-attempts', str(max_attempts)]
+    if idle_exit is not None:
+        command += ['--idle-exit', str(idle_exit)]
+    return [subprocess.Popen(command, cwd=PROJECT_ROOT) for _ in range(n_workers)]
+
+
+class DistributedSearchCV:
+    """Grid search whose candidate x fold fits run in worker processes sharing a queue file.
+
+    fit() publishes one task per candidate and fold to a SearchWorkQueue,
+    optionally starts local_workers worker processes, and waits until every
+    task has a score. Workers on other machines join by running
+    `python -m src.search_queue worker <queue>` against the same file. Scores
+    and fits match GridSearchCV for a two-step Pipeline whose grid only
+    touches the final step.
+
+    With timeout=None fit() waits as long as the job makes progress: a task
+    whose workers keep dying fails after max_attempts claims, and the fit
+    stops if every local worker has exited. With remote workers only, a
+    queue nobody serves is waited on until timeout.
+    """
+
+    def __init__(self, estimator, param_grid, queue_path, cv=5, scoring='roc_auc', refit=True,
+                 local_workers=0, lease_seconds=60.0, poll_interval=1.0, timeout=None,
+                 max_attempts=3):
+
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.queue_path = queue_path
+        self.cv = cv
+        self.scoring = scoring
+        self.refit = refit
+        self.local_workers = local_workers
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+
+    def fit(self, X, y):
+
+        started = time.perf_counter()
+        (_, preprocessor), (classifier_name, classifier) = self.estimator.steps[0], self.estimator.steps[-1]
+        prefix = f"{classifier_name}__"
+        candidates = list(ParameterGrid(self.param_grid))
+        for name in candidates[0]:
+            if not name.startswith(prefix):
+                raise ValueError(f"Only '{prefix}' parameters can be distributed, got '{name}'")
+        classifier_candidates = [{name[len(prefix):]: value for name, value in params.items()}
+                                 for params in candidates]
+
+        cv = check_cv(self.cv, y, classifier=True)
+        self.n_splits_ = cv.get_n_splits(X, y)
+        payload = {'preprocessor': preprocessor, 'classifier': classifier, 'X': X,
+                   'y': np.asarray(y), 'cv': cv, 'scoring': self.scoring}
+
+        queue = SearchWorkQueue(self.queue_path)
+        job_id = queue.publish(payload, classifier_candidates, self.n_splits_)
+        n_tasks = len(candidates) * self.n_splits_
+        print(f"Published {n_tasks} tasks as job {job_id[:8]} to {self.queue_path}")
+
+        # Local workers stay up until the job is done, to take over expired leases
+        workers = start_local_workers(self.queue_path, self.local_workers, self.lease_seconds,
+                                      max_attempts=self.max_attempts)
+        try:
+            while True:
+                # Also catches dead workers when no live worker is left to claim their tasks
+                queue.fail_expired(self.max_attempts)
+                progress = queue.progress(job_id)
+                if progress.get('failed'):
+                    task_id, error = queue.errors(job_id)[0]
+                    raise RuntimeError(f"Search task {task_id} failed on every attempt:\n{error}")
+                if progress.get('done', 0) == n_tasks:
+                    break
+                if workers and all(process.poll() is not None for process in workers):
+                    raise RuntimeError(f"Every local search worker exited before job {job_id} finished")
+                if self.timeout is not None and time.perf_counter() - started > self.timeout:
+                    raise TimeoutError(f"Search job {job_id} unfinished after {self.timeout}s: {progress}")
+                time.sleep(self.poll_interval)
+
+            scores = np.zeros((len(candidates), self.n_splits_))
+            fit_seconds = np.zeros((len(candidates), self.n_splits_))
+            for task_id, score, seconds in queue.results(job_id):
+                scores[divmod(task_id, self.n_splits_)] = score
+                fit_seconds[divmod(task_id, self.n_splits_)] = seconds
+            queue.finish(job_id)
+        except BaseException:
+            queue.finish(job_id, status='abandoned')
+            raise
+        finally:
+            for process in workers:
+                process.terminate()
+            for process in workers:
+                process.wait()
+            queue.close()
+
+        set_search_results(self, candidates, scores, fit_seconds, X, y)
+        self.queue_report_ = {
+            'job_id': job_id,
+            'tasks': n_tasks,
+            'local_workers': self.local_workers,
+            'search_seconds': round(time.perf_counter() - started, 3)
+        }
+        return self
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Distributed hyperparameter search work queue")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    worker_parser = subparsers.add_parser('worker', help="Run a worker against a queue file")
+    worker_parser.add_argument('queue', help="SQLite queue file shared with the coordinator")
+    worker_parser.add_argument('--worker-id', default=None, help="Name recorded on claimed tasks")
+    worker_parser.add_argument('--lease-seconds', type=float, default=60.0,
+                               help="How long a claimed task stays reserved without renewal")
+    worker_parser.add_argument('--idle-exit', type=float, default=None,
+                               help="Exit after this many seconds without work (default: never)")
+    worker_parser.add_argument('--max-tasks', type=int, default=None,
+                               help="Exit after completing this many tasks")
+    worker_parser.add_argument('--max-attempts', type=int, default=3,
+                               help="Claims of a task before it is marked failed")
+
+    status_parser = subparsers.add_parser('status', help="Show task counts of every job")
+    status_parser.add_argument('queue', help="SQLite queue file")
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        completed = run_worker(args.queue, args.worker_id, args.lease_seconds,
+                               idle_exit=args.idle_exit, max_tasks=args.max_tasks,
+                               max_attempts=args.max_attempts)
+        print(f"Worker finished after {completed} tasks")
+    else:
+        queue = SearchWorkQueue(args.queue)
+        for job_id, status in queue.jobs():
+            print(f"{job_id[:8]} {status:<10} {queue.progress(job_id)}")
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
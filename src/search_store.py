@@ -0,0 +1,93 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+# Estimator parameters that change how fast a fit runs, not what it produces
+_EXECUTION_PARAMS = ('n_jobs', 'verbose')
+
+
+def dataset_fingerprint(X, y):
+    """Content hash of the training frame and labels; any changed cell gives a new fingerprint"""
+    digest = hashlib.sha256()
+    if isinstance(X, pd.DataFrame):
+        digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in X.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(X, index=True).to_numpy().tobytes())
+    else:
+        X = np.ascontiguousarray(X)
+        digest.update(str((X.dtype, X.shape)).encode())
+        digest.update(X.tobytes())
+    digest.update(np.ascontiguousarray(np.asarray(y)).tobytes())
+    return digest.hexdigest()
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True, default=repr)
+
+
+def search_context(preprocessor, classifier, cv, scoring):
+    """Hash of everything besides the data and the candidate that decides a fold's score"""
+    # Unfitted clones hash their full configuration; estimator reprs are truncated
+    classifier = clone(classifier)
+    classifier.set_params(**{name: None if name == 'n_jobs' else 0
+                             for name in _EXECUTION_PARAMS if name in classifier.get_params()})
+    context = [joblib.hash(clone(preprocessor)), joblib.hash(classifier), repr(cv), scoring]
+    return hashlib.sha256(json.dumps(context).encode()).hexdigest()
+
+
+class SearchResultStore:
+    """SQLite store of per-fold search scores.
+
+    Rows are keyed by (dataset fingerprint, search context, parameter set,
+    fold), so an interrupted or extended search only evaluates what is not
+    stored yet, and a changed dataset or preprocessing misses the old rows
+    instead of reusing them.
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fold_scores ("
+            "dataset_fingerprint TEXT NOT NULL, context_key TEXT NOT NULL, "
+            "params_key TEXT NOT NULL, fold INTEGER NOT NULL, "
+            "score REAL NOT NULL, fit_seconds REAL NOT NULL, created REAL NOT NULL, "
+            "PRIMARY KEY (dataset_fingerprint, context_key, params_key, fold))")
+        self._db.commit()
+
+    def lookup(self, fingerprint, context, candidates):
+        """Return {(candidate index, fold): (score, fit_seconds)} for the stored evaluations"""
+        index_by_key = {_params_key(params): i for i, params in enumerate(candidates)}
+        rows = self._db.execute(
+            "SELECT params_key, fold, score, fit_seconds FROM fold_scores "
+            "WHERE dataset_fingerprint = ? AND context_key = ?", (fingerprint, context))
+        return {(index_by_key[key], fold): (score, fit_seconds)
+                for key, fold, score, fit_seconds in rows if key in index_by_key}
+
+    def record(self, fingerprint, context, params, fold, score, fit_seconds):
+
+        # Committed one by one, so a run that dies keeps everything it finished
+        self._db.execute(
+            "INSERT OR REPLACE INTO fold_scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint, context, _params_key(params), int(fold), float(score),
+             float(fit_seconds), time.time()))
+        self._db.commit()
+
+    def count(self, fingerprint=None):
+
+        if fingerprint is None:
+            return self._db.execute("SELECT COUNT(*) FROM fold_scores").fetchone()[0]
+        return self._db.execute("SELECT COUNT(*) FROM fold_scores WHERE dataset_fingerprint = ?",
+                                (fingerprint,)).fetchone()[0]
+
+    def close(self):
+
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,132 @@
+import json
+import os
+import sys
+import time
+
+from src.core_scheduler import _process_tree_cpu_seconds
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _peak_rss_bytes():
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _current_rss_bytes():
+
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def describe_shapes(obj):
+    """Return the (rows, columns) shape of obj, or of each shaped item of a tuple"""
+    if hasattr(obj, 'shape'):
+        return list(obj.shape)
+    if isinstance(obj, (tuple, list)):
+        shapes = [describe_shapes(item) for item in obj]
+        return [shape for shape in shapes if shape is not None] or None
+    return None
+
+
+class StageProfiler:
+    """Records wall time, CPU time, RSS and data shapes for named pipeline stages.
+
+    CPU time covers the whole process tree, including the loky workers that
+    joblib keeps alive between stages.
+    """
+
+    def __init__(self, name='training'):
+
+        self.name = name
+        self.stages = []
+        self.started = time.time()
+
+    def run(self, stage, func, *args, **kwargs):
+        """Call func(*args, **kwargs) as the named stage and return its result"""
+        inputs = [shape for shape in (describe_shapes(arg) for arg in args) if shape is not None]
+        wall_start = time.perf_counter()
+        cpu_start = _process_tree_cpu_seconds()
+        peak_start = _peak_rss_bytes()
+        rss_start = _current_rss_bytes()
+
+        result = func(*args, **kwargs)
+
+        wall = time.perf_counter() - wall_start
+        cpu = _process_tree_cpu_seconds() - cpu_start
+        peak_end = _peak_rss_bytes()
+        rss_end = _current_rss_bytes()
+
+        self.stages.append({
+            'stage': stage,
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu, 4),
+            # How much this stage raised the process's high-water mark
+            'peak_rss_delta_mb': (round((peak_end - peak_start) / 1e6, 3)
+                                  if peak_start is not None else None),
+            'peak_rss_mb': round(peak_end / 1e6, 3) if peak_end is not None else None,
+            'rss_delta_mb': (round((rss_end - rss_start) / 1e6, 3)
+                             if rss_start is not None and rss_end is not None else None),
+            'input_shapes': inputs,
+            'output_shapes': describe_shapes(result)
+        })
+        return result
+
+    def report(self):
+
+        total_wall = sum(stage['wall_seconds'] for stage in self.stages)
+        return {
+            'name': self.name,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'total_wall_seconds': round(total_wall, 4),
+            'total_cpu_seconds': round(sum(stage['cpu_seconds'] for stage in self.stages), 4),
+            'dominant_stage': (max(self.stages, key=lambda s: s['wall_seconds'])['stage']
+                               if self.stages else None),
+            'stages': self.stages
+        }
+
+    def print_summary(self):
+
+        total = sum(stage['wall_seconds'] for stage in self.stages) or 1.0
+        print(f"\n--- {self.name.upper()} STAGE PROFILE ---")
+        for stage in self.stages:
+            peak = stage['peak_rss_delta_mb']
+            print(f" {stage['stage']:<28} wall {stage['wall_seconds']:>9.2f}s "
+                  f"({stage['wall_seconds'] / total:>5.1%})  cpu {stage['cpu_seconds']:>9.2f}s  "
+                  f"peak RSS +{peak if peak is not None else 0:.1f} MB")
+
+    def write_json(self, path):
+
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_prometheus(self, path):
+        """Write the stage metrics in the Prometheus text exposition format"""
+        metrics = [
+            ('wall_seconds', 'Wall-clock time of the stage in seconds'),
+            ('cpu_seconds', 'CPU time of the stage in seconds'),
+            ('peak_rss_delta_mb', 'Increase of the peak resident set size during the stage in MB')
+        ]
+        lines = []
+        for key, help_text in metrics:
+            metric = f"{self.name}_stage_{key}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for stage in self.stages:
+                if stage[key] is not None:
+                    lines.append(f'{metric}{{stage="{stage["stage"]}"}} {stage[key]}')
+
+        # Write next to the target and rename, so a scraper never reads a partial file
+        with open(path + '.tmp', 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,173 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.cohort_dtypes import cohort_vocabularies, normalize_cohort
+from src.data_cleaning import UPLOAD_RULES
+from src.data_validator import DataValidator
+
+# Same risk bands the Predict page has always used
+RISK_BINS = [0, 30, 70, 100]
+RISK_LABELS = ["Low", "Medium", "High"]
+
+# Columns uploaded data must have once cleaning is done
+EXPECTED_COLUMNS_AFTER_CLEANING = [
+    'Gender', 'Age', 'Academic Pressure', 'CGPA', 'Study Satisfaction',
+    'Sleep Duration', 'Dietary Habits', 'Degree',
+    'Have you ever had suicidal thoughts ?', 'Work/Study Hours',
+    'Financial Stress', 'Family History of Mental Illness'
+]
+
+_VALIDATOR = DataValidator()
+
+
+def categorize_risk_scores(risk_scores):
+    """Vectorized Low/Medium/High banding of risk percentages"""
+    return pd.cut(risk_scores, bins=RISK_BINS, labels=RISK_LABELS)
+
+
+def clean_upload_chunk(chunk, feature_columns, extra_columns=None, quarantine=None):
+    """Apply the training-time cleaning to a chunk of uploaded rows.
+
+    Cleaned rows that break a DataValidator rule are left out; when a
+    quarantine list is given, they are appended to it with the names of
+    their invalid fields.
+    """
+    # Verify that we have the columns the model was trained on
+    columns = UPLOAD_RULES.output_columns(chunk)
+    missing_expected = set(EXPECTED_COLUMNS_AFTER_CLEANING) - set(columns)
+    if missing_expected:
+        raise ValueError(f"Missing expected columns: {missing_expected}")
+    missing_cols = [col for col in feature_columns if col not in columns]
+    if missing_cols:
+        raise ValueError(f"Missing required columns: {', '.join(missing_cols)}. "
+                         f"Expected columns: {', '.join(feature_columns)}")
+
+    # Extra columns are ignored, keeping the training column order
+    if extra_columns is not None:
+        extra_columns.update(col for col in columns if col not in feature_columns)
+    cleaned = UPLOAD_RULES.apply(chunk, columns=feature_columns)
+
+    validation = _VALIDATOR.validate_frame(cleaned, fields=feature_columns)
+    if quarantine is not None and len(validation['quarantine']):
+        quarantine.append(validation['quarantine'])
+    return validation['valid']
+
+
+class ResultStore:
+    """Append-only store of scored chunks, kept compact and joined only when read.
+
+    Chunks keep every cleaned column, since the pages display them, but each
+    one goes through normalize_cohort on arrival: text columns become
+    Categoricals over the encoder's vocabularies and small scales are
+    downcast. to_frame() joins them one column at a time, dropping each
+    chunk column once it is copied, so the result is never held twice.
+    """
+
+    def __init__(self, vocabularies=None):
+
+        self.vocabularies = vocabularies or {}
+        self._chunks = []
+        self.rows = 0
+
+    def append(self, chunk):
+
+        if len(chunk) == 0:
+            return
+        self._chunks.append(normalize_cohort(chunk, self.vocabularies))
+        self.rows += len(chunk)
+
+    def _join_column(self, column):
+
+        parts = [chunk.pop(column) for chunk in self._chunks]
+        dtype = parts[0].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and any(part.dtype != dtype for part in parts):
+            # Chunks share the vocabulary but may each have added different unknown values
+            known = list(self.vocabularies.get(column, []))
+            seen = set(known)
+            extra = sorted(set(value for part in parts for value in part.cat.categories
+                               if value not in seen))
+            categories = pd.Index(known + extra)
+            parts = [part.cat.set_categories(categories) for part in parts]
+        return pd.concat(parts)
+
+    def to_frame(self):
+
+        if not self._chunks:
+            return pd.DataFrame()
+        if len(self._chunks) > 1:
+            columns = list(self._chunks[0].columns)
+            data = {column: self._join_column(column) for column in columns}
+            self._chunks = [pd.DataFrame(data, columns=columns, copy=False)]
+        return self._chunks[0]
+
+
+class ChunkedScorer:
+    """Reads a CSV in fixed-size chunks and cleans, encodes and scores each one.
+
+    Only one raw chunk and its encoded matrix are alive at a time; the
+    scored rows themselves all stay in the ResultStore, so memory still grows
+    with the number of cleaned rows. Every chunk is parsed with the
+    encoder's csv_dtypes, so the scores do not depend on the chunk size.
+    """
+
+    def __init__(self, clean_fn, encoder, score_fn, feature_columns, chunk_size=20000):
+
+        self.clean_fn = clean_fn
+        self.encoder = encoder
+        # A chunk without '?' in Financial Stress would otherwise parse as float
+        self.dtypes = dict(encoder.csv_dtypes)
+        self.score_fn = score_fn
+        self.feature_columns = list(feature_columns)
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def _source_size(source):
+
+        if hasattr(source, 'size'):
+            return source.size
+        if isinstance(source, (str, os.PathLike)):
+            return os.path.getsize(source)
+        return None
+
+    @staticmethod
+    def _source_position(source):
+
+        try:
+            return source.tell()
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def score_chunk(self, chunk):
+
+        chunk = self.clean_fn(chunk)
+        if len(chunk) == 0:
+            return chunk
+
+        X = self.encoder.transform(chunk[self.feature_columns])
+        risk = np.asarray(self.score_fn(X), dtype=np.float64) * 100
+
+        chunk = chunk.copy()
+        chunk["Depression Risk (%)"] = risk
+        chunk["Risk Category"] = categorize_risk_scores(chunk["Depression Risk (%)"])
+        return chunk
+
+    def score(self, source, progress_fn=None):
+        """Score every chunk of source and return the filled ResultStore"""
+        total_bytes = self._source_size(source)
+        store = ResultStore(cohort_vocabularies(self.encoder))
+        rows_read = 0
+
+        for chunk in pd.read_csv(source, chunksize=self.chunk_size, dtype=self.dtypes):
+            rows_read += len(chunk)
+            store.append(self.score_chunk(chunk))
+
+            if progress_fn is not None:
+                position = self._source_position(source)
+                fraction = None
+                if total_bytes and position is not None:
+                    fraction = min(position / total_bytes, 1.0)
+                progress_fn(rows_read, store.rows, fraction)
+
+        return store
@@ -0,0 +1,261 @@
+import argparse
+import io
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.batch_scorer import split_byte_ranges
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch.
+
+    Values enter level 0; a level that grows past k items is sorted and
+    every other item, from a random offset, moves up a level with twice the
+    weight. Memory stays around k items per level whatever the stream
+    length, sketches of separate chunks merge level by level, and while
+    nothing has been compacted the quantiles are exact.
+    """
+
+    def __init__(self, k=2048, seed=0):
+
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other):
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compress(self):
+
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays behind, so the total weight is unchanged
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q):
+        """Value at quantile q, interpolated between neighbouring ranks like pandas"""
+        if self.count == 0:
+            return np.nan
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, cumulative = values[order], np.cumsum(weights[order])
+
+        position = q * (cumulative[-1] - 1)
+        low, high = np.floor(position), np.ceil(position)
+        low_value = values[np.searchsorted(cumulative, low, side='right')]
+        high_value = values[np.searchsorted(cumulative, high, side='right')]
+        return low_value + (high_value - low_value) * (position - low)
+
+
+class ColumnMoments:
+    """Exact count, mean, variance, min and max, merged across chunks (Chan et al.)"""
+
+    def __init__(self):
+
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            other = ColumnMoments()
+            other.count = len(values)
+            other.mean = values.mean()
+            other.m2 = ((values - other.mean) ** 2).sum()
+            other.min, other.max = values.min(), values.max()
+            self.merge(other)
+
+    def merge(self, other):
+
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self):
+        # Sample standard deviation, as describe() reports it
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+class StreamingSummary:
+    """Missing values, target balance and key-variable statistics, built chunk by chunk.
+
+    Summaries of separate chunks merge into the summary of their union, so
+    chunks can be read in any order and by separate processes. Give each
+    part its own seed, so their sketches do not all compact the same way.
+    """
+
+    def __init__(self, stat_columns, target=None, sketch_size=2048, seed=0):
+
+        self.stat_columns = list(stat_columns)
+        self.target = target
+        self.sketch_size = sketch_size
+        self.rows = 0
+        self.missing = {}
+        self.target_counts = {}
+        self.moments = {col: ColumnMoments() for col in self.stat_columns}
+        self.sketches = {col: QuantileSketch(sketch_size, seed=[seed, i])
+                         for i, col in enumerate(self.stat_columns)}
+
+    def update(self, chunk):
+
+        self.rows += len(chunk)
+        for col, count in chunk.isnull().sum().items():
+            self.missing[col] = self.missing.get(col, 0) + int(count)
+        if self.target in chunk.columns:
+            for value, count in chunk[self.target].value_counts().items():
+                self.target_counts[value] = self.target_counts.get(value, 0) + int(count)
+        for col in self.stat_columns:
+            if col in chunk.columns:
+                values = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                self.moments[col].update(values)
+                self.sketches[col].update(values)
+        return self
+
+    def merge(self, other):
+
+        self.rows += other.rows
+        for col, count in other.missing.items():
+            self.missing[col] = self.missing.get(col, 0) + count
+        for value, count in other.target_counts.items():
+            self.target_counts[value] = self.target_counts.get(value, 0) + count
+        for col in self.stat_columns:
+            self.moments[col].merge(other.moments[col])
+            self.sketches[col].merge(other.sketches[col])
+        return self
+
+    def missing_counts(self):
+
+        return pd.Series(self.missing, dtype=int)
+
+    def target_distribution(self):
+        """Target value counts, most frequent first like value_counts()"""
+        counts = pd.Series(self.target_counts, dtype=int, name='count').rename_axis(self.target)
+        return counts.sort_values(ascending=False)
+
+    def target_mean(self):
+
+        total = sum(self.target_counts.values())
+        return sum(value * count for value, count in self.target_counts.items()) / total if total else np.nan
+
+    def stats_frame(self):
+        """Mean/Std/Min/Median/Max per key variable, in the layout of describe().T"""
+        return pd.DataFrame({
+            'mean': [self.moments[col].mean for col in self.stat_columns],
+            'std': [self.moments[col].std for col in self.stat_columns],
+            'min': [self.moments[col].min for col in self.stat_columns],
+            '50%': [self.sketches[col].quantile(0.5) for col in self.stat_columns],
+            'max': [self.moments[col].max for col in self.stat_columns]
+        }, index=self.stat_columns)
+
+
+def summarize_range(task):
+    """Summarize one byte range of a CSV, reading it in chunks"""
+    path, start, stop, columns, usecols, stat_columns, target, chunksize, sketch_size, seed = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    summary = StreamingSummary(stat_columns, target, sketch_size, seed)
+    reader = pd.read_csv(io.BytesIO(data), header=None, names=columns, usecols=usecols,
+                         chunksize=chunksize)
+    for chunk in reader:
+        summary.update(chunk)
+    return summary
+
+
+def summarize_csv(path, stat_columns, target=None, exclude=None, workers=1,
+                  chunksize=100000, range_bytes=32 << 20, sketch_size=2048):
+    """Summarize a CSV in one streaming pass, byte ranges spread across worker processes.
+
+    At most one range per worker is in memory at a time, so files larger
+    than RAM can be profiled.
+    """
+    started = time.perf_counter()
+    size = os.path.getsize(path)
+    n_ranges = max(workers, -(-size // range_bytes))
+    columns, ranges = split_byte_ranges(path, n_ranges)
+    usecols = [col for col in columns if not exclude or col not in exclude]
+    # The range number seeds its sketches
+    tasks = [(path, start, stop, columns, usecols, stat_columns, target, chunksize, sketch_size, i + 1)
+             for i, (start, stop) in enumerate(ranges)]
+
+    summary = StreamingSummary(stat_columns, target, sketch_size)
+    if workers > 1:
+        with multiprocessing.get_context().Pool(processes=workers) as pool:
+            for part in pool.imap_unordered(summarize_range, tasks):
+                summary.merge(part)
+    else:
+        for task in tasks:
+            summary.merge(summarize_range(task))
+
+    print(f"Streamed {summary.rows} rows of {path} ({size / 1e6:.1f} MB) in {len(ranges)} ranges "
+          f"across {workers} worker(s) in {time.perf_counter() - started:.2f}s")
+    return summary
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Streaming descriptive statistics of a CSV file")
+    parser.add_argument('input', help="CSV file to profile")
+    parser.add_argument('--columns', nargs='+', required=True, help="Numeric columns to describe")
+    parser.add_argument('--target', default=None, help="Column whose value balance is reported")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    summary = summarize_csv(args.input, args.columns, args.target, workers=args.workers)
+    missing = summary.missing_counts()
+    print("\nMissing values:")
+    print(missing[missing > 0] if missing.sum() > 0 else "None")
+    if args.target:
+        print(f"\nTarget distribution ({args.target}):")
+        print(summary.target_distribution())
+    print("\nStatistics:")
+    print(summary.stats_frame().round(2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import os
+import pickle
+import threading
+
+import numpy as np
+
+from src.forest_compiler import CompiledForest
+
+
+class ThresholdQuantizer:
+    """Maps encoded rows onto the split intervals of a compiled forest.
+
+    The forest only ever asks "x <= t" for the thresholds it learned, so two
+    rows that fall in the same interval of every feature reach the same
+    leaves. The tuple of interval indices is therefore an exact, lossless
+    key for the forest's output.
+    """
+
+    def __init__(self, thresholds, groups=None):
+
+        # Sorted unique thresholds per input feature (float32, rounded down)
+        self.thresholds = [np.asarray(t, dtype=np.float32) for t in thresholds]
+        self.n_features = len(self.thresholds)
+
+        # Mutually exclusive one-hot column groups, e.g. all Degree columns.
+        # Only columns some tree actually splits on are kept.
+        self.groups = []
+        for columns in (groups or []):
+            used = [col for col in columns if len(self.thresholds[col])]
+            if used:
+                self.groups.append(np.asarray(used, dtype=np.int64))
+        grouped = set(int(col) for group in self.groups for col in group)
+        self.free_features = np.asarray(
+            [f for f in range(self.n_features) if len(self.thresholds[f]) and f not in grouped],
+            dtype=np.int64)
+
+    @classmethod
+    def from_forest(cls, forest, encoder=None):
+
+        if not isinstance(forest, CompiledForest):
+            forest = CompiledForest.from_model(forest)
+
+        split_nodes = ~forest.is_leaf
+        features = forest.feature[split_nodes]
+        thresholds = forest.threshold[split_nodes]
+        per_feature = [np.unique(thresholds[features == f]) for f in range(forest.n_features)]
+
+        groups = None
+        if encoder is not None:
+            groups = [list(range(s.start, s.stop)) for s in encoder.categorical_slices.values()]
+        return cls(per_feature, groups)
+
+    @property
+    def interval_counts(self):
+        return [len(t) + 1 for t in self.thresholds]
+
+    @property
+    def axis_sizes(self):
+        """Number of distinct states on each independent axis of the input space"""
+        sizes = [len(self.thresholds[f]) + 1 for f in self.free_features]
+        sizes += [len(group) + 1 for group in self.groups]
+        return sizes
+
+    def space_size(self):
+        """Number of cells in the quantized input space"""
+        size = 1
+        for axis in self.axis_sizes:
+            size *= axis
+        return size
+
+    def can_materialize(self, max_cells):
+        return self.space_size() <= max_cells
+
+    def transform(self, X):
+        """Return the interval index of every cell, shape (n_rows, n_features)"""
+        X = np.asarray(X, dtype=np.float32)
+        bins = np.zeros(X.shape, dtype=np.int32)
+        for f in range(self.n_features):
+            if len(self.thresholds[f]):
+                # Number of thresholds strictly below x, i.e. how many splits send x right
+                bins[:, f] = np.searchsorted(self.thresholds[f], X[:, f], side='left')
+        return bins
+
+    def keys(self, X):
+        """Return one hashable bytes key per row"""
+        bins = np.ascontiguousarray(self.transform(X))
+        return [row.tobytes() for row in bins]
+
+    def cell_index(self, X):
+        """Return the flat cell number of each row, or -1 where a one-hot group is malformed"""
+        bins = self.transform(X)
+        index = np.zeros(len(bins), dtype=np.int64)
+        valid = np.ones(len(bins), dtype=bool)
+
+        for f in self.free_features:
+            index = index * (len(self.thresholds[f]) + 1) + bins[:, f]
+        for group in self.groups:
+            hot = bins[:, group] > 0
+            n_hot = hot.sum(axis=1)
+            valid &= n_hot <= 1
+            state = np.where(n_hot == 1, np.argmax(hot, axis=1) + 1, 0)
+            index = index * (len(group) + 1) + state
+
+        index[~valid] = -1
+        return index
+
+    def representatives(self, cells):
+        """Build one encoded row lying inside each of the given cells"""
+        cells = np.asarray(cells, dtype=np.int64)
+        rows = np.zeros((len(cells), self.n_features), dtype=np.float32)
+        states = np.unravel_index(cells, self.axis_sizes) if len(self.axis_sizes) else []
+
+        for axis, f in enumerate(self.free_features):
+            t = self.thresholds[f]
+            # Interval i is (t[i-1], t[i]]; the last one is everything above t[-1]
+            points = np.append(t, np.nextafter(t[-1], np.float32(np.inf)))
+            rows[:, f] = points[states[axis]]
+        for axis, group in enumerate(self.groups, start=len(self.free_features)):
+            state = states[axis]
+            hot = state > 0
+            rows[np.flatnonzero(hot), group[state[hot] - 1]] = 1.0
+        return rows
+
+    def describe(self):
+
+        return {
+            'n_features': self.n_features,
+            'split_features': int(sum(1 for t in self.thresholds if len(t))),
+            'intervals_per_feature': self.interval_counts,
+            'axis_sizes': self.axis_sizes,
+            'space_size': self.space_size()
+        }
+
+
+class QuantizedForest:
+    """Memoizing scorer that looks rows up by their threshold-interval key.
+
+    Unseen keys are scored with the compiled forest and remembered. When the
+    quantized input space is small enough, materialize() precomputes every
+    cell so scoring becomes a pure table lookup.
+
+    An analysis tool, not part of the scoring path: the deployed model's
+    space has about 1.8e14 cells, far too many to materialize, and the
+    memo only repeats what PredictionCache already does.
+    """
+
+    def __init__(self, forest, quantizer=None, max_entries=1000000):
+
+        if not isinstance(forest, CompiledForest):
+            forest = CompiledForest.from_model(forest)
+        self.forest = forest
+        self.quantizer = quantizer or ThresholdQuantizer.from_forest(forest)
+        self.max_entries = max_entries
+        self.table = None
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def materialize(self, max_cells=1000000, batch_size=65536):
+        """Precompute the forest over its whole quantized input space if it fits"""
+        size = self.quantizer.space_size()
+        if size > max_cells:
+            return False
+
+        table = np.empty((size, len(self.forest.classes_)), dtype=np.float64)
+        for start in range(0, size, batch_size):
+            cells = np.arange(start, min(start + batch_size, size))
+            table[cells] = self.forest.predict_proba(self.quantizer.representatives(cells))
+        self.table = table
+        return True
+
+    def predict_proba(self, X):
+
+        X = self.forest._prepare_input(X)
+        if self.table is not None:
+            cells = self.quantizer.cell_index(X)
+            proba = np.empty((len(X), self.table.shape[1]), dtype=np.float64)
+            known = cells >= 0
+            proba[known] = self.table[cells[known]]
+            if not known.all():
+                proba[~known] = self.forest.predict_proba(X[~known])
+            self.hits += int(known.sum())
+            self.misses += int((~known).sum())
+            return proba
+
+        # Deduplicate on the interval key, then consult the memo table
+        bins = np.ascontiguousarray(self.quantizer.transform(X))
+        bin_view = bins.view(np.dtype((np.void, bins.dtype.itemsize * bins.shape[1]))).ravel()
+        unique_keys, first_index, inverse = np.unique(
+            bin_view, return_index=True, return_inverse=True)
+        keys = [key.tobytes() for key in unique_keys]
+
+        results = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                results[i] = self._memo.get(key)
+        missing = [i for i, proba in enumerate(results) if proba is None]
+
+        if missing:
+            scored = self.forest.predict_proba(X[first_index[missing]])
+            with self._lock:
+                if len(self._memo) + len(missing) > self.max_entries:
+                    self._memo.clear()
+                for i, proba in zip(missing, scored):
+                    results[i] = proba
+                    self._memo[keys[i]] = proba
+
+        with self._lock:
+            self.hits += len(X) - len(missing)
+            self.misses += len(missing)
+        return np.stack(results)[inverse.ravel()]
+
+
+if __name__ == "__main__":
+    # Report how large the model's effective input space is
+    from src.fused_encoder import FusedEncoder
+
+    with open(os.path.join('model', 'depression_model.pkl'), 'rb') as f_model:
+        model = pickle.load(f_model)
+    with open(os.path.join('model', 'preprocessor.pkl'), 'rb') as f_pre:
+        preprocessor = pickle.load(f_pre)
+
+    encoder = FusedEncoder.from_preprocessor(preprocessor)
+    quantizer = ThresholdQuantizer.from_forest(model, encoder)
+    report = quantizer.describe()
+
+    print("=== FOREST INPUT SPACE ===")
+    for column, f in zip(encoder.numeric_columns, range(encoder.numeric_slice.start, encoder.numeric_slice.stop)):
+        print(f" {column}: {len(quantizer.thresholds[f]) + 1} intervals")
+    for column, columns in encoder.categorical_slices.items():
+        used = sum(1 for f in range(columns.start, columns.stop) if len(quantizer.thresholds[f]))
+        print(f" {column}: {used} of {columns.stop - columns.start} categories split on")
+    print(f"\nIndependent axes: {len(report['axis_sizes'])} {report['axis_sizes']}")
+    print(f"Cells in the quantized input space: {report['space_size']:,}")
+    for limit in (10 ** 6, 10 ** 8):
+        verdict = "fits" if quantizer.can_materialize(limit) else "does not fit"
+        print(f"Full materialization {verdict} in {limit:,} cells")
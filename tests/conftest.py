@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.data_cleaning import TRAINING_RULES  # noqa: E402
+
+DATASET_PATH = os.path.join(PROJECT_ROOT, 'data', 'student_depression_dataset.csv')
+
+
+@pytest.fixture(scope='session')
+def raw_frame():
+    """The first few thousand rows of the dataset, as read from the CSV.
+
+    Row 4458 holds a '?' in Financial Stress, so the column is text as in
+    the full dataset.
+    """
+    return pd.read_csv(DATASET_PATH, nrows=5000)
+
+
+@pytest.fixture(scope='session')
+def training_frame(raw_frame):
+
+    return TRAINING_RULES.apply(raw_frame)
+
+
+@pytest.fixture(scope='session')
+def fitted_model(training_frame):
+    """A small forest and preprocessor fitted the way train_and_export_model.py does"""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    X = training_frame.drop('Depression', axis=1)
+    y = training_frame['Depression']
+    numeric_features = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=['int64', 'float64']).columns.tolist()
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), numeric_features),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
+        ])
+    X_transformed = preprocessor.fit_transform(X)
+    model = RandomForestClassifier(n_estimators=20, random_state=42)
+    model.fit(X_transformed, y)
+    return model, preprocessor, X.columns.tolist()
+
+
+@pytest.fixture(scope='session')
+def encoded_rows(fitted_model, training_frame):
+
+    model, preprocessor, feature_columns = fitted_model
+    return preprocessor.transform(training_frame[feature_columns])
@@ -0,0 +1,43 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src.batch_scorer import split_byte_ranges
+
+
+def read_ranges(path, n_ranges, block_bytes):
+
+    columns, ranges = split_byte_ranges(path, n_ranges, block_bytes)
+    with open(path, 'rb') as f:
+        data = f.read()
+    parts = [pd.read_csv(io.BytesIO(data[start:stop]), header=None, names=columns)
+             for start, stop in ranges]
+    return ranges, pd.concat(parts, ignore_index=True)
+
+
+@pytest.mark.parametrize('block_bytes', [7, 64, 1 << 20])
+def test_ranges_never_split_quoted_newlines(tmp_path, block_bytes):
+
+    frame = pd.DataFrame({
+        'id': range(200),
+        'note': [f'line {i}\nstill "row" {i}' if i % 3 == 0 else f'plain {i}' for i in range(200)],
+        'value': [i / 10 for i in range(200)]
+    })
+    path = tmp_path / 'quoted.csv'
+    frame.to_csv(path, index=False)
+
+    ranges, joined = read_ranges(path, 16, block_bytes)
+    assert len(ranges) > 1
+    pd.testing.assert_frame_equal(joined, frame)
+
+
+def test_ranges_cover_the_body_contiguously(tmp_path):
+
+    path = tmp_path / 'plain.csv'
+    pd.DataFrame({'a': range(1000), 'b': ['x'] * 1000}).to_csv(path, index=False)
+    columns, ranges = split_byte_ranges(path, 8)
+    assert columns == ['a', 'b']
+    assert ranges[0][0] == len(b'a,b\n') and ranges[-1][1] == path.stat().st_size
+    assert all(stop == start for (_, stop), (start, _) in zip(ranges, ranges[1:]))
+    assert 7 <= len(ranges) <= 9
@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.cohort_generator import SAMPLE_BLOCK_ROWS, CohortGenerator
+from src.streaming_scorer import clean_upload_chunk
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'student_depression_dataset.csv')
+N_ROWS = SAMPLE_BLOCK_ROWS + 2500
+# '?' is rare in Financial Stress, so a sample may parse it as numbers; read it as text
+TEXT_DTYPES = {'Financial Stress': str}
+
+
+@pytest.fixture(scope='module')
+def generator():
+
+    return CohortGenerator.fit(DATASET_PATH)
+
+
+@pytest.fixture(scope='module')
+def cohort_path(generator, tmp_path_factory):
+
+    path = str(tmp_path_factory.mktemp('cohort') / 'cohort.csv')
+    assert generator.write_csv(path, N_ROWS, seed=7, chunk_size=4000) == N_ROWS
+    return path
+
+
+def test_header_and_schema_match_the_reference(cohort_path):
+
+    reference = pd.read_csv(DATASET_PATH, dtype=TEXT_DTYPES)
+    cohort = pd.read_csv(cohort_path, dtype=TEXT_DTYPES)
+    with open(DATASET_PATH) as f_ref, open(cohort_path) as f_out:
+        assert f_out.readline() == f_ref.readline()
+    assert cohort.dtypes.to_dict() == reference.dtypes.to_dict()
+    assert cohort['id'].tolist() == list(range(1, N_ROWS + 1))
+
+
+def test_same_seed_gives_the_same_rows(generator, cohort_path, tmp_path):
+
+    again, other = str(tmp_path / 'again.csv'), str(tmp_path / 'other.csv')
+    generator.write_csv(again, N_ROWS, seed=7, chunk_size=4000)
+    generator.write_csv(other, N_ROWS, seed=8, chunk_size=4000)
+    with open(cohort_path) as f_first, open(again) as f_again, open(other) as f_other:
+        first = f_first.read()
+        assert f_again.read() == first
+        assert f_other.read() != first
+
+
+@pytest.mark.parametrize('chunk_size', [999, SAMPLE_BLOCK_ROWS, 50000])
+def test_rows_do_not_depend_on_chunk_size(generator, cohort_path, tmp_path, chunk_size):
+
+    path = str(tmp_path / 'chunked.csv')
+    generator.write_csv(path, N_ROWS, seed=7, chunk_size=chunk_size)
+    with open(cohort_path) as f_first, open(path) as f_chunked:
+        assert f_chunked.read() == f_first.read()
+
+
+def test_generated_rows_pass_upload_cleaning(fitted_model, cohort_path):
+
+    quarantine = []
+    cleaned = clean_upload_chunk(pd.read_csv(cohort_path), fitted_model[2], quarantine=quarantine)
+    assert len(cleaned) > 0.9 * N_ROWS
+    assert quarantine == []
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from src.data_cleaning import PREDICTOR_RULES, TRAINING_RULES, UPLOAD_RULES
+
+# The hand-written chains the rule sets replaced, as they were in
+# train_and_export_model.py, clean_upload_chunk and StudentDepressionPredictor.clean_data
+
+
+def old_training_chain(df):
+
+    columns_to_remove = ['City', 'Work Pressure', 'Job Satisfaction', 'id']
+    for col in columns_to_remove:
+        if col in df.columns:
+            df = df.drop(col, axis=1)
+    if 'Profession' in df.columns:
+        df = df[df['Profession'] == 'Student']
+        df = df.drop('Profession', axis=1)
+    for col in ['Sleep Duration', 'Financial Stress']:
+        if col in df.columns:
+            df = df[~df[col].isin(['Others', '?', 'unknown'])]
+    return df
+
+
+def old_upload_chain(chunk):
+
+    columns_to_remove = ['City', 'Work Pressure', 'Job Satisfaction', 'id']
+    chunk = chunk.drop(columns=[col for col in columns_to_remove if col in chunk.columns])
+    if 'Profession' in chunk.columns:
+        chunk = chunk[chunk['Profession'] == 'Student'].drop(columns='Profession')
+    for col in ['Sleep Duration', 'Financial Stress']:
+        if col in chunk.columns:
+            chunk = chunk[~chunk[col].isin(['Others', '?', 'unknown'])]
+    if 'Depression' in chunk.columns:
+        chunk = chunk.drop(columns='Depression')
+    return chunk
+
+
+def old_predictor_chain(df):
+
+    for col in ['City', 'Work Pressure', 'Job Satisfaction']:
+        if col in df.columns:
+            df = df.drop(col, axis=1)
+    if 'Profession' in df.columns:
+        df = df[df['Profession'] == 'Student']
+    for col in ['Sleep Duration', 'Financial Stress']:
+        if col in df.columns:
+            df = df[~df[col].isin(['Others', '?', 'unknown'])]
+    if 'id' in df.columns:
+        df = df.drop('id', axis=1)
+    return df
+
+
+@pytest.fixture(scope='module', params=['raw', 'with_placeholders'])
+def frame(request, raw_frame):
+    """The raw rows, and a copy where every rule has rows to remove"""
+    if request.param == 'raw':
+        return raw_frame
+    df = raw_frame.copy()
+    df.loc[df.index[::7], 'Profession'] = 'Teacher'
+    df.loc[df.index[1::11], 'Sleep Duration'] = 'Others'
+    df.loc[df.index[2::13], 'Financial Stress'] = 'unknown'
+    return df
+
+
+@pytest.mark.parametrize('rules, old_chain', [(TRAINING_RULES, old_training_chain),
+                                              (UPLOAD_RULES, old_upload_chain),
+                                              (PREDICTOR_RULES, old_predictor_chain)],
+                         ids=['training', 'upload', 'predictor'])
+def test_rules_match_the_old_cleaning_chains(frame, rules, old_chain):
+
+    expected = old_chain(frame)
+    assert 0 < len(expected) < len(frame)
+    pd.testing.assert_frame_equal(rules.apply(frame), expected)
+    pd.testing.assert_frame_equal(rules.apply(frame, verbose=True), expected)
+
+
+def test_projection_matches_selecting_columns_afterwards(frame, fitted_model):
+
+    feature_columns = fitted_model[2]
+    pd.testing.assert_frame_equal(UPLOAD_RULES.apply(frame, columns=feature_columns),
+                                  old_upload_chain(frame)[feature_columns])
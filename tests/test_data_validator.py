@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from src.data_validator import DataValidator
+from src.streaming_scorer import clean_upload_chunk
+
+
+@pytest.fixture(scope='module')
+def validator():
+
+    return DataValidator()
+
+
+def test_cleaned_training_rows_are_all_valid(validator, training_frame):
+
+    fields = [col for col in training_frame.columns if col != 'Depression']
+    result = validator.validate_frame(training_frame, fields=fields)
+    assert result['error_counts'] == {}
+    assert len(result['valid']) == len(training_frame)
+
+
+def test_raw_rows_fail_only_on_what_cleaning_drops(validator, raw_frame):
+
+    result = validator.validate_frame(raw_frame)
+    assert set(result['error_counts']) <= {'Profession', 'Sleep Duration', 'Financial Stress'}
+    assert result['quarantine']['Invalid Fields'].notna().all()
+
+
+@pytest.mark.parametrize('value, expected', [('3.0', 3), (5, 5), ('1', 1), ('2.5', None),
+                                             ('6.0', None), ('?', None), (None, None)])
+def test_financial_stress_accepts_whole_numbers_as_floats(validator, value, expected):
+
+    assert validator.validate_financial_stress(value) == expected
+
+
+def test_labels_match_the_dataset_spelling(validator):
+
+    assert validator.validate_degree("'Class 12'") == "'Class 12'"
+    assert validator.validate_degree('BSc') == 'BSc'
+    assert validator.validate_degree('Bsc') is None
+    assert validator.validate_sleep_duration("'5-6 hours'") == "'5-6 hours'"
+    assert validator.validate_sleep_duration('Others') is None
+    assert validator.validate_dietary_habits('Moderate') == 'Moderate'
+    assert validator.validate_cgpa(8.97) == 8.97
+
+
+def test_frame_rules_match_the_scalar_rules(validator):
+
+    frame = pd.DataFrame({'Age': [18.0, 59.0, 61.0, 20.5], 'CGPA': [0.0, 10.0, 10.5, 7.2]})
+    errors = validator.validate_frame(frame, fields=['Age', 'CGPA'])['errors']
+    assert errors['Age'].tolist() == [validator.validate_age(v) is None for v in frame['Age']]
+    assert errors['CGPA'].tolist() == [False, False, True, False]
+
+
+def test_upload_cleaning_quarantines_invalid_rows(raw_frame, fitted_model):
+
+    feature_columns = fitted_model[2]
+    chunk = raw_frame.head(200).copy()
+    chunk.loc[chunk.index[:3], 'Age'] = 99
+    quarantine = []
+    cleaned = clean_upload_chunk(chunk, feature_columns, quarantine=quarantine)
+    assert len(quarantine) == 1 and len(quarantine[0]) == 3
+    assert set(quarantine[0]['Invalid Fields']) == {'Age'}
+    assert not cleaned.index.isin(quarantine[0].index).any()
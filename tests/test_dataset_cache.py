@@ -0,0 +1,105 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.dataset_cache import DatasetCache
+
+
+@pytest.fixture
+def csv_path(raw_frame, tmp_path):
+
+    path = tmp_path / 'students.csv'
+    raw_frame.to_csv(path, index=False)
+    return str(path)
+
+
+def _cache(csv_path):
+
+    return DatasetCache(csv_path, os.path.join(os.path.dirname(csv_path), 'cache'))
+
+
+def test_second_load_hits_the_cache_and_matches_read_csv(csv_path):
+
+    cache = _cache(csv_path)
+    built = cache.load()
+    assert cache.last_load['source'] == 'csv'
+
+    cached = cache.load()
+    assert cache.last_load['source'] == 'cache'
+    expected = pd.read_csv(csv_path)
+    pd.testing.assert_frame_equal(built, expected)
+    pd.testing.assert_frame_equal(cached, expected)
+
+
+def test_only_requested_columns_are_loaded(csv_path):
+
+    cache = _cache(csv_path)
+    cache.load()
+    df = cache.load(columns=['CGPA', 'Gender', 'Age'], exclude={'Age'})
+    assert cache.last_load['source'] == 'cache'
+    pd.testing.assert_frame_equal(df, pd.read_csv(csv_path)[['CGPA', 'Gender']])
+
+
+def test_touched_file_is_rehashed_once_and_trusted(csv_path):
+
+    cache = _cache(csv_path)
+    cache.load()
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    cache.load()
+    assert cache.last_load['source'] == 'cache'
+    assert cache._read_manifest()['mtime_ns'] == os.stat(csv_path).st_mtime_ns
+
+
+def test_changed_size_rebuilds(csv_path):
+
+    cache = _cache(csv_path)
+    rows = len(cache.load())
+    with open(csv_path) as f:
+        last_line = f.read().splitlines()[-1]
+    with open(csv_path, 'a') as f:
+        f.write(last_line + '\n')
+
+    df = cache.load()
+    assert cache.last_load['source'] == 'csv'
+    assert len(df) == rows + 1
+
+
+def test_same_size_edit_is_caught_by_the_hash(csv_path):
+
+    cache = _cache(csv_path)
+    cache.load()
+    stat = os.stat(csv_path)
+    with open(csv_path) as f:
+        text = f.read()
+    # Same length, different content; the mtime is moved so the hash is checked
+    with open(csv_path, 'w') as f:
+        f.write(text.replace('Male', 'Mal_', 1))
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert os.stat(csv_path).st_size == stat.st_size
+
+    df = cache.load()
+    assert cache.last_load['source'] == 'csv'
+    assert (df['Gender'] == 'Mal_').sum() == 1
+    pd.testing.assert_frame_equal(cache.load(), pd.read_csv(csv_path))
+
+
+def test_text_columns_round_trip_through_codes(tmp_path):
+
+    path = tmp_path / 'text.csv'
+    pd.DataFrame({
+        'City': ['Pune', None, 'Délhi', 'Pune', "'Quoted'"],
+        'Financial Stress': ['1.0', '?', '2.0', None, '1.0'],
+        'Age': [18, 19, 20, 21, 22]
+    }).to_csv(path, index=False)
+    cache = _cache(str(path))
+    cache.load()
+
+    manifest = cache._read_manifest()
+    city = next(entry for entry in manifest['columns'] if entry['name'] == 'City')
+    assert city['vocabulary'] == ['Pune', 'Délhi', "'Quoted'"]
+    cached = cache.load()
+    assert cache.last_load['source'] == 'cache'
+    pd.testing.assert_frame_equal(cached, pd.read_csv(path))
@@ -0,0 +1,50 @@
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
+from sklearn.pipeline import Pipeline
+
+from src.depression_predictor import StudentDepressionPredictor
+
+GRID = {
+    'classifier__n_estimators': [4, 8],
+    'classifier__max_depth': [None, 10, 20],
+    'classifier__min_samples_split': [2, 5],
+    'classifier__min_samples_leaf': [1, 2]
+}
+
+
+@pytest.fixture(scope='module')
+def predictor():
+
+    return StudentDepressionPredictor.__new__(StudentDepressionPredictor)
+
+
+@pytest.mark.parametrize('mode, fits', [('grid', 120), ('fold_cached', 120), ('distributed', 120),
+                                        ('oob', 24), ('warm_start', 60)])
+def test_search_fit_counts(predictor, mode, fits):
+
+    assert predictor.count_search_fits(GRID, mode) == fits
+
+
+@pytest.mark.parametrize('mode', ['halving', 'halving_trees'])
+def test_halving_fit_count_is_the_last_round(predictor, mode):
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 3))
+    y = (X[:, 0] > 0).astype(int)
+    pipeline = Pipeline([('classifier', RandomForestClassifier(n_estimators=2, random_state=0))])
+    if mode == 'halving':
+        search = HalvingGridSearchCV(pipeline, GRID, cv=5, factor=3, min_resources='exhaust',
+                                     random_state=42)
+    else:
+        grid = {name: values for name, values in GRID.items() if name != 'classifier__n_estimators'}
+        search = HalvingGridSearchCV(pipeline, grid, cv=5, resource='classifier__n_estimators',
+                                     factor=2, min_resources=1, max_resources=8, random_state=42)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        search.fit(X, y)
+    assert predictor.count_search_fits(GRID, mode) == search.n_candidates_[-1] * 5
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from src.forest_compiler import CompiledForest
+
+
+def test_predict_proba_matches_sklearn(fitted_model, encoded_rows):
+
+    model = fitted_model[0]
+    compiled = CompiledForest.from_model(model)
+    np.testing.assert_allclose(compiled.predict_proba(encoded_rows),
+                               model.predict_proba(encoded_rows), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('n_threads', [1, 2])
+def test_predict_proba_is_thread_independent(fitted_model, encoded_rows, n_threads):
+
+    model = fitted_model[0]
+    compiled = CompiledForest.from_model(model)
+    np.testing.assert_allclose(compiled.predict_proba(encoded_rows, n_threads=n_threads),
+                               model.predict_proba(encoded_rows), rtol=0, atol=1e-12)
+
+
+def test_apply_and_predict_match_sklearn(fitted_model, encoded_rows):
+
+    model = fitted_model[0]
+    compiled = CompiledForest.from_model(model)
+    X = encoded_rows[:200]
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+    assert compiled.apply(X).shape == model.apply(X).T.shape
+
+
+def test_from_model_rejects_unfitted_models():
+
+    from sklearn.ensemble import RandomForestClassifier
+    with pytest.raises(ValueError):
+        CompiledForest.from_model(RandomForestClassifier())
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from src.fused_encoder import FusedEncoder
+
+
+def _dense(matrix):
+
+    return matrix.toarray() if hasattr(matrix, 'toarray') else np.asarray(matrix)
+
+
+@pytest.fixture(scope='module')
+def encoder(fitted_model):
+
+    return FusedEncoder.from_preprocessor(fitted_model[1])
+
+
+def test_transform_matches_column_transformer(fitted_model, training_frame, encoder):
+
+    preprocessor, feature_columns = fitted_model[1], fitted_model[2]
+    X = training_frame[feature_columns]
+    np.testing.assert_allclose(encoder.transform(X), _dense(preprocessor.transform(X)),
+                               rtol=0, atol=1e-5)
+
+
+def test_unknown_categories_encode_to_zeros(fitted_model, training_frame, encoder):
+
+    preprocessor, feature_columns = fitted_model[1], fitted_model[2]
+    X = training_frame[feature_columns].head(50).copy()
+    X['Degree'] = 'Unseen degree'
+    np.testing.assert_allclose(encoder.transform(X), _dense(preprocessor.transform(X)),
+                               rtol=0, atol=1e-5)
+
+
+def test_categorical_dtype_matches_text_columns(fitted_model, training_frame, encoder):
+
+    feature_columns = fitted_model[2]
+    X = training_frame[feature_columns]
+    as_categories = X.astype({col: 'category' for col in encoder.categorical_columns})
+    np.testing.assert_array_equal(encoder.transform(as_categories), encoder.transform(X))
+
+
+def test_feature_names_match_column_transformer(fitted_model, encoder):
+
+    np.testing.assert_array_equal(encoder.get_feature_names_out(),
+                                  fitted_model[1].get_feature_names_out())
+
+
+def test_missing_columns_are_reported(fitted_model, training_frame, encoder):
+
+    X = training_frame[fitted_model[2]].drop(columns=['Degree'])
+    with pytest.raises(ValueError, match='Degree'):
+        encoder.transform(X)
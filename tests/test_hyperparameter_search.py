@@ -0,0 +1,32 @@
+import warnings
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+from src.hyperparameter_search import _fit_oob, rank_agreement
+
+
+def test_oob_score_skips_rows_without_votes():
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 3))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=60) > 0).astype(int)
+    params = {'n_estimators': 3, 'random_state': 0}
+
+    with warnings.catch_warnings():
+        # Three trees leave some rows without an out-of-bag vote
+        warnings.simplefilter('ignore')
+        score, _ = _fit_oob(RandomForestClassifier(), params, X, y)
+        forest = RandomForestClassifier(bootstrap=True, oob_score=True, **params).fit(X, y)
+
+    decision = forest.oob_decision_function_
+    voted = decision.sum(axis=1) > 0
+    assert not voted.all()
+    assert score == roc_auc_score(y[voted], decision[voted, 1])
+
+
+def test_rank_agreement():
+
+    assert rank_agreement([0.9, 0.8, 0.7], [0.91, 0.81, 0.71]) == {'kendall_tau': 1.0, 'same_best': True}
+    assert rank_agreement([0.7, 0.8, 0.9], [0.9, 0.8, 0.7])['same_best'] is False
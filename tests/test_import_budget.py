@@ -0,0 +1,36 @@
+import pickle
+import subprocess
+import sys
+
+from src.import_budget import PROJECT_ROOT
+from src.model_artifacts import ARRAY_DIR_NAME, export_artifacts
+
+# Loads the default InferenceModel in a fresh interpreter and reports what it imported
+LOAD_AND_REPORT = (
+    "import sys\n"
+    "from src.inference import InferenceModel\n"
+    "model = InferenceModel.load(sys.argv[1])\n"
+    "print(type(model.forest).__name__, 'sklearn' in sys.modules)\n"
+)
+
+
+def test_inference_modules_meet_the_import_budget():
+
+    result = subprocess.run([sys.executable, '-m', 'src.import_budget'],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_default_load_does_not_import_sklearn(fitted_model, tmp_path):
+
+    model, preprocessor, feature_columns = fitted_model
+    for name, obj in [('depression_model.pkl', model), ('preprocessor.pkl', preprocessor),
+                      ('feature_columns.pkl', feature_columns)]:
+        with open(tmp_path / name, 'wb') as f:
+            pickle.dump(obj, f)
+    export_artifacts(model, preprocessor, feature_columns, str(tmp_path / ARRAY_DIR_NAME))
+
+    result = subprocess.run([sys.executable, '-c', LOAD_AND_REPORT, str(tmp_path)],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['CompiledForest', 'False']
@@ -0,0 +1,77 @@
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pytest
+
+from src.model_artifacts import (ARRAY_DIR_NAME, export_artifacts, load_artifacts,
+                                 load_scoring_artifacts, read_manifest, verify_artifacts)
+
+
+@pytest.fixture
+def model_dir(fitted_model, tmp_path):
+    """A model directory laid out the way train_and_export_model.py writes it"""
+    model, preprocessor, feature_columns = fitted_model
+    for name, obj in [('depression_model.pkl', model), ('preprocessor.pkl', preprocessor),
+                      ('feature_columns.pkl', feature_columns)]:
+        with open(tmp_path / name, 'wb') as f:
+            pickle.dump(obj, f)
+    export_artifacts(model, preprocessor, feature_columns, str(tmp_path / ARRAY_DIR_NAME))
+    return str(tmp_path)
+
+
+def test_arrays_are_the_default_source(model_dir):
+
+    # Nothing is unpickled, so the default load works without the forest pickle
+    os.remove(os.path.join(model_dir, 'depression_model.pkl'))
+    artifacts = load_scoring_artifacts(model_dir)
+    manifest = read_manifest(os.path.join(model_dir, ARRAY_DIR_NAME))
+    assert artifacts['compiled'] and artifacts['source'].endswith(ARRAY_DIR_NAME)
+    assert artifacts['model_hash'] == manifest['model_hash']
+
+
+def test_model_hash_matches_across_load_paths(model_dir):
+
+    from_arrays = load_scoring_artifacts(model_dir)
+    sklearn_forest = load_scoring_artifacts(model_dir, compiled=False)
+    assert not sklearn_forest['compiled'] and hasattr(sklearn_forest['forest'], 'estimators_')
+    assert sklearn_forest['model_hash'] == from_arrays['model_hash']
+
+    # Without arrays the pickles are the fallback, and hash the same
+    shutil.rmtree(os.path.join(model_dir, ARRAY_DIR_NAME))
+    from_pickle = load_scoring_artifacts(model_dir)
+    assert from_pickle['source'] == model_dir
+    assert from_pickle['model_hash'] == from_arrays['model_hash']
+
+
+def test_memory_mapped_forest_matches_sklearn(model_dir, fitted_model, encoded_rows):
+
+    forest, encoder, feature_columns, _ = load_artifacts(os.path.join(model_dir, ARRAY_DIR_NAME))
+    np.testing.assert_allclose(forest.predict_proba(encoded_rows),
+                               fitted_model[0].predict_proba(encoded_rows), rtol=0, atol=1e-12)
+    assert feature_columns == fitted_model[2]
+
+
+def test_each_export_gets_a_new_version_and_old_ones_are_pruned(model_dir, fitted_model):
+
+    array_dir = os.path.join(model_dir, ARRAY_DIR_NAME)
+    first = read_manifest(array_dir)['version']
+    versions = [export_artifacts(*fitted_model, array_dir)['version'] for _ in range(3)]
+
+    assert len(set([first] + versions)) == 4
+    assert read_manifest(array_dir)['version'] == versions[-1]
+    kept = sorted(name for name in os.listdir(array_dir) if name.startswith('v'))
+    assert kept == sorted(versions[-2:])
+    assert verify_artifacts(array_dir) == []
+
+
+def test_verify_reports_modified_files(model_dir):
+
+    array_dir = os.path.join(model_dir, ARRAY_DIR_NAME)
+    manifest = read_manifest(array_dir)
+    with open(os.path.join(array_dir, manifest['version'], 'forest_threshold.npy'), 'ab') as f:
+        f.write(b'\0')
+    assert verify_artifacts(array_dir) == ['forest_threshold']
+    with pytest.raises(ValueError):
+        load_artifacts(array_dir, verify=True)
@@ -0,0 +1,77 @@
+import os
+import pickle
+
+import pytest
+
+from src.model_artifacts import ARRAY_DIR_NAME, export_artifacts, read_manifest
+from src.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def model_dir(fitted_model, tmp_path):
+    """Pickles plus exported arrays whose manifest records the pickles' hashes"""
+    model, preprocessor, feature_columns = fitted_model
+    paths = []
+    for name, obj in [('depression_model.pkl', model), ('preprocessor.pkl', preprocessor),
+                      ('feature_columns.pkl', feature_columns)]:
+        with open(tmp_path / name, 'wb') as f:
+            pickle.dump(obj, f)
+        paths.append(str(tmp_path / name))
+    export_artifacts(model, preprocessor, feature_columns, str(tmp_path / ARRAY_DIR_NAME),
+                     pickle_paths=paths)
+    return str(tmp_path)
+
+
+def _reexport(model_dir, fitted_model):
+
+    return export_artifacts(*fitted_model, os.path.join(model_dir, ARRAY_DIR_NAME))
+
+
+def test_no_reload_when_nothing_changed(model_dir):
+
+    registry = ModelRegistry(model_dir, check_interval=0, warmup_rows=8)
+    snapshot = registry.current()
+    assert registry.check_for_update(wait=True) is False
+    assert registry.current() is snapshot
+    assert registry.swaps == 0
+
+
+def test_new_manifest_swaps_in_a_new_snapshot(model_dir, fitted_model, encoded_rows):
+
+    registry = ModelRegistry(model_dir, check_interval=0, warmup_rows=8)
+    old = registry.current()
+    manifest = _reexport(model_dir, fitted_model)
+
+    assert registry.check_for_update(wait=True) is True
+    new = registry.current()
+    assert new is not old and registry.swaps == 1
+    assert new.source.endswith(ARRAY_DIR_NAME) and new.signature != old.signature
+    assert new.model_hash == manifest['model_hash']
+    # A request that started on the old snapshot can still finish with it
+    assert old.forest.predict_proba(encoded_rows).shape == (encoded_rows.shape[0], 2)
+
+
+def test_failed_reload_keeps_the_previous_snapshot(model_dir, fitted_model):
+
+    registry = ModelRegistry(model_dir, check_interval=0, warmup_rows=8)
+    old = registry.current()
+    manifest = _reexport(model_dir, fitted_model)
+    array_dir = os.path.join(model_dir, ARRAY_DIR_NAME)
+    with open(os.path.join(array_dir, manifest['version'], 'forest_children.npy'), 'ab') as f:
+        f.write(b'\0')
+
+    assert registry.check_for_update(wait=True) is True
+    assert isinstance(registry.last_error, ValueError)
+    assert registry.current() is old and registry.swaps == 0
+    # The same broken version is not retried until the manifest changes again
+    assert registry.check_for_update(wait=True) is False
+    assert read_manifest(array_dir)['version'] == manifest['version']
+
+
+def test_sklearn_registry_rejects_pickles_that_differ_from_the_manifest(model_dir):
+
+    with open(os.path.join(model_dir, 'depression_model.pkl'), 'ab') as f:
+        f.write(b'\0')
+    assert ModelRegistry(model_dir, warmup_rows=8).current() is not None
+    with pytest.raises(ValueError, match='depression_model.pkl'):
+        ModelRegistry(model_dir, warmup_rows=8, compiled=False).current()
@@ -0,0 +1,98 @@
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from src.prediction_cache import PredictionCache
+
+
+def score(X):
+
+    p = X.sum(axis=1, dtype=np.float64) % 1.0
+    return np.column_stack([1 - p, p])
+
+
+def rows(n, offset=0):
+
+    return np.arange(offset, offset + n, dtype=np.float32)[:, None] * np.float32([0.25, 0.5])
+
+
+def test_results_match_score_fn_with_duplicates():
+
+    cache = PredictionCache('model')
+    X = np.vstack([rows(10), rows(10)])
+    np.testing.assert_array_equal(cache.predict_proba(X, score), score(X))
+    assert cache.stats()['batch_duplicates'] == 10
+    np.testing.assert_array_equal(cache.predict_proba(X, score), score(X))
+    assert cache.stats()['memory_hits'] == 10
+
+
+def test_disk_store_serves_a_new_instance(tmp_path):
+
+    path = str(tmp_path / 'cache.sqlite')
+    X = rows(1200)
+    first = PredictionCache('model', path=path)
+    first.predict_proba(X, score)
+    first.close()
+
+    # More keys than one IN query holds
+    second = PredictionCache('model', path=path)
+    calls = []
+    result = second.predict_proba(X, lambda batch: calls.append(len(batch)) or score(batch))
+    np.testing.assert_array_equal(result, score(X))
+    assert calls == [] and second.stats()['disk_hits'] == 1200
+
+    # Another model version never sees these rows
+    other = PredictionCache('other', path=path)
+    other.predict_proba(X[:5], score)
+    assert other.stats()['misses'] == 5
+
+
+def test_size_cap_keeps_the_newest_rows(tmp_path):
+
+    path = str(tmp_path / 'cache.sqlite')
+    cache = PredictionCache('model', path=path, max_disk_entries=100, prune_every=50)
+    for start in range(0, 300, 50):
+        cache.predict_proba(rows(50, start), score)
+    count = cache._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+    assert count <= 100
+
+
+def test_age_cap_and_schema_migration(tmp_path):
+
+    path = str(tmp_path / 'cache.sqlite')
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE predictions (model_hash TEXT NOT NULL, row_key BLOB NOT NULL, "
+               "proba BLOB NOT NULL, PRIMARY KEY (model_hash, row_key))")
+    db.execute("INSERT INTO predictions VALUES ('model', x'00', x'00')")
+    db.commit()
+    db.close()
+
+    cache = PredictionCache('model', path=path, max_age_days=1)
+    assert cache._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] == 1
+    cache._db.execute("UPDATE predictions SET created = ?", (time.time() - 2 * 86400,))
+    cache._db.commit()
+    assert cache.prune() == 1
+
+
+def test_concurrent_threads_share_the_store(tmp_path):
+
+    cache = PredictionCache('model', path=str(tmp_path / 'cache.sqlite'))
+    errors = []
+
+    def run(offset):
+        try:
+            for _ in range(5):
+                X = rows(200, offset)
+                np.testing.assert_array_equal(cache.predict_proba(X, score), score(X))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i * 100,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.close()
+    assert errors == []
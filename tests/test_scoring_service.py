@@ -0,0 +1,64 @@
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from src.scoring_service import RequestError, ScoringService
+
+
+@pytest.fixture(scope='module')
+def service(fitted_model, tmp_path_factory):
+
+    model_dir = tmp_path_factory.mktemp('model')
+    model, preprocessor, feature_columns = fitted_model
+    for name, obj in [('depression_model.pkl', model), ('preprocessor.pkl', preprocessor),
+                      ('feature_columns.pkl', feature_columns)]:
+        with open(model_dir / name, 'wb') as f:
+            pickle.dump(obj, f)
+    return ScoringService(str(model_dir), max_wait_ms=1.0)
+
+
+def record(**changes):
+
+    values = {
+        'Gender': 'Male', 'Age': 21, 'Profession': 'Student', 'Academic Pressure': 4,
+        'CGPA': 7.5, 'Study Satisfaction': 2, 'Sleep Duration': '5-6 hours',
+        'Dietary Habits': 'Moderate', 'Degree': 'BSc',
+        'Have you ever had suicidal thoughts ?': 'Yes', 'Work/Study Hours': 8,
+        'Financial Stress': 3, 'Family History of Mental Illness': 'No'
+    }
+    values.update(changes)
+    return values
+
+
+def test_json_spellings_validate_and_score(service, fitted_model):
+
+    model, preprocessor, feature_columns = fitted_model
+    frame = service.parse_records([record(), record(**{'Degree': "'Class 12'", 'Financial Stress': '2.0'})])
+    assert frame['Sleep Duration'].tolist() == ["'5-6 hours'"] * 2
+    response = service.predict([record()])
+    expected = model.predict_proba(preprocessor.transform(frame[feature_columns].head(1)))[0, 1] * 100
+    assert response['predictions'][0]['Depression Risk (%)'] == pytest.approx(round(expected, 2))
+
+
+@pytest.mark.parametrize('changes, field', [({'CGPA': 12}, 'CGPA'), ({'Age': 80}, 'Age'),
+                                            ({'Financial Stress': 2.5}, 'Financial Stress'),
+                                            ({'Degree': 'Bachelors'}, 'Degree')])
+def test_invalid_records_are_rejected(service, changes, field):
+
+    with pytest.raises(RequestError, match=f"Record 1: invalid values for {field}"):
+        service.parse_records([record(), record(**changes)])
+
+
+def test_response_reports_the_snapshot_that_scored_it(service, monkeypatch):
+
+    # Swap in another version between parsing the request and scoring its batch
+    loaded = service.registry.current()
+    swapped = SimpleNamespace(encoder=loaded.encoder, forest=loaded.forest,
+                              feature_columns=loaded.feature_columns, model_hash='swapped')
+    snapshots = iter([loaded, swapped])
+    monkeypatch.setattr(service.registry, 'current', lambda: next(snapshots))
+
+    response = service.predict([record(), record(Age=30)])
+    assert response['model_hash'] == 'swapped'
+    assert len(response['predictions']) == 2
@@ -0,0 +1,48 @@
+import os
+import time
+
+from src.search_queue import SearchWorkQueue, start_local_workers
+
+
+def test_expired_leases_count_as_attempts(tmp_path):
+
+    queue = SearchWorkQueue(str(tmp_path / 'queue.sqlite'))
+    job_id = queue.publish(None, [{'max_depth': 2}], 1)
+
+    # Each worker dies holding the lease; the third expiry marks the task failed
+    for attempt in range(3):
+        task = queue.claim(f"worker-{attempt}", lease_seconds=0.01, max_attempts=3)
+        assert task is not None and task[:2] == (job_id, 0)
+        time.sleep(0.02)
+    assert queue.claim('worker-3', lease_seconds=0.01, max_attempts=3) is None
+    assert queue.progress(job_id) == {'failed': 1}
+    assert 'expired on attempt 3' in queue.errors(job_id)[0][1]
+    queue.close()
+
+
+def test_fail_expired_without_a_claiming_worker(tmp_path):
+
+    queue = SearchWorkQueue(str(tmp_path / 'queue.sqlite'))
+    job_id = queue.publish(None, [{'max_depth': 2}], 1)
+    queue.claim('worker', lease_seconds=0.01, max_attempts=1)
+    time.sleep(0.02)
+    queue.fail_expired(max_attempts=1)
+    assert queue.progress(job_id) == {'failed': 1}
+    queue.close()
+
+
+def test_local_workers_get_an_absolute_queue_path(tmp_path, monkeypatch):
+
+    commands = []
+
+    class FakePopen:
+        def __init__(self, command, cwd):
+            commands.append((command, cwd))
+
+    monkeypatch.setattr('src.search_queue.subprocess.Popen', FakePopen)
+    monkeypatch.chdir(tmp_path)
+    start_local_workers('search_queue.sqlite', 2, max_attempts=5)
+    assert len(commands) == 2
+    command = commands[0][0]
+    assert command[command.index('worker') + 1] == os.path.join(str(tmp_path), 'search_queue.sqlite')
+    assert command[command.index('--max-attempts') + 1] == '5'
@@ -0,0 +1,88 @@
+import json
+import re
+import subprocess
+import sys
+
+import numpy as np
+
+from src.stage_profiler import StageProfiler
+
+# A metric sample: name{stage="..."} value
+SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)\{stage="([^"\\]*)"\} (\S+)$')
+
+# Burns CPU, reports it is done and stays alive until its stdin closes
+BURN_THEN_WAIT = (
+    "import sys, time\n"
+    "end = time.process_time() + 0.5\n"
+    "while time.process_time() < end: pass\n"
+    "print('done', flush=True)\n"
+    "sys.stdin.read()\n"
+)
+
+
+def _profile(tmp_path):
+
+    profiler = StageProfiler('training')
+    data = profiler.run('make_data', np.zeros, (100, 3))
+    profiler.run('column_sums', np.sum, data, axis=0)
+    json_path, prometheus_path = str(tmp_path / 'profile.json'), str(tmp_path / 'profile.prom')
+    profiler.write_json(json_path)
+    profiler.write_prometheus(prometheus_path)
+    return profiler, json_path, prometheus_path
+
+
+def test_report_lists_each_stage_with_its_shapes(tmp_path):
+
+    profiler, json_path, _ = _profile(tmp_path)
+    with open(json_path) as f:
+        report = json.load(f)
+
+    assert set(report) == {'name', 'started', 'total_wall_seconds', 'total_cpu_seconds',
+                           'dominant_stage', 'stages'}
+    assert [stage['stage'] for stage in report['stages']] == ['make_data', 'column_sums']
+    assert set(report['stages'][0]) == {
+        'stage', 'wall_seconds', 'cpu_seconds', 'peak_rss_delta_mb', 'peak_rss_mb',
+        'rss_delta_mb', 'input_shapes', 'output_shapes'}
+    assert report['stages'][0]['output_shapes'] == [100, 3]
+    assert report['stages'][1]['input_shapes'] == [[100, 3]]
+    assert report['stages'] == profiler.stages
+
+
+def test_prometheus_output_parses(tmp_path):
+
+    profiler, _, prometheus_path = _profile(tmp_path)
+    with open(prometheus_path) as f:
+        lines = f.read().splitlines()
+
+    declared, samples = set(), {}
+    for line in lines:
+        if line.startswith('# HELP ') or line.startswith('# TYPE '):
+            declared.add(line.split()[2])
+            continue
+        match = SAMPLE_LINE.match(line)
+        assert match, line
+        assert match.group(1) in declared
+        samples[(match.group(1), match.group(2))] = float(match.group(3))
+
+    for stage in profiler.stages:
+        assert samples[('training_stage_wall_seconds', stage['stage'])] == stage['wall_seconds']
+        assert samples[('training_stage_cpu_seconds', stage['stage'])] == stage['cpu_seconds']
+
+
+def test_cpu_time_includes_children_still_running():
+
+    def start_worker():
+        worker = subprocess.Popen([sys.executable, '-c', BURN_THEN_WAIT],
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        assert worker.stdout.readline().strip() == 'done'
+        return worker
+
+    profiler = StageProfiler()
+    worker = profiler.run('start_worker', start_worker)
+    try:
+        # Like a loky worker, the child has not been reaped when the stage ends
+        assert worker.poll() is None
+        assert profiler.stages[0]['cpu_seconds'] >= 0.4
+    finally:
+        worker.stdin.close()
+        worker.wait()
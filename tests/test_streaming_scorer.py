@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from src.cohort_dtypes import cohort_vocabularies
+from src.fused_encoder import FusedEncoder
+from src.streaming_scorer import ChunkedScorer, clean_upload_chunk
+
+
+@pytest.fixture(scope='module')
+def upload_path(raw_frame, tmp_path_factory):
+
+    path = tmp_path_factory.mktemp('upload') / 'students.csv'
+    raw_frame.to_csv(path, index=False)
+    return str(path)
+
+
+def make_scorer(fitted_model, chunk_size):
+
+    model, preprocessor, feature_columns = fitted_model
+    return ChunkedScorer(lambda chunk: clean_upload_chunk(chunk, feature_columns),
+                         FusedEncoder.from_preprocessor(preprocessor),
+                         lambda X: model.predict_proba(X)[:, 1], feature_columns, chunk_size)
+
+
+def test_scores_do_not_depend_on_chunk_size(fitted_model, upload_path, raw_frame):
+
+    whole = make_scorer(fitted_model, len(raw_frame)).score(upload_path).to_frame()
+    # Most of these chunks have no '?' in Financial Stress
+    chunked = make_scorer(fitted_model, 97).score(upload_path).to_frame()
+    assert len(whole) > 0
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_scores_match_the_fitted_pipeline(fitted_model, upload_path, training_frame):
+
+    model, preprocessor, feature_columns = fitted_model
+    result = make_scorer(fitted_model, 500).score(upload_path).to_frame()
+    expected = model.predict_proba(preprocessor.transform(training_frame[feature_columns]))[:, 1] * 100
+    assert result['Depression Risk (%)'].tolist() == pytest.approx(expected.tolist(), abs=1e-9)
+
+
+def test_store_keeps_chunks_compact(fitted_model, upload_path):
+
+    scorer = make_scorer(fitted_model, 97)
+    result = scorer.score(upload_path).to_frame()
+    vocabularies = cohort_vocabularies(scorer.encoder)
+    for column in ['Gender', 'Sleep Duration', 'Degree', 'Financial Stress']:
+        assert isinstance(result[column].dtype, pd.CategoricalDtype)
+        assert list(result[column].cat.categories[:len(vocabularies[column])]) == vocabularies[column]
+    assert result['Academic Pressure'].dtype == 'int8'
+    assert result.index.is_unique
+
+
+def test_encoder_without_csv_dtypes_is_rejected(fitted_model):
+
+    with pytest.raises(AttributeError):
+        ChunkedScorer(lambda chunk: chunk, object(), lambda X: X, fitted_model[2])
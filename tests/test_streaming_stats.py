@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.streaming_stats import QuantileSketch, StreamingSummary, summarize_csv
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'student_depression_dataset.csv')
+
+STAT_COLUMNS = ['Age', 'Academic Pressure', 'CGPA', 'Work/Study Hours']
+
+
+def test_streaming_summary_matches_describe():
+
+    summary = summarize_csv(DATASET_PATH, STAT_COLUMNS, 'Depression', range_bytes=512 << 10,
+                            chunksize=5000)
+    frame = pd.read_csv(DATASET_PATH)
+    expected = frame[STAT_COLUMNS].describe().T
+    stats = summary.stats_frame()
+
+    assert summary.rows == len(frame)
+    np.testing.assert_allclose(stats['mean'], expected['mean'])
+    np.testing.assert_allclose(stats['std'], expected['std'])
+    np.testing.assert_allclose(stats['50%'], expected['50%'], atol=0.1)
+    assert summary.target_distribution().to_dict() == frame['Depression'].value_counts().to_dict()
+
+
+def test_each_part_gets_its_own_sketch_seed():
+
+    first = StreamingSummary(['x'], seed=1).sketches['x']._rng.integers(1 << 30, size=4)
+    second = StreamingSummary(['x'], seed=2).sketches['x']._rng.integers(1 << 30, size=4)
+    assert not np.array_equal(first, second)
+
+
+def test_sketch_quantiles_stay_close_after_merges():
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=200000)
+    sketch = QuantileSketch(k=512)
+    for i, part in enumerate(np.array_split(values, 20)):
+        part_sketch = QuantileSketch(k=512, seed=i)
+        part_sketch.update(part)
+        sketch.merge(part_sketch)
+    for q in (0.1, 0.5, 0.9):
+        assert abs(sketch.quantile(q) - np.quantile(values, q)) < 0.05
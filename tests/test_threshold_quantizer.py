@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.forest_compiler import CompiledForest
+from src.threshold_quantizer import QuantizedForest, ThresholdQuantizer
+
+
+@pytest.fixture(scope='module')
+def small_forest():
+    """Two numeric features plus one three-column one-hot group"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(0)
+    n_rows = 2000
+    numeric = rng.normal(size=(n_rows, 2)).round(1)
+    onehot = np.eye(3)[rng.integers(0, 3, n_rows)]
+    X = np.hstack([numeric, onehot]).astype(np.float32)
+    y = (numeric[:, 0] + onehot[:, 1] + rng.normal(scale=0.5, size=n_rows) > 0.5).astype(int)
+    model = RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0).fit(X, y)
+    return model, X
+
+
+def test_memo_matches_the_forest(fitted_model, encoded_rows):
+
+    model = fitted_model[0]
+    scorer = QuantizedForest(model)
+    np.testing.assert_allclose(scorer.predict_proba(encoded_rows), model.predict_proba(encoded_rows),
+                               rtol=0, atol=1e-12)
+    # The second pass is served from the memo
+    np.testing.assert_allclose(scorer.predict_proba(encoded_rows), model.predict_proba(encoded_rows),
+                               rtol=0, atol=1e-12)
+    assert scorer.hits >= encoded_rows.shape[0]
+
+
+def test_materialized_table_matches_the_forest(small_forest):
+
+    model, X = small_forest
+    quantizer = ThresholdQuantizer.from_forest(model)
+    quantizer = ThresholdQuantizer(quantizer.thresholds, groups=[[2, 3, 4]])
+    scorer = QuantizedForest(model, quantizer)
+    assert scorer.materialize(max_cells=100000)
+    np.testing.assert_allclose(scorer.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    assert scorer.misses == 0
+
+
+def test_representatives_fall_in_their_cells(small_forest):
+
+    model, _ = small_forest
+    quantizer = ThresholdQuantizer(ThresholdQuantizer.from_forest(model).thresholds, groups=[[2, 3, 4]])
+    cells = np.arange(quantizer.space_size())
+    np.testing.assert_array_equal(quantizer.cell_index(quantizer.representatives(cells)), cells)
+
+
+def test_materialize_refuses_large_spaces(fitted_model):
+
+    scorer = QuantizedForest(CompiledForest.from_model(fitted_model[0]))
+    assert not scorer.materialize(max_cells=1000)
+    assert scorer.table is None
@@ -1,4 +1,5 @@
 # train_and_export_model.py - FIXED VERSION
+import argparse
 import os
 import pickle
 import pandas as pd
@@ -7,13 +8,23 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
+from src.core_scheduler import CoreScheduler
+from src.data_cleaning import TRAINING_RULES, UNUSED_COLUMNS
+from src.dataset_cache import load_dataset
+from src.model_artifacts import export_artifacts
+
+parser = argparse.ArgumentParser(description="Train the depression model and export it to model/")
+parser.add_argument('--cores', type=int, default=None,
+                    help="Core budget for training (default: all available cores)")
+args = parser.parse_args()
+scheduler = CoreScheduler(args.cores)
 
 # Define the path to the dataset
 dataset_path = os.path.join('data', 'student_depression_dataset.csv')
 
-# Load the data
+# Load the data; later runs read the typed columnar cache, minus the unused columns (Age is kept)
 print(f"Loading dataset from {dataset_path}...")
-df = pd.read_csv(dataset_path)
+df = load_dataset(dataset_path, exclude=UNUSED_COLUMNS)
 
 print(f"Original dataset shape: {df.shape}")
 print(f"Original columns: {list(df.columns)}")
@@ -21,32 +32,9 @@ print(f"Original columns: {list(df.columns)}")
 # DATA CLEANING - Remove irrelevant columns and filter data
 print("\n--- DATA CLEANING ---")
 
-# Remove columns that don't contribute to prediction (but KEEP Age!)
-columns_to_remove = ['City', 'Work Pressure', 'Job Satisfaction', 'id']
-for col in columns_to_remove:
-    if col in df.columns:
-        print(f"Removing '{col}' column. Shape before: {df.shape}")
-        df = df.drop(col, axis=1)
-        print(f"Shape after removing '{col}': {df.shape}")
-
-# Filter to only students BUT KEEP THE PROFESSION COLUMN FOR NOW
-if 'Profession' in df.columns:
-    print(f"Filtering only 'Student' in Profession. Rows before: {len(df)}")
-    df = df[df['Profession'] == 'Student']
-    print(f"Rows after filtering 'Student': {len(df)}")
-    
-    # NOW remove the Profession column since all rows are 'Student'
-    print(f"Removing 'Profession' column after filtering. Shape before: {df.shape}")
-    df = df.drop('Profession', axis=1)
-    print(f"Shape after removing 'Profession': {df.shape}")
-
-# Remove problematic values from Sleep Duration and Financial Stress
-columns_to_clean = ['Sleep Duration', 'Financial Stress']
-for col in columns_to_clean:
-    if col in df.columns:
-        print(f"Cleaning problematic values from {col}. Rows before: {len(df)}")
-        df = df[~df[col].isin(['Others', '?', 'unknown'])]
-        print(f"Rows after cleaning {col}: {len(df)}")
+# Only students, without problematic Sleep Duration / Financial Stress values;
+# Profession is dropped after filtering since all rows are 'Student'
+df = TRAINING_RULES.apply(df, verbose=True)
 
 print(f"\nFinal dataset shape after cleaning: {df.shape}")
 print(f"Final columns for training: {list(df.columns)}")
@@ -108,10 +96,13 @@ preprocessor.fit(X_train)
 X_train_transformed = preprocessor.transform(X_train)
 X_test_transformed = preprocessor.transform(X_test)
 
-# Train the model
+# Train the model; a single forest gets the whole core budget for its trees
 print("\nTraining the model...")
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train_transformed, y_train)
+outer_jobs, inner_jobs = scheduler.plan(1)
+model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=inner_jobs)
+with scheduler.session('model_fit', outer_jobs, inner_jobs):
+    model.fit(X_train_transformed, y_train)
+scheduler.print_summary()
 
 # Evaluate the model
 train_score = model.score(X_train_transformed, y_train)
@@ -142,26 +133,38 @@ if hasattr(model, 'feature_importances_'):
 else:
     print("Skipping feature importance analysis - model doesn't support it")
 
+# The training thread count is not the serving one; scorers choose their own
+model.set_params(n_jobs=None)
+
 # Create the 'model' directory if it doesn't exist
 os.makedirs('model', exist_ok=True)
 
-# Save the model, preprocessor, and feature columns
+# Save the model, the TRAINED preprocessor, and the list of feature columns
 print("\nSaving model, preprocessor, and feature columns...")
-with open('model/depression_model.pkl', 'wb') as f_model:
-    pickle.dump(model, f_model)
-
-# Save the TRAINED preprocessor
-with open('model/preprocessor.pkl', 'wb') as f_pre:
-    pickle.dump(preprocessor, f_pre)
-
-# Save the list of feature columns
-with open('model/feature_columns.pkl', 'wb') as f_cols:
-    pickle.dump(feature_columns, f_cols)
+pickle_paths = []
+for name, obj in [('depression_model.pkl', model), ('preprocessor.pkl', preprocessor),
+                  ('feature_columns.pkl', feature_columns)]:
+    path = os.path.join('model', name)
+    # Written beside the old file and renamed, so readers never see a partial pickle
+    with open(path + '.tmp', 'wb') as f_out:
+        pickle.dump(obj, f_out)
+        f_out.flush()
+        os.fsync(f_out.fileno())
+    os.replace(path + '.tmp', path)
+    pickle_paths.append(path)
+
+# Export memory-mappable arrays so every server process shares one copy of the model;
+# the manifest also records the pickles' hashes so they can be checked against it
+print("\nExporting memory-mappable model arrays...")
+manifest = export_artifacts(model, preprocessor, feature_columns, os.path.join('model', 'arrays'),
+                            pickle_paths=pickle_paths)
+print(f"Model hash: {manifest['model_hash']}")
 
 print("\n=== MODEL TRAINING COMPLETED SUCCESSFULLY ===")
 print("Files saved:")
 print("- model/depression_model.pkl")
 print("- model/preprocessor.pkl") 
 print("- model/feature_columns.pkl")
+print("- model/arrays/ (a versioned directory of memory-mappable .npy arrays and manifest.json)")
 print(f"\nFeature columns saved: {feature_columns}")
 print("\nYou can now use these files in your Streamlit application.")
\ No newline at end of file